@@ -1,8 +1,13 @@
-from datetime import datetime, timedelta
-import pandas as pd
 import unittest
+import hashlib
 import os
 import glob
+import shutil
+import tempfile
+
+from roster_input import departments_file_for, is_shift_file, read_shifts
+from roster_readers import DAY_START_COLUMNS, DEFAULT_READER_BACKEND, WEEKLY_HEADER_ROW, read_weekly_format, sheet_names
+from roster_time import time_grid
 
 # -----------------------------
 # Helper
@@ -10,39 +15,57 @@ import glob
 
 # Generate global day slots at 15-minute intervals (0 to 95 representing 00:00 to 23:45)
 def generate_day_slots(interval=15):
-    fmt = "%H:%M"
-    slots = []
-    start_dt = datetime.strptime("00:00", fmt)
-    for i in range(24 * 60 // interval):  # 96 slots
-        slots.append(start_dt.strftime(fmt))
-        start_dt += timedelta(minutes=interval)
-    return slots
+    grid = time_grid(interval)
+    return grid.labels(range(grid.slots_per_day))  # 96 slots
 
 day_slots = generate_day_slots()
 # day_slots[0] == "00:00", day_slots[95] == "23:45"
 
 def time_to_slot(time_str, interval=15):
-    h, m = map(int, time_str.split(":"))
-    return (h * 60 + m) // interval
+    return time_grid(interval).slot(time_str)
 
 
 def timespan_to_slot(time_span: tuple):
     """
     Take in a tuple of (start_time, end_time) in "HH:MM" format.
-    Return a range of the corresponding 15-minute slots in 24 hours.
+    Return a range of the corresponding 15-minute slots; an end before the
+    start runs past midnight into the next day's slots (96 onwards).
 
     Example:
         ("09:30", "18:00") -> range(38, 72)
+        ("22:00", "02:00") -> range(88, 104)
+        ("06:00", "06:00") -> range(24, 120)
+
+    An end equal to the start is a full day; it used to give an empty range.
     """
-    start, end = time_span
-    return range(time_to_slot(start), time_to_slot(end))
+    return time_grid().span(time_span)
+
+
+def list_excel_files(directory=None):
+    """List .xlsx files in a directory, skipping Excel's ~$ lock files"""
+    pattern = os.path.join(directory, "*.xlsx") if directory else "*.xlsx"
+    excel_files = glob.glob(pattern)
+    return [f for f in excel_files if not os.path.basename(f).startswith("~$")]  # Exclude temp files
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_name(path: str) -> str:
+    """Store label used in output file names: the workbook name without extension"""
+    return os.path.splitext(os.path.basename(path))[0]
 
 
 def select_excel_file():
     """Prompt user to select an Excel file from the current directory"""
     # Get all Excel files in the current directory
-    excel_files = glob.glob("*.xlsx")
-    excel_files = [f for f in excel_files if not f.startswith("~$")]  # Exclude temp files
+    excel_files = list_excel_files()
     
     if not excel_files:
         print("No Excel files found in the current directory.")
@@ -67,6 +90,8 @@ def select_excel_file():
 
 def read_from_excel_new_format(file_path, day_of_week):
     """Read employee data from the new Excel format with Weekly sheet"""
+    import pandas as pd
+
     try:
         # Read the Weekly sheet
         df = pd.read_excel(file_path, sheet_name="Weekly", header=None)
@@ -84,19 +109,11 @@ def read_from_excel_new_format(file_path, day_of_week):
                 employee_dept_mapping[employee_name] = department
         
         # Find the header row (row 7 based on our analysis)
-        header_row = 7
+        header_row = WEEKLY_HEADER_ROW
         headers = df.iloc[header_row].tolist()
         
         # Map day names to their Start column indices (based on actual Excel structure)
-        day_start_columns = {
-            "M": 6,   # Monday Start column
-            "T": 9,   # Tuesday Start column
-            "W": 12,  # Wednesday Start column
-            "Th": 15, # Thursday Start column
-            "F": 18,  # Friday Start column
-            "Sa": 21, # Saturday Start column
-            "Su": 24  # Sunday Start column
-        }
+        day_start_columns = DAY_START_COLUMNS
         
         if day_of_week not in day_start_columns:
             raise ValueError(f"Invalid day: {day_of_week}. Must be one of: {list(day_start_columns.keys())}")
@@ -167,25 +184,41 @@ def read_from_excel_new_format(file_path, day_of_week):
         print(f"Error reading Excel file: {e}")
         return {}
 
-def read_from_excel(day_of_week, file_path=None):
-    """Read employee data from Excel file - supports both old and new formats"""
+def read_from_excel(day_of_week, file_path=None, backend=DEFAULT_READER_BACKEND, departments_path=None):
+    """Read employee data from Excel file - supports both old and new formats, plus CSV/JSON/NDJSON shift files
+
+    backend picks the Weekly/Team reader (see roster_readers.READER_BACKENDS).
+    departments_path maps shift file rows without a department to one; it defaults
+    to a <name>.departments.<ext> file next to the shift file.
+    """
     if file_path is None:
         # Try new format first
-        excel_files = glob.glob("*.xlsx")
-        excel_files = [f for f in excel_files if not f.startswith("~$")]
+        excel_files = list_excel_files()
         
         if excel_files:
             file_path = excel_files[0]  # Use first available file
         else:
             print("No Excel files found in the current directory.")
             return {}
+
+    # Plain CSV/JSON/NDJSON shift exports skip Excel entirely
+    if is_shift_file(file_path):
+        return read_shifts(day_of_week, file_path, departments_path or departments_file_for(file_path))
     
+    # Only Excel input needs pandas; import it here to keep startup fast
+    import pandas as pd
+
     # Try new format first
     try:
-        # Check if Weekly sheet exists
-        df_sheets = pd.read_excel(file_path, sheet_name=None)
-        if "Weekly" in df_sheets:
-            return read_from_excel_new_format(file_path, day_of_week)
+        # Check if Weekly sheet exists (sheet names only, no cells are read)
+        if "Weekly" in sheet_names(file_path):
+            if backend == DEFAULT_READER_BACKEND:
+                return read_from_excel_new_format(file_path, day_of_week)
+            try:
+                return read_weekly_format(file_path, day_of_week, backend)
+            except Exception as e:
+                print(f"Error reading Excel file: {e}")
+                return {}
     except:
         pass
     
@@ -241,5 +274,30 @@ class TestTimeSpanToSlot(unittest.TestCase):
         self.assertEqual(timespan_to_slot(("23:30", "23:45")), (94, 95))
 
 
+
+class TestSiblingDepartmentsFile(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "shifts.csv")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("employee_id,name,day,start,end\n1,Ann,M,09:30,18:00\n2,Bo,M,10:00,14:00\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_departments_read_from_sibling_file(self):
+        with open(os.path.join(self.folder, "shifts.departments.csv"), "w", encoding="utf-8") as f:
+            f.write("employee_id,name,department\n1,Ann,M's\n2,Bo,HH\n")
+        working_employees = read_from_excel("M", self.path)
+        self.assertEqual({name: info["department"] for name, info in working_employees.items()},
+                         {"Ann": "M's", "Bo": "HH"})
+
+    def test_explicit_departments_file(self):
+        other = os.path.join(self.folder, "staff.json")
+        with open(other, "w", encoding="utf-8") as f:
+            f.write('[{"name": "Ann", "department": "L\'s"}]')
+        working_employees = read_from_excel("M", self.path, departments_path=other)
+        self.assertEqual(working_employees["Ann"]["department"], "L's")
+
 if __name__ == "__main__":
     unittest.main()
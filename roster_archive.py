@@ -0,0 +1,437 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from helper import read_from_excel
+from roster_generator import RosterConfig, generate_roster
+from roster_intervals import RosterIntervals
+from roster_time import time_grid
+
+# -----------------------------
+# Roster history archive
+# -----------------------------
+
+DEFAULT_ARCHIVE_DIR = "roster_archive"
+
+# One row per (employee, slot, task) assignment
+RECORD_DTYPE = np.dtype([
+    ("batch", "<u4"),     # archived day (see metadata "batches")
+    ("date", "<i4"),      # days since 1970-01-01
+    ("employee", "<i4"),  # index into metadata "employees", [store, employee ID or name, name]
+    ("slot", "<i2"),
+    ("task", "i1"),       # index into metadata "tasks"
+])
+
+# One row per employee shift on an archived day
+SHIFT_DTYPE = np.dtype([
+    ("batch", "<u4"),
+    ("date", "<i4"),
+    ("employee", "<i4"),
+    ("start", "<i2"),
+    ("end", "<i2"),
+])
+
+WEEKDAYS = ["M", "T", "W", "Th", "F", "Sa", "Su"]
+LONG_SHIFT_MINUTES = 6 * 60  # longer shifts get a 40-minute break
+BREAK_40_MINUTES = 40
+
+DateLike = Union[str, datetime.date]
+
+
+def _to_days(date: DateLike) -> int:
+    """Days since 1970-01-01 for a date or "YYYY-MM-DD" string"""
+    return int(np.datetime64(str(date), "D").astype(np.int64))
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    """Monday = 0 weekday index for day numbers (1970-01-01 was a Thursday)"""
+    return (days + 3) % 7
+
+
+def _weekday_name(date: DateLike) -> str:
+    """Roster day code (M, T, ..., Su) of a date"""
+    return WEEKDAYS[int(_weekday(np.int64(_to_days(date))))]
+
+
+class RosterArchive:
+    """Append-only columnar store of generated rosters
+
+    Records live in flat binary files read back through np.memmap, with names
+    int-coded in a small JSON metadata file that also holds the committed row
+    counts, so rows from an interrupted append are never read. Re-archiving the
+    same store and date supersedes the earlier batch; its rows stay on disk but
+    are masked out. Employees are coded per store by employee ID (name when the
+    workbook has none), so namesakes in different stores are kept apart.
+    """
+
+    def __init__(self, directory: str = DEFAULT_ARCHIVE_DIR):
+        self.directory = directory
+        self.records_path = os.path.join(directory, "records.bin")
+        self.shifts_path = os.path.join(directory, "shifts.bin")
+        self.meta_path = os.path.join(directory, "metadata.json")
+        self.meta = self._load_meta()
+
+    def _load_meta(self) -> Dict[str, object]:
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            # Archives written before employees were coded per store hold bare names
+            meta["employees"] = [[None, emp, emp] if isinstance(emp, str) else emp
+                                 for emp in meta["employees"]]
+            return meta
+        return {"employees": [], "tasks": [], "stores": [], "batches": [], "records": 0, "shifts": 0}
+
+    def _save_meta(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".metadata_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.meta, f, separators=(",", ":"))
+            os.replace(tmp_path, self.meta_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _code(table: List[str], value: str, index: Dict[str, int]) -> int:
+        code = index.get(value)
+        if code is None:
+            code = len(table)
+            table.append(value)
+            index[value] = code
+        return code
+
+    def _employee_code(self, store: str, emp: str, info: Optional[Dict[str, object]],
+                       index: Dict[Tuple[str, str], int]) -> int:
+        """Code for an employee of a store, keyed by employee ID or, without one, by name"""
+        employee_id = (info or {}).get("employee_id")
+        key = (store, str(employee_id) if employee_id not in (None, "") else emp)
+        code = index.get(key)
+        if code is None:
+            code = len(self.meta["employees"])
+            self.meta["employees"].append([store, key[1], emp])
+            index[key] = code
+        return code
+
+    def employee_labels(self) -> List[str]:
+        """Display name per employee code
+
+        The name alone where it is unique in the archive (or was archived before
+        employees were coded per store), otherwise the name with its store, and
+        the employee ID when the store has namesakes.
+        """
+        employees = self.meta["employees"]
+        codes_by_name: Dict[str, List[Tuple[Optional[str], str]]] = {}
+        for store, key, name in employees:
+            codes_by_name.setdefault(name, []).append((store, key))
+        labels = []
+        for store, key, name in employees:
+            others = codes_by_name[name]
+            if len(others) == 1 or store is None:
+                labels.append(name)
+            elif sum(1 for other_store, _ in others if other_store == store) == 1 or key == name:
+                labels.append(f"{name} ({store})")
+            else:
+                labels.append(f"{name} ({store}, {key})")
+        return labels
+
+    def append_roster(self,
+                      roster: Dict[int, Dict[str, List[str]]],
+                      date: DateLike,
+                      store: str,
+                      working_employees: Dict[str, Dict[str, str]],
+                      intervals: Optional[RosterIntervals] = None,
+                      current_day: Optional[str] = None) -> int:
+        """Archive one generated day and return its batch id
+
+        Args:
+            roster: Dictionary mapping time slots to task assignments
+            date: Calendar date the roster is for
+            store: Store label
+            working_employees: Full employee information (for shift lengths and IDs)
+            intervals: Optional interval view of the roster (built if not given)
+            current_day: Day of the week the roster was generated for; checked against date
+
+        Raises:
+            ValueError: If date does not fall on current_day
+        """
+        days = _to_days(date)
+        if current_day is not None and _weekday_name(date) != current_day:
+            raise ValueError(f"{date} is a {_weekday_name(date)}, not {current_day}")
+        if intervals is None:
+            intervals = RosterIntervals.from_roster(roster)
+
+        tasks, stores = self.meta["tasks"], self.meta["stores"]
+        emp_index = {(entry[0], entry[1]): i for i, entry in enumerate(self.meta["employees"])}
+        task_index = {name: i for i, name in enumerate(tasks)}
+        store_code = self._code(stores, store, {name: i for i, name in enumerate(stores)})
+        batch = len(self.meta["batches"])
+
+        emp_codes, slot_starts, lengths, task_codes = [], [], [], []
+        for emp, blocks in intervals.items():
+            emp_code = self._employee_code(store, emp, working_employees.get(emp), emp_index)
+            for start, end, task in blocks:
+                emp_codes.append(emp_code)
+                slot_starts.append(start)
+                lengths.append(end - start)
+                task_codes.append(self._code(tasks, task, task_index))
+
+        lengths = np.asarray(lengths, dtype=np.int64)
+        records = np.zeros(int(lengths.sum()), dtype=RECORD_DTYPE)
+        records["batch"] = batch
+        records["date"] = days
+        records["employee"] = np.repeat(np.asarray(emp_codes, dtype=np.int32), lengths)
+        records["task"] = np.repeat(np.asarray(task_codes, dtype=np.int8), lengths)
+        # Slot = block start + offset within the block
+        offsets = np.arange(len(records)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        records["slot"] = np.repeat(np.asarray(slot_starts, dtype=np.int16), lengths) + offsets
+
+        shifts = np.zeros(len(working_employees), dtype=SHIFT_DTYPE)
+        grid = time_grid()
+        for i, (emp, info) in enumerate(working_employees.items()):
+            shift_slots = grid.shift_span(info["shift"], range(min(roster), max(roster) + 1) if roster else None)
+            shifts[i] = (batch, days, self._employee_code(store, emp, info, emp_index),
+                         shift_slots.start, shift_slots.stop)
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._append_rows(self.records_path, records, self.meta["records"])
+        self._append_rows(self.shifts_path, shifts, self.meta["shifts"])
+        self.meta["records"] += len(records)
+        self.meta["shifts"] += len(shifts)
+
+        # Supersede any earlier batch for the same store and date
+        for entry in self.meta["batches"]:
+            if entry["store"] == store_code and entry["date"] == days:
+                entry["active"] = False
+        self.meta["batches"].append({"store": store_code, "date": days, "active": True})
+        self._save_meta()
+        return batch
+
+    @staticmethod
+    def _append_rows(path: str, rows: np.ndarray, committed: int) -> None:
+        """Append rows after the last committed row, dropping any torn tail from a crashed append"""
+        with open(path, "ab") as f:
+            f.truncate(committed * rows.dtype.itemsize)
+            f.write(rows.tobytes())
+
+    def _read(self, path: str, dtype: np.dtype, count: int) -> np.ndarray:
+        """Memory-map the committed rows of a table"""
+        if count == 0 or not os.path.exists(path):
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def _mask(self, table: np.ndarray, start: Optional[DateLike], end: Optional[DateLike],
+              store: Optional[str]) -> np.ndarray:
+        """Rows from active batches inside [start, end] (inclusive) and the store, if given"""
+        batches = self.meta["batches"]
+        active = np.array([entry["active"] for entry in batches], dtype=bool)
+        batch_ids = np.asarray(table["batch"])
+        mask = active[batch_ids]
+        if store is not None:
+            if store not in self.meta["stores"]:
+                return np.zeros(len(table), dtype=bool)
+            store_of_batch = np.array([entry["store"] for entry in batches])
+            mask &= store_of_batch[batch_ids] == self.meta["stores"].index(store)
+        if start is not None:
+            mask &= table["date"] >= _to_days(start)
+        if end is not None:
+            mask &= table["date"] <= _to_days(end)
+        return mask
+
+    def _task_codes(self, names) -> np.ndarray:
+        return np.array([i for i, task in enumerate(self.meta["tasks"]) if task in names], dtype=np.int8)
+
+    def cs_minutes_by_employee(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                               store: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Minutes on each CS task per employee over a date range"""
+        records = self._read(self.records_path, RECORD_DTYPE, self.meta["records"])
+        mask = self._mask(records, start, end, store)
+        employees = self.employee_labels()
+        interval = time_grid().interval
+        result = {}
+        for task in RosterConfig.CUSTOMER_SERVICE_TASKS:
+            codes = self._task_codes((task,))
+            task_mask = mask & np.isin(records["task"], codes)
+            counts = np.bincount(records["employee"][task_mask], minlength=len(employees)) * interval
+            for emp_code in np.nonzero(counts)[0]:
+                result.setdefault(employees[emp_code], {t: 0 for t in RosterConfig.CUSTOMER_SERVICE_TASKS})
+                result[employees[emp_code]][task] = int(counts[emp_code])
+        return result
+
+    def break_compliance(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                         store: Optional[str] = None) -> Dict[str, object]:
+        """Share of long shifts (> 6 hours) that received a full 40-minute break"""
+        shifts = self._read(self.shifts_path, SHIFT_DTYPE, self.meta["shifts"])
+        shifts = shifts[self._mask(shifts, start, end, store)]
+        interval = time_grid().interval
+        shifts = shifts[(shifts["end"] - shifts["start"]) * interval > LONG_SHIFT_MINUTES]
+
+        records = self._read(self.records_path, RECORD_DTYPE, self.meta["records"])
+        break_mask = self._mask(records, start, end, store) & np.isin(records["task"], self._task_codes(("40",)))
+        n_emp = max(len(self.meta["employees"]), 1)
+
+        # (batch, employee) keys -> number of 40-minute break slots
+        break_keys = records["batch"][break_mask].astype(np.int64) * n_emp + records["employee"][break_mask]
+        keys, counts = np.unique(break_keys, return_counts=True)
+        shift_keys = shifts["batch"].astype(np.int64) * n_emp + shifts["employee"]
+        break_slots = np.zeros(len(shift_keys), dtype=np.int64)
+        if len(keys):
+            pos = np.clip(np.searchsorted(keys, shift_keys), 0, len(keys) - 1)
+            hit = keys[pos] == shift_keys
+            break_slots[hit] = counts[pos[hit]]
+        compliant = break_slots * interval >= BREAK_40_MINUTES
+
+        labels = self.employee_labels()
+        missing = [
+            (str(np.datetime64(int(shifts["date"][i]), "D")), labels[shifts["employee"][i]])
+            for i in np.nonzero(~compliant)[0]
+        ]
+        total = len(shifts)
+        return {
+            "long_shifts": total,
+            "compliant": int(compliant.sum()),
+            "rate": float(compliant.mean()) if total else 1.0,
+            "missing": missing,
+        }
+
+    def register_load_by_weekday(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                                 store: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Register minutes per weekday, in total and per archived day"""
+        records = self._read(self.records_path, RECORD_DTYPE, self.meta["records"])
+        mask = self._mask(records, start, end, store)
+        r_mask = mask & np.isin(records["task"], self._task_codes(("R",)))
+        minutes = np.bincount(_weekday(records["date"][r_mask]), minlength=7) * time_grid().interval
+
+        batches = self.meta["batches"]
+        batch_ids = np.unique(records["batch"][mask])
+        batch_days = np.array([batches[b]["date"] for b in batch_ids], dtype=np.int64)
+        day_counts = np.bincount(_weekday(batch_days), minlength=7) if len(batch_days) else np.zeros(7, int)
+
+        return {
+            day: {
+                "days": int(day_counts[i]),
+                "register_minutes": int(minutes[i]),
+                "register_minutes_per_day": float(minutes[i] / day_counts[i]) if day_counts[i] else 0.0,
+            }
+            for i, day in enumerate(WEEKDAYS)
+        }
+
+
+def print_archive_report(archive: RosterArchive, start: Optional[str], end: Optional[str],
+                         store: Optional[str]) -> None:
+    """Print CS minutes, break compliance and register load for a date range"""
+    span = f"{start or 'start'} to {end or 'end'}" + (f", store {store}" if store else "")
+    print(f"\n🗄️  ROSTER ARCHIVE REPORT ({span})")
+    print("-" * 50)
+
+    print("CS minutes per employee:")
+    for emp, minutes in sorted(archive.cs_minutes_by_employee(start, end, store).items()):
+        total = sum(minutes.values())
+        print(f"  {emp}: FR({minutes['FR']}) GR({minutes['GR']}) R({minutes['R']}) = {total} min")
+
+    compliance = archive.break_compliance(start, end, store)
+    print(f"\nBreak compliance: {compliance['compliant']}/{compliance['long_shifts']} "
+          f"long shifts ({compliance['rate'] * 100:.1f}%)")
+    for date, emp in compliance["missing"]:
+        print(f"  ⚠️  {date}: {emp} had no full 40-minute break")
+
+    print("\nRegister load by weekday:")
+    for day, load in archive.register_load_by_weekday(start, end, store).items():
+        if load["days"]:
+            print(f"  {day}: {load['register_minutes']} min over {load['days']} days "
+                  f"({load['register_minutes_per_day']:.0f} min/day)")
+
+
+def main() -> None:
+    """Archive generated rosters or report on the archive"""
+    parser = argparse.ArgumentParser(description="Columnar roster history archive")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_DIR, help="Archive directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Generate a day's roster and archive it")
+    add.add_argument("file_path", help="Roster workbook (.xlsx)")
+    add.add_argument("day", choices=list(RosterConfig.STORE_HOURS), help="Day of the week")
+    add.add_argument("date", help="Calendar date (YYYY-MM-DD)")
+    add.add_argument("--store", help="Store label (default: workbook name)")
+
+    report = commands.add_parser("report", help="Print analytics over a date range")
+    report.add_argument("--from", dest="start", help="First date (YYYY-MM-DD)")
+    report.add_argument("--to", dest="end", help="Last date (YYYY-MM-DD)")
+    report.add_argument("--store", help="Only this store")
+
+    args = parser.parse_args()
+    archive = RosterArchive(args.archive)
+
+    if args.command == "add":
+        if _weekday_name(args.date) != args.day:
+            parser.error(f"{args.date} is a {_weekday_name(args.date)}, not {args.day}")
+        store = args.store or os.path.splitext(os.path.basename(args.file_path))[0]
+        working_employees = read_from_excel(args.day, args.file_path)
+        intervals = RosterIntervals()
+        with contextlib.redirect_stdout(io.StringIO()):
+            roster = generate_roster(args.day, args.file_path, intervals,
+                                     working_employees=working_employees)
+        batch = archive.append_roster(roster, args.date, store, working_employees, intervals, args.day)
+        print(f"✅ Archived {store} {args.date} as batch {batch}")
+    else:
+        print_archive_report(archive, args.start, args.end, args.store)
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_archive`
+
+class TestRosterArchive(unittest.TestCase):
+    def setUp(self):
+        self.archive = RosterArchive(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.archive.directory)
+
+    @staticmethod
+    def _day(employee_id):
+        roster = {slot: {"FR": ["Ann"], "GR": [], "R": []} for slot in range(40, 44)}
+        employees = {"Ann": {"shift": ("10:00", "11:00"), "department": "M's",
+                             "employee_id": employee_id, "hours": 1.0}}
+        return roster, employees
+
+    def test_namesakes_in_other_stores_kept_apart(self):
+        roster, ann_7 = self._day("7")
+        _, ann_8 = self._day("8")
+        # 2024-01-01 was a Monday
+        self.archive.append_roster(roster, "2024-01-01", "north", ann_7, current_day="M")
+        self.archive.append_roster(roster, "2024-01-01", "south", ann_7)
+        self.archive.append_roster(roster, "2024-01-08", "south", ann_8)
+        self.archive.append_roster(roster, "2024-01-15", "north", ann_7)
+
+        self.assertEqual(len(self.archive.meta["employees"]), 3)
+        minutes = self.archive.cs_minutes_by_employee()
+        self.assertEqual(minutes["Ann (north)"]["FR"], 120)
+        self.assertEqual(minutes["Ann (south, 7)"]["FR"], 60)
+        self.assertEqual(minutes["Ann (south, 8)"]["FR"], 60)
+
+        reopened = RosterArchive(self.archive.directory)
+        self.assertEqual(reopened.employee_labels(), self.archive.employee_labels())
+
+    def test_date_must_fall_on_day(self):
+        roster, employees = self._day("7")
+        with self.assertRaises(ValueError):
+            self.archive.append_roster(roster, "2024-01-02", "north", employees, current_day="M")
+        self.assertEqual(self.archive.meta["batches"], [])
+        self.archive.append_roster(roster, "2024-01-02", "north", employees, current_day="T")
+        self.assertEqual(self.archive.register_load_by_weekday()["T"]["days"], 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import signal
+import tempfile
+import shutil
+import time
+import unittest
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+from unittest import mock
+
+from helper import read_from_excel, store_name
+from roster_generator import RosterConfig, generate_roster
+from roster_intervals import RosterIntervals
+from roster_printer import export_roster_to_excel
+from roster_readers import DEFAULT_READER_BACKEND, READER_BACKENDS
+
+# -----------------------------
+# Checkpointed batch runs
+# -----------------------------
+
+OUTPUT_DIR = "roster_output"
+MANIFEST_DIR = os.path.join("roster_state", "batches")
+MANIFEST_VERSION = 1
+JOURNAL_SUFFIX = ".journal"
+
+JOB_STATES = ("pending", "running", "done", "failed")
+
+
+def job_id(file_path: str, day: str, seed: int) -> str:
+    """Stable job key for one store, day and seed"""
+    return f"{store_name(file_path)}:{day}:{seed}"
+
+
+def journal_path(manifest_path: str) -> str:
+    """Append-only state log kept next to the manifest"""
+    return manifest_path + JOURNAL_SUFFIX
+
+
+def _write_atomic(path: str, payload: Dict[str, object]) -> None:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def create_manifest(path: str, files: List[str], days: Optional[List[str]] = None,
+                    seeds: Optional[List[int]] = None,
+                    engine: str = RosterConfig.DEFAULT_ENGINE,
+                    template: bool = False,
+                    reader: str = DEFAULT_READER_BACKEND) -> Dict[str, object]:
+    """Write a manifest with one pending job per file × day × seed
+
+    Jobs and their exports are named after the store (the file's base name),
+    so two different files with the same base name are rejected.
+
+    Raises:
+        FileExistsError: If the manifest already exists (resume it instead)
+        ValueError: If two different files share a store name
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"Manifest already exists: {path}")
+    stores: Dict[str, str] = {}
+    for file_path in files:
+        other = stores.setdefault(store_name(file_path), os.path.abspath(file_path))
+        if other != os.path.abspath(file_path):
+            raise ValueError(f"Store name {store_name(file_path)!r} is used by both {other} and "
+                             f"{os.path.abspath(file_path)}; rename one so their jobs and exports stay apart")
+    jobs = {}
+    for file_path in files:
+        for day in days or list(RosterConfig.STORE_HOURS):
+            for seed in seeds or [0]:
+                jobs[job_id(file_path, day, seed)] = {
+                    "file": os.path.abspath(file_path),
+                    "day": day,
+                    "seed": seed,
+                    "state": "pending",
+                    "output": None,
+                    "error": None,
+                    "seconds": None,
+                    "attempts": 0,
+                }
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "engine": engine,
+        "template": template,
+        "reader": reader,
+        "jobs": jobs,
+    }
+    _write_atomic(path, manifest)
+    return manifest
+
+
+def record_state(manifest_path: str, job: str, state: str, **fields) -> None:
+    """Append one job state change to the journal and fsync it
+
+    Each change is a single JSON line, so a crash can at worst lose a
+    half-written last line, which load_manifest ignores.
+    """
+    line = json.dumps({"job": job, "state": state, **fields}, separators=(",", ":"))
+    with open(journal_path(manifest_path), "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_manifest(path: str) -> Dict[str, object]:
+    """Read a manifest and replay its journal on top"""
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version: {manifest.get('version')}")
+    jobs = manifest["jobs"]
+    journal = journal_path(path)
+    if os.path.exists(journal):
+        with open(journal, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from a crash
+                    continue
+                job = jobs.get(change.pop("job"))
+                if job is not None:
+                    job.update(change)
+    return manifest
+
+
+def compact_manifest(path: str, manifest: Dict[str, object]) -> None:
+    """Fold the journal into the manifest file and start a fresh journal"""
+    _write_atomic(path, manifest)
+    journal = journal_path(path)
+    if os.path.exists(journal):
+        os.remove(journal)
+
+
+def count_states(manifest: Dict[str, object]) -> Dict[str, int]:
+    """Number of jobs in each state"""
+    counts = {state: 0 for state in JOB_STATES}
+    for job in manifest["jobs"].values():
+        counts[job["state"]] += 1
+    return counts
+
+
+def run_job(job: Dict[str, object], engine: str, template: bool = False,
+            reader: str = DEFAULT_READER_BACKEND) -> Optional[str]:
+    """Generate and export one job (runs in a worker process)
+
+    The export is written under a temporary name and renamed into place, so a
+    killed run never leaves a half-written file under the final name.
+
+    Returns:
+        Exported file path, or None when nobody works that day
+    """
+    file_path, day, seed = job["file"], job["day"], job["seed"]
+    filename = f"{store_name(file_path)}_{day}_s{seed}.xlsx"
+    tmp_name = f".tmp_{os.getpid()}_{filename}"
+    with contextlib.redirect_stdout(io.StringIO()):
+        working_employees = read_from_excel(day, file_path, reader)
+        if not working_employees:
+            return None
+        random.seed(seed)
+        intervals = RosterIntervals()
+        roster = generate_roster(day, file_path, intervals, engine=engine,
+                                 working_employees=working_employees)
+        exported = export_roster_to_excel(roster, day, working_employees, filename=tmp_name,
+                                          intervals=intervals, template=template)
+    if exported is None:
+        raise RuntimeError(f"Export failed for {file_path} ({day})")
+    final_path = os.path.join(OUTPUT_DIR, filename)
+    os.replace(exported, final_path)
+    return final_path
+
+
+def _ignore_stop_signals() -> None:
+    # Workers finish their job; the parent decides when to stop
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_IGN)
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def run_batch(path: str, workers: Optional[int] = None, retry_failed: bool = False) -> Dict[str, int]:
+    """Run a manifest's outstanding jobs, checkpointing every state change
+
+    Done jobs are skipped. Jobs left "running" by a crashed run are rerun, and
+    failed jobs are rerun only with retry_failed. The first SIGINT/SIGTERM stops
+    new jobs from starting and waits for the running ones; a second SIGINT aborts.
+    If the worker pool breaks (a worker was killed), the run stops and the
+    affected jobs are left pending for the next resume.
+
+    Returns:
+        Jobs per state after the run
+    """
+    manifest = load_manifest(path)
+    # Resume from a clean manifest so the journal only covers this run
+    compact_manifest(path, manifest)
+    engine, template = manifest["engine"], manifest.get("template", False)
+    reader = manifest.get("reader", DEFAULT_READER_BACKEND)
+    jobs = manifest["jobs"]
+    runnable = {"pending", "running", "failed"} if retry_failed else {"pending", "running"}
+    queue = deque(key for key, job in jobs.items() if job["state"] in runnable)
+    total = len(jobs)
+    finished = total - len(queue)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    stopping = {"requested": False}
+
+    def request_stop(signum, frame):
+        if stopping["requested"] and signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        stopping["requested"] = True
+        print(f"\n⏸️  {signal.Signals(signum).name}: finishing running jobs, no new ones will start "
+              "(Ctrl+C again to abort)")
+
+    previous = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    print(f"📦 {total} jobs: {finished} already finished, {len(queue)} to run")
+    started = time.monotonic()
+    completed = 0
+    capacity = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=capacity, initializer=_ignore_stop_signals)
+    aborted = False
+    broken = False
+
+    def leave_pending(key):
+        jobs[key]["state"] = "pending"
+        record_state(path, key, "pending")
+
+    try:
+        running = {}
+        while queue or running:
+            while queue and len(running) < capacity and not stopping["requested"] and not broken:
+                key = queue.popleft()
+                jobs[key]["state"] = "running"
+                jobs[key]["attempts"] += 1
+                record_state(path, key, "running", attempts=jobs[key]["attempts"])
+                try:
+                    future = pool.submit(run_job, jobs[key], engine, template, reader)
+                except BrokenProcessPool:
+                    broken = True
+                    leave_pending(key)
+                    break
+                running[future] = (key, time.monotonic())
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, began = running.pop(future)
+                seconds = round(time.monotonic() - began, 3)
+                try:
+                    output = future.result()
+                except BrokenProcessPool:
+                    # Not the job's fault: a worker died under it
+                    broken = True
+                    leave_pending(key)
+                    continue
+                except Exception as e:
+                    update = {"state": "failed", "error": f"{type(e).__name__}: {e}", "seconds": seconds}
+                    icon = "❌"
+                else:
+                    update = {"state": "done", "output": output, "error": None, "seconds": seconds}
+                    icon = "✅" if output else "➖"
+                jobs[key].update(update)
+                record_state(path, key, **update)
+                completed += 1
+                finished += 1
+                elapsed = time.monotonic() - started
+                rate = completed / elapsed if elapsed > 0 else 0.0
+                remaining = len(queue) + len(running)
+                eta = _format_eta(remaining / rate) if rate else "?"
+                print(f"[{finished}/{total}] {icon} {key} {seconds:.1f}s | "
+                      f"{rate * 60:.1f} jobs/min | ETA {eta}"
+                      + (f" | {update['error']}" if update["state"] == "failed" else ""))
+    except KeyboardInterrupt:
+        aborted = True
+        print("\n⛔ Aborted; running jobs stay marked running and are rerun on resume")
+        raise
+    finally:
+        pool.shutdown(wait=not aborted, cancel_futures=True)
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        compact_manifest(path, manifest)
+
+    counts = count_states(manifest)
+    if broken:
+        print(f"💥 Worker pool broke (a worker process died): {counts['pending']} jobs left; rerun to resume")
+    elif stopping["requested"]:
+        print(f"⏸️  Stopped: {counts['pending']} jobs left; rerun to resume")
+    return counts
+
+
+def print_manifest_status(path: str) -> None:
+    """Show per-state counts and failed jobs"""
+    manifest = load_manifest(path)
+    counts = count_states(manifest)
+    print("  ".join(f"{state}: {count}" for state, count in counts.items()))
+    for key, job in manifest["jobs"].items():
+        if job["state"] == "failed":
+            print(f"  ❌ {key}: {job['error']}")
+
+
+def main() -> None:
+    """Create, run or inspect a batch manifest"""
+    parser = argparse.ArgumentParser(description="Checkpointed, resumable batch generation and export")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="Write a manifest of store × day × seed jobs")
+    create.add_argument("manifest", help="Manifest file (e.g. roster_state/batches/nightly.json)")
+    create.add_argument("files", nargs="+", help="Roster workbooks or shift files")
+    create.add_argument("--days", nargs="*", choices=list(RosterConfig.STORE_HOURS), help="Days to generate")
+    create.add_argument("--seeds", type=int, nargs="+", default=[0], help="Seeds to generate each day with")
+    create.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    create.add_argument("--template", action="store_true", help="Export through cached pre-styled templates")
+    create.add_argument("--reader", choices=READER_BACKENDS, default=DEFAULT_READER_BACKEND,
+                        help="Weekly/Team workbook reader (see roster_readers)")
+
+    run = commands.add_parser("run", help="Run (or resume) a manifest's outstanding jobs")
+    run.add_argument("manifest", help="Manifest file")
+    run.add_argument("--workers", type=int, default=None, help="Worker processes")
+    run.add_argument("--retry-failed", action="store_true", help="Also rerun failed jobs")
+
+    status = commands.add_parser("status", help="Show job states")
+    status.add_argument("manifest", help="Manifest file")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        manifest = create_manifest(args.manifest, args.files, args.days, args.seeds, args.engine,
+                                   args.template, args.reader)
+        print(f"✅ {len(manifest['jobs'])} jobs written to {args.manifest}")
+    elif args.command == "run":
+        try:
+            counts = run_batch(args.manifest, args.workers, args.retry_failed)
+        except KeyboardInterrupt:
+            raise SystemExit(130)
+        print("  ".join(f"{state}: {count}" for state, count in counts.items()))
+    else:
+        print_manifest_status(args.manifest)
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_batch`
+
+class TestManifestJournal(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "batch.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_journal_replayed_over_manifest(self):
+        manifest = create_manifest(self.path, ["store.xlsx"], days=["M", "T"], seeds=[0, 1])
+        self.assertEqual(count_states(manifest)["pending"], 4)
+        record_state(self.path, "store:M:0", "running", attempts=1)
+        record_state(self.path, "store:M:0", "done", output="out.xlsx", seconds=1.5)
+        record_state(self.path, "store:T:1", "running", attempts=1)
+        with open(journal_path(self.path), "a", encoding="utf-8") as f:
+            f.write('{"job":"store:T:0","sta')  # torn last line
+
+        loaded = load_manifest(self.path)
+        self.assertEqual(loaded["jobs"]["store:M:0"]["state"], "done")
+        self.assertEqual(loaded["jobs"]["store:M:0"]["output"], "out.xlsx")
+        self.assertEqual(loaded["jobs"]["store:T:1"]["attempts"], 1)
+        self.assertEqual(count_states(loaded), {"pending": 2, "running": 1, "done": 1, "failed": 0})
+
+        compact_manifest(self.path, loaded)
+        self.assertFalse(os.path.exists(journal_path(self.path)))
+        self.assertEqual(load_manifest(self.path)["jobs"], loaded["jobs"])
+
+    def test_same_store_name_rejected(self):
+        with self.assertRaises(ValueError):
+            create_manifest(self.path, ["a/store.xlsx", "b/store.xlsx"])
+        self.assertFalse(os.path.exists(self.path))
+        # The same file listed twice is still one store
+        manifest = create_manifest(self.path, ["a/store.xlsx", "a/../a/store.xlsx"], days=["M"])
+        self.assertEqual(list(manifest["jobs"]), ["store:M:0"])
+
+class TestRunJob(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder)
+        with open("shifts.csv", "w", encoding="utf-8") as f:
+            f.write("employee_id,name,day,start,end\n")
+            for i in range(8):
+                f.write(f"{i},Emp{i},M,09:30,18:00\n")
+        with open("shifts.departments.csv", "w", encoding="utf-8") as f:
+            f.write("employee_id,name,department\n")
+            for i in range(8):
+                f.write(f"{i},Emp{i},M's\n")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder)
+
+    def test_workbook_read_once(self):
+        job = {"file": os.path.abspath("shifts.csv"), "day": "M", "seed": 0}
+        with mock.patch("roster_generator.read_from_excel", side_effect=AssertionError("read twice")):
+            exported = run_job(job, RosterConfig.DEFAULT_ENGINE)
+        self.assertEqual(exported, os.path.join(OUTPUT_DIR, "shifts_M_s0.xlsx"))
+        self.assertTrue(os.path.exists(exported))
+
+
+if __name__ == "__main__":
+    main()
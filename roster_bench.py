@@ -0,0 +1,270 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from helper import read_from_excel
+from roster_generator import RosterConfig, _initialize_roster_structure, fill_roster
+from roster_intervals import RosterIntervals
+from roster_printer import export_roster_to_excel
+from roster_readers import make_weekly_workbook
+from roster_time import time_grid
+
+# -----------------------------
+# Benchmark baselines
+# -----------------------------
+
+BASELINE_FORMAT = 1
+STAGES = ("read_from_excel", "fill_roster", "export_roster_to_excel")
+
+DEFAULT_HEADCOUNTS = [30, 120, 300]
+DEFAULT_DAYS = ["M", "Th", "Sa"]
+DEFAULT_REPEATS = 5
+
+# A slowdown is flagged when the median grows past the threshold and the difference is significant
+DEFAULT_TIME_THRESHOLD = 0.10
+DEFAULT_MEMORY_THRESHOLD = 0.20
+SIGNIFICANCE = 0.05
+
+
+def _cell_key(headcount: int, day: str, engine: str) -> str:
+    return f"{headcount}/{day}/{engine}"
+
+
+def _time_stage(run: Callable[[], object]) -> Tuple[float, object]:
+    start = time.perf_counter()
+    result = run()
+    return time.perf_counter() - start, result
+
+
+def _peak_kib(run: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def bench_cell(workbook: str, day: str, engine: str, repeats: int, seed: int = 0) -> Dict[str, Dict[str, object]]:
+    """Time each stage `repeats` times and measure its peak allocation once
+
+    Returns:
+        stage -> {"samples": [seconds, ...], "peak_kib": float}; {"error": str} if generation fails
+    """
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[day])
+    store_slots = grid.open_slots
+
+    def read():
+        return read_from_excel(day, workbook)
+
+    def fill(working_employees):
+        random.seed(seed)
+        slots = grid.shift_slots(working_employees)
+        departments = {emp: info["department"] for emp, info in working_employees.items()}
+        intervals = RosterIntervals()
+        roster = fill_roster(_initialize_roster_structure(store_slots), day, slots, departments,
+                             working_employees, intervals, engine=engine)
+        return roster, intervals
+
+    def export(working_employees, roster, intervals):
+        return export_roster_to_excel(roster, day, working_employees, filename=f"bench_{day}_{engine}.xlsx",
+                                      intervals=intervals)
+
+    results = {stage: {"samples": []} for stage in STAGES}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeats):
+                seconds, working_employees = _time_stage(read)
+                results["read_from_excel"]["samples"].append(seconds)
+                seconds, (roster, intervals) = _time_stage(lambda: fill(working_employees))
+                results["fill_roster"]["samples"].append(seconds)
+                seconds, _ = _time_stage(lambda: export(working_employees, roster, intervals))
+                results["export_roster_to_excel"]["samples"].append(seconds)
+
+            results["read_from_excel"]["peak_kib"] = _peak_kib(read)
+            results["fill_roster"]["peak_kib"] = _peak_kib(lambda: fill(working_employees))
+            results["export_roster_to_excel"]["peak_kib"] = _peak_kib(
+                lambda: export(working_employees, roster, intervals))
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+def run_matrix(headcounts: List[int], days: List[str], engines: List[str], repeats: int) -> Dict[str, object]:
+    """Run every headcount × day × engine cell on generated workbooks"""
+    results = {}
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Exports land in tmp/roster_output
+        os.chdir(tmp)
+        try:
+            for headcount in headcounts:
+                workbook = make_weekly_workbook(os.path.join(tmp, f"bench_{headcount}.xlsx"), headcount,
+                                                seed=headcount)
+                for day in days:
+                    for engine in engines:
+                        key = _cell_key(headcount, day, engine)
+                        print(f"⏱️  {key}", file=sys.stderr)
+                        results[key] = bench_cell(workbook, day, engine, repeats)
+        finally:
+            os.chdir(previous_dir)
+    return results
+
+
+def record_baseline(path: str, headcounts: List[int], days: List[str], engines: List[str],
+                    repeats: int, label: Optional[str] = None) -> Dict[str, object]:
+    """Run the matrix and save it as a baseline file"""
+    baseline = {
+        "format": BASELINE_FORMAT,
+        "label": label or datetime.datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "matrix": {"headcounts": headcounts, "days": days, "engines": engines, "repeats": repeats},
+        "results": run_matrix(headcounts, days, engines, repeats),
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=1)
+    return baseline
+
+
+def mann_whitney_p(slower: List[float], faster: List[float]) -> float:
+    """One-sided Mann-Whitney U p-value that `slower` tends to be larger (normal approximation)"""
+    n1, n2 = len(slower), len(faster)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted((value, group) for group, values in ((0, slower), (1, faster)) for value in values)
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tied = j - i + 1
+        tie_term += tied ** 3 - tied
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_results(baseline: Dict[str, object], current: Dict[str, object],
+                    time_threshold: float = DEFAULT_TIME_THRESHOLD,
+                    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD) -> List[Dict[str, object]]:
+    """Per cell and stage comparison rows; "regression" is set for flagged ones"""
+    rows = []
+    for key, stages in baseline["results"].items():
+        now = current.get(key)
+        if now is None or "error" in stages or "error" in now:
+            rows.append({"cell": key, "stage": "-", "note": (now or {}).get("error") or stages.get("error")
+                         or "missing", "regression": False})
+            continue
+        for stage in STAGES:
+            before, after = stages[stage], now[stage]
+            ratio = statistics.median(after["samples"]) / max(statistics.median(before["samples"]), 1e-9)
+            p_value = mann_whitney_p(after["samples"], before["samples"])
+            memory_ratio = after["peak_kib"] / max(before["peak_kib"], 1e-9)
+            slower = ratio > 1 + time_threshold and p_value < SIGNIFICANCE
+            bigger = memory_ratio > 1 + memory_threshold
+            rows.append({
+                "cell": key,
+                "stage": stage,
+                "before_ms": statistics.median(before["samples"]) * 1000,
+                "after_ms": statistics.median(after["samples"]) * 1000,
+                "ratio": ratio,
+                "p_value": p_value,
+                "memory_ratio": memory_ratio,
+                "regression": slower or bigger,
+                "note": ", ".join(n for n, flag in (("slower", slower), ("more memory", bigger)) if flag),
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, object]]) -> None:
+    """Print the comparison table"""
+    print(f"{'cell':<18} {'stage':<24} {'before':>10} {'after':>10} {'ratio':>7} {'p':>7} {'mem':>6}  note")
+    for row in rows:
+        if "ratio" not in row:
+            print(f"{row['cell']:<18} {row['stage']:<24} {'':>10} {'':>10} {'':>7} {'':>7} {'':>6}  {row['note']}")
+            continue
+        marker = "⚠️ " if row["regression"] else ""
+        print(f"{row['cell']:<18} {row['stage']:<24} {row['before_ms']:>8.1f}ms {row['after_ms']:>8.1f}ms "
+              f"{row['ratio']:>6.2f}x {row['p_value']:>7.3f} {row['memory_ratio']:>5.2f}x  {marker}{row['note']}")
+
+
+def main() -> None:
+    """Record or compare benchmark baselines"""
+    parser = argparse.ArgumentParser(description="Performance baselines for read, fill and export")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Run the matrix and save a baseline")
+    record.add_argument("--out", default=os.path.join("roster_state", "bench", "baseline.json"),
+                        help="Baseline file to write")
+    record.add_argument("--label", help="Version label stored in the baseline")
+    record.add_argument("--headcounts", type=int, nargs="+", default=DEFAULT_HEADCOUNTS)
+    record.add_argument("--days", nargs="+", choices=list(RosterConfig.STORE_HOURS), default=DEFAULT_DAYS)
+    record.add_argument("--engines", nargs="+", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=list(RosterConfig.ASSIGNMENT_ENGINES))
+    record.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+
+    compare = commands.add_parser("compare", help="Rerun a baseline's matrix and flag regressions")
+    compare.add_argument("baseline", help="Baseline file written by record")
+    compare.add_argument("--time-threshold", type=float, default=DEFAULT_TIME_THRESHOLD,
+                         help="Relative median slowdown to flag (0.10 = 10%%)")
+    compare.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                         help="Relative peak memory growth to flag")
+    compare.add_argument("--save", help="Also save the new run as a baseline here")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        baseline = record_baseline(args.out, args.headcounts, args.days, args.engines, args.repeats, args.label)
+        print(f"✅ Baseline '{baseline['label']}' with {len(baseline['results'])} cells written to {args.out}")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("format") != BASELINE_FORMAT:
+        raise SystemExit(f"❌ Unsupported baseline format: {baseline.get('format')}")
+    matrix = baseline["matrix"]
+    if args.save:
+        current = record_baseline(args.save, matrix["headcounts"], matrix["days"], matrix["engines"],
+                                  matrix["repeats"])
+    else:
+        current = {"results": run_matrix(matrix["headcounts"], matrix["days"], matrix["engines"],
+                                         matrix["repeats"])}
+
+    rows = compare_results(baseline, current["results"], args.time_threshold, args.memory_threshold)
+    print_comparison(rows)
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regressions against baseline '{baseline['label']}'")
+        sys.exit(1)
+    print(f"\n✅ No regressions against baseline '{baseline['label']}'")
+
+
+if __name__ == "__main__":
+    main()
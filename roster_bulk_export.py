@@ -0,0 +1,209 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+from helper import read_from_excel, store_name
+from roster_generator import RosterConfig, generate_roster
+from roster_intervals import RosterIntervals
+from roster_printer import export_roster_to_excel
+from roster_readers import DEFAULT_READER_BACKEND, READER_BACKENDS
+
+# -----------------------------
+# Parallel bulk export
+# -----------------------------
+
+OUTPUT_DIR = "roster_output"
+
+# (store label, roster, day, working employees)
+ExportJob = Tuple[str, Dict[int, Dict[str, List[str]]], str, Dict[str, Dict[str, str]]]
+
+
+def export_filename(store: str, current_day: str) -> str:
+    """Deterministic export file name for a store and day"""
+    return f"{store}_{current_day}.xlsx"
+
+
+def compact_job(store: str,
+                roster: Dict[int, Dict[str, List[str]]],
+                current_day: str,
+                working_employees: Dict[str, Dict[str, str]],
+                intervals: Optional[RosterIntervals] = None,
+                template: bool = False) -> Dict[str, object]:
+    """Reduce an export job to plain tuples and dicts that pickle cheaply
+
+    The roster is sent as per-employee (start, end, task) blocks plus the slot
+    list and task key order, which is all a worker needs to rebuild it.
+    """
+    if intervals is None:
+        intervals = RosterIntervals.from_roster(roster)
+    slots = sorted(roster)
+    return {
+        "store": store,
+        "day": current_day,
+        "slots": slots,
+        "tasks": list(roster[slots[0]]) if slots else [],
+        "blocks": dict(intervals.items()),
+        "employees": working_employees,
+        "template": template,
+    }
+
+
+def expand_job(job: Dict[str, object]) -> Tuple[Dict[int, Dict[str, List[str]]], RosterIntervals]:
+    """Rebuild the roster and interval view from a compact job"""
+    roster = {slot: {task: [] for task in job["tasks"]} for slot in job["slots"]}
+    intervals = RosterIntervals()
+    for emp, blocks in job["blocks"].items():
+        for start, end, task in blocks:
+            for slot in range(start, end):
+                if slot in roster:
+                    roster[slot].setdefault(task, []).append(emp)
+                intervals.add(emp, slot, task)
+    return roster, intervals
+
+
+def _export_worker(job: Dict[str, object]) -> str:
+    """Export one compact job, writing to a temporary name and renaming into place"""
+    roster, intervals = expand_job(job)
+    filename = export_filename(job["store"], job["day"])
+    # Keep the .xlsx suffix so the writer still picks the openpyxl engine
+    tmp_name = f".tmp_{os.getpid()}_{filename}"
+    tmp_path = os.path.join(OUTPUT_DIR, tmp_name)
+    final_path = os.path.join(OUTPUT_DIR, filename)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            exported = export_roster_to_excel(roster, job["day"], job["employees"],
+                                              filename=tmp_name, intervals=intervals,
+                                              template=job.get("template", False))
+        if exported is None:
+            raise RuntimeError(f"Export failed for {job['store']} ({job['day']})")
+        os.replace(exported, final_path)
+    except BaseException:
+        # A failed export can leave a partly written workbook under the temporary name
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return final_path
+
+
+def export_rosters_parallel(jobs: List[ExportJob],
+                            workers: Optional[int] = None,
+                            intervals: Optional[List[Optional[RosterIntervals]]] = None,
+                            template: bool = False) -> List[Optional[str]]:
+    """Export many rosters to roster_output/ using a process pool
+
+    Args:
+        jobs: (store label, roster, day, working employees) per export
+        workers: Worker processes (defaults to the CPU count)
+        intervals: Optional interval views matching jobs, reused to compact the rosters
+        template: Fill cached pre-styled templates instead of styling every cell
+
+    Returns:
+        Exported file paths in job order, None where an export failed
+    """
+    compact = [
+        compact_job(store, roster, day, employees, intervals[i] if intervals else None, template)
+        for i, (store, roster, day, employees) in enumerate(jobs)
+    ]
+    results: List[Optional[str]] = [None] * len(jobs)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_export_worker, job): i for i, job in enumerate(compact)}
+        for future, i in futures.items():
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                print(f"❌ {compact[i]['store']} ({compact[i]['day']}): {e}")
+    return results
+
+
+def main() -> None:
+    """Generate rosters for several workbooks and export them in parallel"""
+    parser = argparse.ArgumentParser(description="Generate rosters and export them on a process pool")
+    parser.add_argument("files", nargs="+", help="Roster workbooks (.xlsx)")
+    parser.add_argument("--days", nargs="*", choices=list(RosterConfig.STORE_HOURS), help="Days to export")
+    parser.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--template", action="store_true",
+                        help="Export by filling cached pre-styled templates (roster_state/templates)")
+    parser.add_argument("--reader", choices=READER_BACKENDS, default=DEFAULT_READER_BACKEND,
+                        help="Weekly/Team workbook reader (see roster_readers)")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    jobs, views = [], []
+    start = time.perf_counter()
+    for file_path in args.files:
+        for day in args.days or list(RosterConfig.STORE_HOURS):
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    working_employees = read_from_excel(day, file_path, args.reader)
+                    if not working_employees:
+                        continue
+                    intervals = RosterIntervals()
+                    roster = generate_roster(day, file_path, intervals, engine=args.engine,
+                                             working_employees=working_employees)
+            except Exception as e:
+                print(f"❌ {os.path.basename(file_path)} ({day}): {e}")
+                continue
+            jobs.append((store_name(file_path), roster, day, working_employees))
+            views.append(intervals)
+    generated = time.perf_counter()
+
+    results = export_rosters_parallel(jobs, args.workers, views, args.template)
+    done = time.perf_counter()
+    print(f"✅ Generated {len(jobs)} rosters in {generated - start:.2f}s, "
+          f"exported {sum(1 for r in results if r)} in {done - generated:.2f}s")
+
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_bulk_export`
+
+class TestExportWorker(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder)
+        roster = {slot: {"FR": ["Ann"], "GR": [], "R": []} for slot in range(40, 44)}
+        employees = {"Ann": {"shift": ("10:00", "11:00"), "department": "M's", "employee_id": "1", "hours": 1.0}}
+        self.job = compact_job("north", roster, "M", employees)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder)
+
+    def test_exported_under_final_name(self):
+        self.assertEqual(_export_worker(self.job), os.path.join(OUTPUT_DIR, "north_M.xlsx"))
+        self.assertEqual(os.listdir(OUTPUT_DIR), ["north_M.xlsx"])
+
+    def test_temporary_file_removed_on_failure(self):
+        def partial_export(roster, current_day, working_employees, filename=None, **kwargs):
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            with open(os.path.join(OUTPUT_DIR, filename), "wb") as f:
+                f.write(b"PK")
+            return None
+
+        with mock.patch("roster_bulk_export.export_roster_to_excel", partial_export):
+            with self.assertRaises(RuntimeError):
+                _export_worker(self.job)
+        self.assertEqual(os.listdir(OUTPUT_DIR), [])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+from typing import Dict, List, Optional, Tuple
+
+from helper import file_digest, read_from_excel, store_name
+from roster_generator import RosterConfig, generate_roster
+from roster_input import departments_file_for, is_shift_file
+from roster_intervals import RosterIntervals
+from roster_printer import export_roster_to_excel
+from roster_readers import DEFAULT_READER_BACKEND, READER_BACKENDS
+
+# -----------------------------
+# Result cache
+# -----------------------------
+
+# Bump when the cached entry layout or generation semantics change
+CACHE_VERSION = 2
+ENTRY_SUFFIX = ".entry"
+# Entries of earlier layouts: never read, but counted and evicted like current ones
+LEGACY_SUFFIXES = (".pkl",)
+
+
+def config_fingerprint() -> str:
+    """Hash of every RosterConfig constant that can change a generated roster"""
+    digest = hashlib.sha256()
+    for name in sorted(vars(RosterConfig)):
+        if not name.isupper() or name.startswith("RESULT_CACHE"):
+            continue
+        digest.update(f"{name}={getattr(RosterConfig, name)!r};".encode("utf-8"))
+    if os.path.exists(RosterConfig.ELIGIBILITY_RULES_FILE):
+        digest.update(file_digest(RosterConfig.ELIGIBILITY_RULES_FILE).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def result_key(file_path: str, day: str, engine: str, seed: int,
+               reader: str = DEFAULT_READER_BACKEND) -> str:
+    """Content address of one seeded generate + export run"""
+    parts = [str(CACHE_VERSION), file_digest(file_path), day, engine, str(seed), reader, config_fingerprint()]
+    departments_path = departments_file_for(file_path) if is_shift_file(file_path) else None
+    if departments_path:
+        parts.append(file_digest(departments_path))
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def encode_entry(entry: Dict[str, object]) -> bytes:
+    """Serialise a cached result: one line of JSON, then the raw exported workbook
+
+    The JSON line holds the roster and working employees; no code is ever loaded
+    from the cache directory, so a shared directory cannot run anything on read.
+    """
+    header = {
+        "roster": {str(slot): tasks for slot, tasks in entry["roster"].items()},
+        "working_employees": entry["working_employees"],
+        "has_xlsx": entry["xlsx"] is not None,
+    }
+    return json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n" + (entry["xlsx"] or b"")
+
+
+def decode_entry(data: bytes) -> Dict[str, object]:
+    """Inverse of encode_entry; raises ValueError, KeyError or TypeError on a malformed entry"""
+    line, _, xlsx = data.partition(b"\n")
+    header = json.loads(line.decode("utf-8"))
+    working_employees = header["working_employees"]
+    for info in working_employees.values():
+        info["shift"] = tuple(info["shift"])
+    return {
+        "roster": {int(slot): tasks for slot, tasks in header["roster"].items()},
+        "working_employees": working_employees,
+        "xlsx": xlsx if header["has_xlsx"] else None,
+    }
+
+
+class ResultCache:
+    """Directory of cached results, evicted least-recently-used past a size cap
+
+    Each entry holds the roster and working employees as JSON followed by the
+    exported workbook's raw bytes (see encode_entry). Entries are written through
+    a temporary file and os.replace, so workers sharing the directory never read
+    a partial entry. Reads refresh the entry's modification time, which is what
+    eviction orders by.
+    """
+
+    def __init__(self, directory: str = RosterConfig.RESULT_CACHE_DIR,
+                 max_bytes: int = RosterConfig.RESULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        """Cached entry for key, or None
+
+        An entry that cannot be decoded (truncated, or written by an incompatible
+        version) is deleted and treated as a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            entry = decode_entry(data)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Corrupt entry: drop it so the regenerated result replaces it
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, object]) -> None:
+        """Store entry atomically, then evict down to the size cap"""
+        data = encode_entry(entry)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".result_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every entry, least recently used first"""
+        found = []
+        for name in os.listdir(self.directory):
+            if not name.endswith((ENTRY_SUFFIX,) + LEGACY_SUFFIXES):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Evicted by another worker
+                continue
+            found.append((stat.st_mtime, stat.st_size, path))
+        return sorted(found)
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+def _write_bytes_atomic(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".export_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def cached_generate(file_path: str,
+                    current_day: str,
+                    engine: str = RosterConfig.DEFAULT_ENGINE,
+                    seed: int = 0,
+                    cache: Optional[ResultCache] = None,
+                    filename: Optional[str] = None,
+                    reader: str = DEFAULT_READER_BACKEND) -> Tuple[Dict[int, Dict[str, List[str]]], Dict[str, Dict[str, str]], Optional[str], bool]:
+    """Generate and export a seeded roster, reusing a cached result when inputs match
+
+    Args:
+        file_path: Path to the Excel workbook
+        current_day: Day of the week
+        engine: CS assignment engine, one of RosterConfig.ASSIGNMENT_ENGINES
+        seed: Seed for the generator's random choices
+        cache: Result cache (the default directory and size cap if not given)
+        filename: Export file name inside roster_output (default <store>_<day>.xlsx)
+        reader: Weekly/Team workbook reader, one of roster_readers.READER_BACKENDS
+
+    Returns:
+        (roster, working employees, exported file path or None, whether it was a cache hit)
+    """
+    cache = cache or ResultCache()
+    filename = filename or f"{store_name(file_path)}_{current_day}.xlsx"
+    key = result_key(file_path, current_day, engine, seed, reader)
+
+    entry = cache.get(key)
+    if entry is not None:
+        exported = None
+        if entry["xlsx"] is not None:
+            exported = os.path.join("roster_output", filename)
+            _write_bytes_atomic(exported, entry["xlsx"])
+        return entry["roster"], entry["working_employees"], exported, True
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        working_employees = read_from_excel(current_day, file_path, reader)
+        random.seed(seed)
+        intervals = RosterIntervals()
+        roster = generate_roster(current_day, file_path, intervals, engine=engine,
+                                 working_employees=working_employees)
+        exported = None
+        if working_employees:
+            exported = export_roster_to_excel(roster, current_day, working_employees,
+                                              filename=filename, intervals=intervals)
+
+    xlsx = None
+    if exported is not None:
+        with open(exported, "rb") as f:
+            xlsx = f.read()
+    cache.put(key, {"roster": roster, "working_employees": working_employees, "xlsx": xlsx})
+    return roster, working_employees, exported, False
+
+
+def main() -> None:
+    """Generate rosters through the result cache from the command line"""
+    parser = argparse.ArgumentParser(description="Generate and export rosters through the result cache")
+    parser.add_argument("file_path", help="Roster workbook (.xlsx)")
+    parser.add_argument("days", nargs="*", choices=list(RosterConfig.STORE_HOURS), help="Days to generate")
+    parser.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--cache-dir", default=RosterConfig.RESULT_CACHE_DIR, help="Cache directory")
+    parser.add_argument("--max-mb", type=float, default=RosterConfig.RESULT_CACHE_MAX_BYTES / (1024 * 1024),
+                        help="Cache size cap in megabytes")
+    parser.add_argument("--reader", choices=READER_BACKENDS, default=DEFAULT_READER_BACKEND,
+                        help="Weekly/Team workbook reader (see roster_readers)")
+    args = parser.parse_args()
+
+    cache = ResultCache(args.cache_dir, int(args.max_mb * 1024 * 1024))
+    for day in args.days or list(RosterConfig.STORE_HOURS):
+        start = time.perf_counter()
+        _, _, exported, hit = cached_generate(args.file_path, day, args.engine, args.seed, cache,
+                                                   reader=args.reader)
+        status = "hit" if hit else "miss"
+        print(f"{'⚡' if hit else '🔄'} {day}: cache {status} in {time.perf_counter() - start:.3f}s -> {exported}")
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_cache`
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResultCache(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.cache.directory)
+
+    def _entry(self, xlsx=b"PK\x03\x04\n\x00raw"):
+        return {
+            "roster": {40: {"R": ["Ann"]}, 41: {"R": []}},
+            "working_employees": {"Ann": {"shift": ("10:00", "18:00"), "department": "M's",
+                                          "employee_id": 7, "hours": 8.0}},
+            "xlsx": xlsx,
+        }
+
+    def test_round_trip(self):
+        for xlsx in (b"PK\x03\x04\n\x00raw", b"", None):
+            self.cache.put("k", self._entry(xlsx))
+            self.assertEqual(self.cache.get("k"), self._entry(xlsx))
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_entry_is_json_and_raw_bytes(self):
+        self.cache.put("k", self._entry())
+        with open(self.cache._path("k"), "rb") as f:
+            line, _, xlsx = f.read().partition(b"\n")
+        self.assertEqual(json.loads(line)["roster"], {"40": {"R": ["Ann"]}, "41": {"R": []}})
+        self.assertEqual(xlsx, b"PK\x03\x04\n\x00raw")
+
+    def test_undecodable_entry_is_dropped(self):
+        # Truncated JSON, a pickle from the previous layout, invalid UTF-8, wrong shape
+        for payload in (b'{"roster": {', b"\x80\x05cgone\nx\n.", b"\xff\xfe\n", b"[1, 2]\n"):
+            with open(self.cache._path("k"), "wb") as f:
+                f.write(payload)
+            self.assertIsNone(self.cache.get("k"))
+            self.assertFalse(os.path.exists(self.cache._path("k")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,531 @@
+import argparse
+import cmd
+import contextlib
+import io
+import random
+import copy
+import shlex
+import sys
+import unittest
+from typing import Dict, List, Optional, Set, Tuple
+
+from helper import read_from_excel
+from roster_eligibility import DEFAULT_ELIGIBILITY_RULES, normalize_department_key
+from roster_generator import (
+    RosterConfig,
+    _get_task_requirements,
+    break_batches,
+    generate_roster,
+)
+from roster_intervals import RosterIntervals
+from roster_printer import export_roster_to_excel, slot_to_time
+from roster_time import time_grid
+
+# -----------------------------
+# Interactive roster editing
+# -----------------------------
+
+BREAK_TASK = "40"
+SHORT_BREAK_TASK = "10"
+# A 40-minute break spans three 15-minute slots and is followed by the 10-minute break
+BREAK_SLOTS = 3
+
+# (kind, slot, task, employee, position in the slot's task list); kind is "add" or "remove"
+Op = Tuple[str, int, str, str, int]
+
+
+class RosterEditor:
+    """Edit a generated roster while keeping its rule status current
+
+    Every edit is broken into single-slot add/remove operations. Each operation
+    updates per-slot CS coverage shortfalls, per-employee occupancy (double
+    bookings, slots outside the shift) and per-employee break counters in
+    constant time, so status is always current without rescanning the roster.
+    Undo and redo replay the inverse or original operations from a log instead
+    of keeping roster copies.
+    """
+
+    def __init__(self, roster: Dict[int, Dict[str, List[str]]], current_day: str,
+                 working_employees: Dict[str, Dict[str, object]],
+                 intervals: Optional[RosterIntervals] = None):
+        self.roster = roster
+        self.current_day = current_day
+        self.working_employees = working_employees
+        self.intervals = intervals if intervals is not None else RosterIntervals.from_roster(roster)
+        self.shift_slots = time_grid(hours=RosterConfig.STORE_HOURS[current_day]).shift_slots(working_employees)
+
+        slots = sorted(roster)
+        # (slot, task) -> seats required, for CS tasks only
+        self.required = {
+            (slot, task): _get_task_requirements(task, slot, idx, current_day, roster)[1]
+            for idx, slot in enumerate(slots) for task in RosterConfig.CUSTOMER_SERVICE_TASKS
+        }
+        self.break_required = self._break_required_employees()
+
+        # emp -> slot -> tasks held (more than one is a double booking)
+        self._held: Dict[str, Dict[int, List[str]]] = {}
+        self._double: Set[Tuple[str, int]] = set()
+        self._off_shift: Set[Tuple[str, int]] = set()
+        # (slot, task) -> seats missing
+        self._gaps: Dict[Tuple[int, str], int] = {
+            key: seats for key, seats in self.required.items() if seats > 0
+        }
+        # emp -> [40-minute break slots, 10-minute break slots, separate 40-minute runs]
+        self._breaks: Dict[str, List[int]] = {}
+        self._break_problems: Set[str] = set(self.break_required)
+
+        for slot in slots:
+            for task, employees in roster[slot].items():
+                for emp in employees:
+                    self._count(slot, task, emp, 1)
+
+        self._undo: List[List[Op]] = []
+        self._redo: List[List[Op]] = []
+        self._pending: Optional[List[Op]] = None
+
+    def _break_required_employees(self) -> Set[str]:
+        """Employees the generator gives a break, per break_batches"""
+        shift_slots = {emp: s for emp, s in self.shift_slots.items() if s}
+        return {emp for batch, _ in break_batches(self.current_day, shift_slots, self.working_employees)
+                for emp in batch}
+
+    # -----------------------------
+    # Incremental bookkeeping
+    # -----------------------------
+
+    def _count(self, slot: int, task: str, emp: str, delta: int) -> None:
+        """Update every counter for one employee entering (+1) or leaving (-1) a task at slot"""
+        held = self._held.setdefault(emp, {}).setdefault(slot, [])
+        if delta > 0:
+            held.append(task)
+        else:
+            held.remove(task)
+        if len(held) > 1:
+            self._double.add((emp, slot))
+        else:
+            self._double.discard((emp, slot))
+        shift = self.shift_slots.get(emp)
+        if held and (shift is None or slot not in shift):
+            self._off_shift.add((emp, slot))
+        elif not held:
+            self._off_shift.discard((emp, slot))
+            del self._held[emp][slot]
+
+        key = (slot, task)
+        if key in self.required:
+            missing = self.required[key] - len(self.roster[slot][task])
+            if missing > 0:
+                self._gaps[key] = missing
+            else:
+                self._gaps.pop(key, None)
+
+        if task in (BREAK_TASK, SHORT_BREAK_TASK):
+            counters = self._breaks.setdefault(emp, [0, 0, 0])
+            if task == BREAK_TASK:
+                counters[0] += delta
+                if held.count(BREAK_TASK) == (1 if delta > 0 else 0):
+                    # Joining two neighbours merges runs; an isolated slot starts one
+                    neighbours = sum(BREAK_TASK in self._held[emp].get(s, ()) for s in (slot - 1, slot + 1))
+                    counters[2] += delta * (1 - neighbours)
+            else:
+                counters[1] += delta
+            self._check_breaks(emp)
+
+    def _check_breaks(self, emp: str) -> None:
+        n40, n10, runs = self._breaks.get(emp, (0, 0, 0))
+        required = emp in self.break_required
+        if (required and (n40 != BREAK_SLOTS or n10 != 1 or runs != 1)) or (not required and n40):
+            self._break_problems.add(emp)
+        else:
+            self._break_problems.discard(emp)
+
+    def _apply(self, kind: str, slot: int, task: str, emp: str, position: Optional[int] = None) -> None:
+        """Apply one operation and log it with its list position, so undo restores the exact order"""
+        employees = self.roster[slot][task]
+        if kind == "add":
+            position = len(employees) if position is None else position
+            employees.insert(position, emp)
+            self.intervals.add(emp, slot, task)
+            self._count(slot, task, emp, 1)
+        else:
+            position = employees.index(emp) if position is None else position
+            del employees[position]
+            self.intervals.remove(emp, slot, task)
+            self._count(slot, task, emp, -1)
+        if self._pending is not None:
+            self._pending.append((kind, slot, task, emp, position))
+
+    @contextlib.contextmanager
+    def _edit(self):
+        """Group the operations of one edit into a single undo step"""
+        self._pending = []
+        try:
+            yield
+        except BaseException:
+            # Roll back a half-applied edit
+            pending, self._pending = self._pending, None
+            for op in reversed(pending):
+                self._apply(*_inverse(op))
+            raise
+        ops, self._pending = self._pending, None
+        if ops:
+            self._undo.append(ops)
+            self._redo.clear()
+
+    # -----------------------------
+    # Edits
+    # -----------------------------
+
+    def _slots(self, start: int, end: Optional[int]) -> range:
+        end = start + 1 if end is None else end
+        if start not in self.roster or end - 1 not in self.roster or end <= start:
+            raise ValueError(f"Slots {start}-{end} are outside the roster "
+                             f"({min(self.roster)}-{max(self.roster) + 1})")
+        return range(start, end)
+
+    def _check_task(self, task: str) -> None:
+        if task not in self.roster[min(self.roster)]:
+            raise ValueError(f"Unknown task: {task}")
+
+    def _clear(self, emp: str, slot: int) -> None:
+        for task in list(self._held.get(emp, {}).get(slot, ())):
+            self._apply("remove", slot, task, emp)
+
+    def department_task(self, emp: str) -> Optional[str]:
+        """Roster key for emp's own department, or None if it has no column"""
+        raw = self.working_employees.get(emp, {}).get("department")
+        dept = normalize_department_key(raw)
+        first = self.roster[min(self.roster)]
+        return dept if dept in first else (raw if raw in first else None)
+
+    def assign(self, emp: str, task: str, start: int, end: Optional[int] = None) -> None:
+        """Put emp on task for slots [start, end), replacing whatever they held"""
+        self._check_task(task)
+        with self._edit():
+            for slot in self._slots(start, end):
+                self._clear(emp, slot)
+                self._apply("add", slot, task, emp)
+
+    def unassign(self, emp: str, start: int, end: Optional[int] = None) -> None:
+        """Clear emp's tasks for slots [start, end)"""
+        with self._edit():
+            for slot in self._slots(start, end):
+                self._clear(emp, slot)
+
+    def swap(self, first: str, second: str, start: int, end: Optional[int] = None) -> None:
+        """Exchange two employees' tasks for slots [start, end)"""
+        if first == second:
+            raise ValueError("Cannot swap an employee with themselves")
+        with self._edit():
+            for slot in self._slots(start, end):
+                first_tasks = list(self._held.get(first, {}).get(slot, ()))
+                second_tasks = list(self._held.get(second, {}).get(slot, ()))
+                self._clear(first, slot)
+                self._clear(second, slot)
+                for task in second_tasks:
+                    self._apply("add", slot, task, first)
+                for task in first_tasks:
+                    self._apply("add", slot, task, second)
+
+    def move_break(self, emp: str, start: int) -> None:
+        """Move emp's 40- and 10-minute breaks to start at slot
+
+        The old break slots go back to emp's department.
+        """
+        new_slots = self._slots(start, start + BREAK_SLOTS + 1)
+        department = self.department_task(emp)
+        old_slots = [
+            slot for slot, tasks in self._held.get(emp, {}).items()
+            if BREAK_TASK in tasks or SHORT_BREAK_TASK in tasks
+        ]
+        with self._edit():
+            for slot in old_slots:
+                for task in (BREAK_TASK, SHORT_BREAK_TASK):
+                    if task in self._held.get(emp, {}).get(slot, ()):
+                        self._apply("remove", slot, task, emp)
+                if department and slot not in new_slots and not self._held.get(emp, {}).get(slot):
+                    self._apply("add", slot, department, emp)
+            for slot in new_slots:
+                self._clear(emp, slot)
+                task = BREAK_TASK if slot < start + BREAK_SLOTS else SHORT_BREAK_TASK
+                self._apply("add", slot, task, emp)
+
+    def undo(self) -> bool:
+        """Revert the last edit; False if there is nothing to undo"""
+        if not self._undo:
+            return False
+        ops = self._undo.pop()
+        for op in reversed(ops):
+            self._apply(*_inverse(op))
+        self._redo.append(ops)
+        return True
+
+    def redo(self) -> bool:
+        """Reapply the last undone edit; False if there is nothing to redo"""
+        if not self._redo:
+            return False
+        ops = self._redo.pop()
+        for op in ops:
+            self._apply(*op)
+        self._undo.append(ops)
+        return True
+
+    # -----------------------------
+    # Status
+    # -----------------------------
+
+    def status(self) -> Dict[str, int]:
+        """Counts of open problems"""
+        return {
+            "coverage_gaps": len(self._gaps),
+            "double_booked": len(self._double),
+            "off_shift": len(self._off_shift),
+            "break_problems": len(self._break_problems),
+        }
+
+    def coverage_gaps(self) -> List[Tuple[int, str, int]]:
+        """(slot, task, seats missing) for under-covered CS tasks"""
+        return sorted((slot, task, missing) for (slot, task), missing in self._gaps.items())
+
+    def double_bookings(self) -> List[Tuple[str, int, List[str]]]:
+        """(employee, slot, tasks) for employees holding more than one task"""
+        return sorted((emp, slot, list(self._held[emp][slot])) for emp, slot in self._double)
+
+    def off_shift(self) -> List[Tuple[str, int]]:
+        """(employee, slot) assignments outside the employee's shift"""
+        return sorted(self._off_shift)
+
+    def break_problems(self) -> List[Tuple[str, str]]:
+        """(employee, description) for employees whose breaks break the rules"""
+        problems = []
+        for emp in sorted(self._break_problems):
+            n40, n10, runs = self._breaks.get(emp, (0, 0, 0))
+            if emp not in self.break_required:
+                problems.append((emp, f"has {n40} break slots but no break is due"))
+            elif not n40 and not n10:
+                problems.append((emp, "no break"))
+            else:
+                problems.append((emp, f"{n40}/{BREAK_SLOTS} 40-min slots in {runs} block(s), {n10}/1 10-min"))
+        return problems
+
+    def export(self, filename: Optional[str] = None) -> Optional[str]:
+        """Export the edited roster to Excel"""
+        return export_roster_to_excel(self.roster, self.current_day, self.working_employees,
+                                      filename=filename, intervals=self.intervals)
+
+
+def _inverse(op: Op) -> Op:
+    kind, slot, task, emp, position = op
+    return ("remove" if kind == "add" else "add", slot, task, emp, position)
+
+
+def parse_slot(text: str) -> int:
+    """Slot number from "HH:MM" or a bare slot number"""
+    return time_grid().slot(text) if ":" in text else int(text)
+
+
+# -----------------------------
+# REPL
+# -----------------------------
+
+class RosterShell(cmd.Cmd):
+    """Command loop over a RosterEditor; times are HH:MM or slot numbers, ranges are [from, to)"""
+
+    intro = "Roster editor. Type help or ? to list commands."
+    prompt = "roster> "
+
+    def __init__(self, editor: RosterEditor, stdin=None):
+        super().__init__(stdin=stdin)
+        if stdin is not None:
+            self.use_rawinput = False
+        self.editor = editor
+
+    def _run(self, arg: str, usage: str, count: Tuple[int, int], edit) -> None:
+        try:
+            args = shlex.split(arg)
+            if not count[0] <= len(args) <= count[1]:
+                print(f"Usage: {usage}")
+                return
+            edit(args)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        self._print_status()
+
+    def _print_status(self) -> None:
+        status = self.editor.status()
+        ok = not any(status.values())
+        print(("✅ " if ok else "⚠️ ") + ", ".join(f"{k.replace('_', ' ')}: {v}" for k, v in status.items()))
+
+    def do_move(self, arg: str) -> None:
+        """move EMPLOYEE TASK FROM [TO] - put an employee on a task"""
+        self._run(arg, "move EMPLOYEE TASK FROM [TO]", (3, 4), lambda a: self.editor.assign(
+            a[0], a[1], parse_slot(a[2]), parse_slot(a[3]) if len(a) > 3 else None))
+
+    def do_clear(self, arg: str) -> None:
+        """clear EMPLOYEE FROM [TO] - remove an employee's tasks"""
+        self._run(arg, "clear EMPLOYEE FROM [TO]", (2, 3), lambda a: self.editor.unassign(
+            a[0], parse_slot(a[1]), parse_slot(a[2]) if len(a) > 2 else None))
+
+    def do_swap(self, arg: str) -> None:
+        """swap EMPLOYEE EMPLOYEE FROM [TO] - exchange two employees' tasks"""
+        self._run(arg, "swap EMPLOYEE EMPLOYEE FROM [TO]", (3, 4), lambda a: self.editor.swap(
+            a[0], a[1], parse_slot(a[2]), parse_slot(a[3]) if len(a) > 3 else None))
+
+    def do_break(self, arg: str) -> None:
+        """break EMPLOYEE FROM - move an employee's breaks to start at FROM"""
+        self._run(arg, "break EMPLOYEE FROM", (2, 2), lambda a: self.editor.move_break(a[0], parse_slot(a[1])))
+
+    def do_undo(self, arg: str) -> None:
+        """undo - revert the last edit"""
+        if not self.editor.undo():
+            print("Nothing to undo")
+        self._print_status()
+
+    def do_redo(self, arg: str) -> None:
+        """redo - reapply the last undone edit"""
+        if not self.editor.redo():
+            print("Nothing to redo")
+        self._print_status()
+
+    def do_status(self, arg: str) -> None:
+        """status - list every open problem"""
+        for slot, task, missing in self.editor.coverage_gaps():
+            print(f"  {slot_to_time(slot)} {task}: {missing} short")
+        for emp, slot, tasks in self.editor.double_bookings():
+            print(f"  {slot_to_time(slot)} {emp}: double-booked on {', '.join(tasks)}")
+        for emp, slot in self.editor.off_shift():
+            print(f"  {slot_to_time(slot)} {emp}: outside shift")
+        for emp, problem in self.editor.break_problems():
+            print(f"  {emp}: {problem}")
+        self._print_status()
+
+    def do_show(self, arg: str) -> None:
+        """show FROM [TO] - print assignments for slots"""
+        try:
+            args = shlex.split(arg)
+            start = parse_slot(args[0])
+            end = parse_slot(args[1]) if len(args) > 1 else start + 1
+        except (ValueError, IndexError):
+            print("Usage: show FROM [TO]")
+            return
+        for slot in range(start, end):
+            tasks = self.editor.roster.get(slot)
+            if tasks is None:
+                continue
+            print(f"{slot_to_time(slot)}  " + "  ".join(f"{task}: {', '.join(emps)}"
+                                                       for task, emps in tasks.items() if emps))
+
+    def do_who(self, arg: str) -> None:
+        """who EMPLOYEE - print an employee's blocks"""
+        emp = arg.strip()
+        for start, end, task in self.editor.intervals.intervals(emp):
+            print(f"  {slot_to_time(start)}-{slot_to_time(end)} {task}")
+
+    def do_export(self, arg: str) -> None:
+        """export [FILENAME] - write the edited roster to Excel"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            exported = self.editor.export(arg.strip() or None)
+        print(f"📊 Exported to {exported}" if exported else "❌ Export failed")
+
+    def do_quit(self, arg: str) -> bool:
+        """quit - leave the editor"""
+        return True
+
+    do_EOF = do_quit
+
+
+def main() -> None:
+    """Generate a roster and open it in the editor"""
+    parser = argparse.ArgumentParser(description="Edit a generated roster with live rule checks")
+    parser.add_argument("file", help="Roster workbook or shift file")
+    parser.add_argument("day", choices=list(RosterConfig.STORE_HOURS), help="Day to generate")
+    parser.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible roster")
+    parser.add_argument("--script", help="Read commands from this file instead of the terminal")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    intervals = RosterIntervals()
+    with contextlib.redirect_stdout(io.StringIO()):
+        working_employees = read_from_excel(args.day, args.file)
+        roster = generate_roster(args.day, args.file, intervals, engine=args.engine)
+
+    editor = RosterEditor(roster, args.day, working_employees, intervals)
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            shell = RosterShell(editor, stdin=f)
+            shell.intro = None
+            shell.prompt = ""
+            shell.cmdloop()
+        return
+    if not sys.stdin.isatty():
+        shell = RosterShell(editor, stdin=sys.stdin)
+        shell.prompt = ""
+    else:
+        shell = RosterShell(editor)
+    shell.cmdloop()
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_editor`
+
+class TestEditorUndoRedo(unittest.TestCase):
+    def setUp(self):
+        departments = ["M's", "L's", "Acc.", "HH", "SPV", "H&B"]
+        shifts = [("09:30", "18:00"), ("09:30", "14:30"), ("13:00", "18:00")]
+        self.working_employees = {
+            f"E{i}": {"shift": shifts[i % 3], "department": departments[i % len(departments)],
+                      "employee_id": None, "hours": time_grid().minutes(shifts[i % 3]) / 60}
+            for i in range(10)
+        }
+        random.seed(1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.roster = generate_roster("M", working_employees=self.working_employees,
+                                          rules=DEFAULT_ELIGIBILITY_RULES)
+
+    def _snapshot(self, editor):
+        return copy.deepcopy(editor.roster), editor.status(), editor.intervals.intervals("E0")
+
+    def test_undo_and_redo_replay_edits(self):
+        editor = RosterEditor(self.roster, "M", self.working_employees)
+        states = [self._snapshot(editor)]
+        rng = random.Random(3)
+        slots = sorted(editor.roster)
+        for _ in range(25):
+            emp, other = rng.sample(sorted(self.working_employees), 2)
+            start = rng.choice(slots[:-6])
+            edit = rng.randrange(4)
+            if edit == 0:
+                editor.assign(emp, rng.choice(RosterConfig.CUSTOMER_SERVICE_TASKS), start, start + 3)
+            elif edit == 1:
+                editor.unassign(emp, start, start + 2)
+            elif edit == 2:
+                editor.swap(emp, other, start, start + 4)
+            else:
+                editor.move_break(emp, start)
+            states.append(self._snapshot(editor))
+
+        for state in reversed(states[:-1]):
+            self.assertTrue(editor.undo())
+            self.assertEqual(self._snapshot(editor), state)
+        self.assertFalse(editor.undo())
+        for state in states[1:]:
+            self.assertTrue(editor.redo())
+            self.assertEqual(self._snapshot(editor), state)
+        self.assertFalse(editor.redo())
+
+    def test_status_matches_fresh_editor(self):
+        editor = RosterEditor(self.roster, "M", self.working_employees)
+        editor.unassign("E0", min(editor.roster), max(editor.roster) + 1)
+        editor.assign("E1", "R", min(editor.roster), min(editor.roster) + 4)
+        fresh = RosterEditor(copy.deepcopy(editor.roster), "M", self.working_employees)
+        self.assertEqual(editor.status(), fresh.status())
+        self.assertEqual(editor.coverage_gaps(), fresh.coverage_gaps())
+
+if __name__ == "__main__":
+    main()
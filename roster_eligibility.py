@@ -0,0 +1,319 @@
+import json
+import os
+import unittest
+from typing import Dict, List, Optional, Tuple
+
+from roster_time import time_grid
+
+# -----------------------------
+# Task eligibility rules
+# -----------------------------
+
+# Workbook department codes -> roster task keys
+DEPARTMENT_ALIASES = {
+    "M": "M's",
+    "L": "L's",
+    "Acc": "Acc.",
+    "Stat": "Stat.",
+}
+MANAGEMENT_DEPARTMENTS = ("SPV", "ASM", "SM", "ADM")
+
+
+def normalize_department_key(department: str) -> str:
+    """Map a workbook department code to its roster key (M -> M's, ...)"""
+    return DEPARTMENT_ALIASES.get(department, department)
+
+
+# task -> rule. The first tier is the primary pool and later tiers form the
+# fallback pool, used when nobody in the primary pool is free. A tier matches employees whose
+# department is in "departments" (all when absent) and not in "exclude", plus anyone
+# listed in "employees" (names or employee IDs). "window" limits a tier to
+# [start, end) times, running past midnight when end is before start. "deny"
+# lists employees never eligible. Employees must be on shift for more than
+# "end_buffer" slots after the current one.
+DEFAULT_ELIGIBILITY_RULES = {
+    "FR": {
+        "end_buffer": 2,
+        "tiers": [
+            {"departments": ["M's", "L's", "Acc."], "exclude": list(MANAGEMENT_DEPARTMENTS)},
+            {"exclude": list(MANAGEMENT_DEPARTMENTS)},
+        ],
+    },
+    "GR": {"end_buffer": 2, "tiers": [{"exclude": list(MANAGEMENT_DEPARTMENTS)}]},
+    "R": {"end_buffer": 2, "tiers": [{"exclude": ["ADM"]}]},
+}
+
+SKILLS_SHEET = "Skills"
+SKILLS_COLUMNS = ("Task", "Tier", "Departments", "Exclude", "Employees", "From", "To", "End Buffer")
+
+
+def _split_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [part.strip() for part in str(value).split(",") if part.strip()]
+
+
+def validate_rules(rules: Dict[str, Dict[str, object]]) -> Dict[str, Dict[str, object]]:
+    """Check a rule table's shape
+
+    Raises:
+        ValueError: On a malformed rule
+    """
+    for task, rule in rules.items():
+        if not isinstance(rule, dict) or not isinstance(rule.get("tiers"), list) or not rule["tiers"]:
+            raise ValueError(f"Eligibility rule for {task} needs a non-empty 'tiers' list")
+        for tier in rule["tiers"]:
+            unknown = set(tier) - {"departments", "exclude", "employees", "window"}
+            if unknown:
+                raise ValueError(f"Unknown keys in {task} tier: {sorted(unknown)}")
+            window = tier.get("window")
+            if window is not None and len(window) != 2:
+                raise ValueError(f"{task} tier window must be [start, end]")
+    return rules
+
+
+def load_rules_file(path: str) -> Dict[str, Dict[str, object]]:
+    """Read a JSON rule table (same shape as DEFAULT_ELIGIBILITY_RULES)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return validate_rules(json.load(f))
+
+
+def load_rules_sheet(file_path: str) -> Optional[Dict[str, Dict[str, object]]]:
+    """Read the rule table from a workbook's Skills sheet, or None if it has none
+
+    One row per tier: Task, Tier (1 = primary, 2+ = fallback, or "deny"),
+    Departments, Exclude and Employees (comma-separated), optional From/To
+    times and End Buffer. Tasks not listed keep their default rule.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if SKILLS_SHEET not in workbook.sheetnames:
+            return None
+        rows = workbook[SKILLS_SHEET].iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        index = {name: header.index(name) for name in SKILLS_COLUMNS if name in header}
+        if "Task" not in index or "Tier" not in index:
+            raise ValueError(f"{SKILLS_SHEET} sheet needs Task and Tier columns")
+
+        def cell(row, name):
+            i = index.get(name)
+            return row[i] if i is not None and i < len(row) else None
+
+        tiers: Dict[str, Dict[int, Dict[str, object]]] = {}
+        rules: Dict[str, Dict[str, object]] = {}
+        for row in rows:
+            task = cell(row, "Task")
+            if task is None or not str(task).strip():
+                continue
+            task = str(task).strip()
+            rule = rules.setdefault(task, {"tiers": []})
+            if cell(row, "End Buffer") is not None:
+                rule["end_buffer"] = int(cell(row, "End Buffer"))
+            tier_name = str(cell(row, "Tier")).strip().lower()
+            if tier_name == "deny":
+                rule.setdefault("deny", []).extend(_split_list(cell(row, "Employees")))
+                continue
+            tier = {}
+            for key, column in (("departments", "Departments"), ("exclude", "Exclude"), ("employees", "Employees")):
+                values = _split_list(cell(row, column))
+                if values:
+                    tier[key] = [normalize_department_key(v) for v in values] if key != "employees" else values
+            start, end = cell(row, "From"), cell(row, "To")
+            if start is not None and end is not None:
+                tier["window"] = [_time_text(start), _time_text(end)]
+            tiers.setdefault(task, {})[int(float(tier_name))] = tier
+    finally:
+        workbook.close()
+
+    for task, numbered in tiers.items():
+        rules[task]["tiers"] = [numbered[n] for n in sorted(numbered)]
+    merged = {task: dict(rule) for task, rule in DEFAULT_ELIGIBILITY_RULES.items()}
+    for task, rule in rules.items():
+        base = merged.get(task, {"end_buffer": 0, "tiers": []})
+        merged[task] = {
+            "end_buffer": rule.get("end_buffer", base.get("end_buffer", 0)),
+            "tiers": rule["tiers"] or base["tiers"],
+            "deny": rule.get("deny", []),
+        }
+    return validate_rules(merged)
+
+
+def _time_text(value) -> str:
+    return value.strftime("%H:%M") if hasattr(value, "strftime") else str(value)
+
+
+def resolve_rules(file_path: Optional[str] = None, rules_file: Optional[str] = None,
+                  config_file: Optional[str] = None) -> Dict[str, Dict[str, object]]:
+    """Rule table for a run
+
+    An explicit rules file wins, then the workbook's Skills sheet, then the
+    store-wide config file if it exists, then DEFAULT_ELIGIBILITY_RULES.
+    """
+    if rules_file:
+        return load_rules_file(rules_file)
+    if file_path and os.path.splitext(file_path)[1].lower() == ".xlsx" and os.path.exists(file_path):
+        sheet_rules = load_rules_sheet(file_path)
+        if sheet_rules is not None:
+            return sheet_rules
+    if config_file and os.path.exists(config_file):
+        return load_rules_file(config_file)
+    return DEFAULT_ELIGIBILITY_RULES
+
+
+class EligibilityTable:
+    """A rule table compiled for one day's staff into integer bitmasks
+
+    Bit i stands for the i-th employee. Department, override and deny checks are
+    folded into one mask per tier at compile time, so filtering a slot's
+    candidates is a few ANDs plus one mask per (end buffer, slot) built on first use.
+    """
+
+    def __init__(self, rules: Dict[str, Dict[str, object]],
+                 working_employee_departments: Dict[str, str],
+                 working_employee_slots: Dict[str, range],
+                 employee_ids: Optional[Dict[str, str]] = None):
+        self.index = {emp: i for i, emp in enumerate(working_employee_slots)}
+        self.employees = list(self.index)
+        self._shift_end = {
+            emp: (max(slots) if slots else None) for emp, slots in working_employee_slots.items()
+        }
+        self._ends_after: Dict[Tuple[int, int], int] = {}
+        self._rules: Dict[str, Tuple[int, List[Tuple[int, Optional[range]]]]] = {}
+
+        employee_ids = employee_ids or {}
+        departments = {
+            emp: normalize_department_key(working_employee_departments.get(emp)) for emp in self.index
+        }
+        for task, rule in rules.items():
+            names = set(rule.get("deny", []))
+            deny = self._mask(emp for emp in self.index if emp in names or employee_ids.get(emp) in names)
+            tiers = []
+            for tier in rule["tiers"]:
+                include = set(tier.get("departments", ()))
+                exclude = set(tier.get("exclude", ()))
+                listed = set(tier.get("employees", ()))
+                mask = self._mask(
+                    emp for emp, dept in departments.items()
+                    if ((not include or dept in include) and dept not in exclude)
+                    or emp in listed or employee_ids.get(emp) in listed
+                )
+                window = tier.get("window")
+                slots = time_grid().span((str(window[0]), str(window[1]))) if window else None
+                tiers.append((mask & ~deny, slots))
+            self._rules[task] = (int(rule.get("end_buffer", 0)), tiers)
+
+    def _mask(self, employees) -> int:
+        mask = 0
+        for emp in employees:
+            mask |= 1 << self.index[emp]
+        return mask
+
+    def _on_shift_after(self, buffer: int, slot: int) -> int:
+        key = (buffer, slot)
+        mask = self._ends_after.get(key)
+        if mask is None:
+            mask = self._mask(emp for emp, end in self._shift_end.items() if end is not None and end - slot > buffer)
+            self._ends_after[key] = mask
+        return mask
+
+    def tier_masks(self, task: str, slot: int, available: int) -> Optional[List[int]]:
+        """Disjoint candidate masks per tier for a task at slot, or None if the task has no rule"""
+        rule = self._rules.get(task)
+        if rule is None:
+            return None
+        buffer, tiers = rule
+        remaining = available & self._on_shift_after(buffer, slot)
+        masks = []
+        for mask, window in tiers:
+            if window is not None and slot not in window:
+                masks.append(0)
+                continue
+            hit = remaining & mask
+            masks.append(hit)
+            remaining &= ~hit
+        return masks
+
+    def tier_of(self, task: str, slot: int, employee: str) -> Optional[int]:
+        """Tier an employee is matched by for a task at slot (0 is primary), None if not eligible
+
+        Tasks without a rule match everyone on the first tier.
+        """
+        if employee not in self.index:
+            return None
+        masks = self.tier_masks(task, slot, 1 << self.index[employee])
+        if masks is None:
+            return 0
+        return next((tier for tier, mask in enumerate(masks) if mask), None)
+
+    def split(self, task: str, slot: int, employees_available: List[str]) -> Tuple[List[str], List[str]]:
+        """(primary pool, fallback pool) in employees_available order
+
+        The primary pool is the first tier; the fallback pool is everyone matched
+        only by a later tier. Tasks without a rule get everyone as primary.
+        """
+        index = self.index
+        available = self._mask(emp for emp in employees_available if emp in index)
+        masks = self.tier_masks(task, slot, available)
+        if masks is None:
+            return employees_available, []
+        primary_mask, fallback_mask = masks[0], 0
+        for mask in masks[1:]:
+            fallback_mask |= mask
+        primary = [emp for emp in employees_available if emp in index and primary_mask >> index[emp] & 1]
+        fallback = [emp for emp in employees_available if emp in index and fallback_mask >> index[emp] & 1]
+        return primary, fallback
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+
+class TestDefaultRules(unittest.TestCase):
+    """The default table must select the pools _filter_pool_for_task used before rules existed"""
+
+    DEPARTMENTS = {
+        "Mo": "M", "Lu": "L's", "Ace": "Acc", "Fay": "F", "Hal": "HH", "Sam": "Stat",
+        "Sue": "SPV", "Ash": "ASM", "Sid": "SM", "Ada": "ADM",
+    }
+
+    def setUp(self):
+        self.slots = {emp: range(40, 60) for emp in self.DEPARTMENTS}
+        self.slots["Early"] = range(40, 46)
+        departments = dict(self.DEPARTMENTS, Early="M")
+        self.table = EligibilityTable(DEFAULT_ELIGIBILITY_RULES, departments, self.slots)
+        self.everyone = list(self.slots)
+
+    def test_fr_tiers(self):
+        primary, fallback = self.table.split("FR", 40, self.everyone)
+        self.assertEqual(primary, ["Mo", "Lu", "Ace", "Early"])
+        self.assertEqual(fallback, ["Fay", "Hal", "Sam"])
+
+    def test_gr_excludes_management(self):
+        self.assertEqual(self.table.split("GR", 40, self.everyone),
+                         (["Mo", "Lu", "Ace", "Fay", "Hal", "Sam", "Early"], []))
+
+    def test_r_excludes_only_adm(self):
+        self.assertEqual(self.table.split("R", 40, self.everyone),
+                         ([emp for emp in self.everyone if emp != "Ada"], []))
+
+    def test_end_buffer_of_two_slots(self):
+        # Early's last slot is 45: still eligible 3 slots before it, not 2
+        for task in ("FR", "GR", "R"):
+            self.assertIn("Early", self.table.split(task, 42, self.everyone)[0])
+            self.assertIsNone(self.table.tier_of(task, 43, "Early"))
+        # Everyone else's last slot is 59
+        self.assertEqual(self.table.tier_of("FR", 56, "Mo"), 0)
+        self.assertEqual(self.table.tier_of("FR", 56, "Fay"), 1)
+        self.assertIsNone(self.table.tier_of("FR", 57, "Mo"))
+
+    def test_split_keeps_available_order_and_subset(self):
+        primary, fallback = self.table.split("FR", 40, ["Hal", "Lu", "Sue", "Mo"])
+        self.assertEqual((primary, fallback), (["Lu", "Mo"], ["Hal"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
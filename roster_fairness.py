@@ -0,0 +1,127 @@
+import json
+import os
+import random
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+from roster_intervals import RosterIntervals
+
+# -----------------------------
+# Fairness state
+# -----------------------------
+
+# Tasks whose slot counts are carried across days, in file order
+FAIRNESS_TASKS = ("FR", "GR", "R")
+
+# Per-day contributions are kept for this many recent days so re-running a day replaces it
+RECENT_DAYS_KEPT = 14
+
+
+class FairnessState:
+    """Per-employee CS slot counters carried across days and weeks
+
+    The state file is a small JSON document:
+        {"counts": {employee: [FR, GR, R]},
+         "recent": [[day_key, {employee: [FR, GR, R]}], ...],
+         "closed": [day_key, ...]}
+
+    Totals never grow with history. Only the keys of days that have left the
+    recent window are kept, so such a day is refused rather than counted twice.
+    """
+
+    def __init__(self, counts: Optional[Dict[str, List[int]]] = None,
+                 recent: Optional[List[list]] = None,
+                 closed: Optional[Iterable[str]] = None):
+        self.counts = counts or {}
+        self.recent = recent or []
+        self.closed = set(closed or ())
+
+    @classmethod
+    def load(cls, path: str) -> "FairnessState":
+        """Load state from path, starting empty if the file does not exist"""
+        if not path or not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read fairness state {path}: {e}. Starting fresh.")
+            return cls()
+        return cls(data.get("counts", {}), data.get("recent", []), data.get("closed", []))
+
+    def save(self, path: str) -> None:
+        """Write state atomically so an interrupted run never leaves a torn file"""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".fairness_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"counts": self.counts, "recent": self.recent, "closed": sorted(self.closed)}, f,
+                          separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def count(self, employee: str, task: str) -> int:
+        """Slots this employee has spent on task over the horizon"""
+        counts = self.counts.get(employee)
+        if counts is None or task not in FAIRNESS_TASKS:
+            return 0
+        return counts[FAIRNESS_TASKS.index(task)]
+
+    def pick(self, candidates: List[str], task: str, k: int = 1) -> List[str]:
+        """Pick k candidates, preferring those with the fewest slots on task
+
+        Ties are broken randomly so equal histories still rotate.
+        Raises ValueError like random.sample when there are fewer than k candidates.
+        """
+        if k > len(candidates):
+            raise ValueError("Sample larger than population")
+        if k == 1:
+            lowest = min(self.count(emp, task) for emp in candidates)
+            return [random.choice([emp for emp in candidates if self.count(emp, task) == lowest])]
+        shuffled = random.sample(candidates, len(candidates))
+        shuffled.sort(key=lambda emp: self.count(emp, task))
+        return shuffled[:k]
+
+    def record_day(self, day_key: str, intervals: RosterIntervals,
+                   employees: Iterable[str]) -> None:
+        """Add one day's CS slots for the given employees
+
+        Re-recording a day that is still in the recent window replaces its earlier totals.
+        Only the listed employees are touched.
+
+        Raises:
+            ValueError: If the day has already left the recent window, so its
+                earlier totals can no longer be taken out again
+        """
+        if day_key in self.closed:
+            raise ValueError(f"Day {day_key!r} is older than the last {RECENT_DAYS_KEPT} recorded days "
+                             "and is already counted")
+        for i, (key, previous) in enumerate(self.recent):
+            if key == day_key:
+                for emp, old in previous.items():
+                    totals = self.counts.get(emp)
+                    if totals is not None:
+                        self.counts[emp] = [max(0, t - o) for t, o in zip(totals, old)]
+                del self.recent[i]
+                break
+
+        day_counts = {}
+        for emp in employees:
+            slots = [0] * len(FAIRNESS_TASKS)
+            for start, end, task in intervals.intervals(emp):
+                if task in FAIRNESS_TASKS:
+                    slots[FAIRNESS_TASKS.index(task)] += end - start
+            if not any(slots):
+                continue
+            day_counts[emp] = slots
+            totals = self.counts.setdefault(emp, [0] * len(FAIRNESS_TASKS))
+            self.counts[emp] = [t + s for t, s in zip(totals, slots)]
+
+        self.recent.append([day_key, day_counts])
+        for key, _ in self.recent[:-RECENT_DAYS_KEPT]:
+            self.closed.add(key)
+        del self.recent[:-RECENT_DAYS_KEPT]
@@ -0,0 +1,204 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from roster_intervals import RosterIntervals
+from roster_time import time_grid
+
+# -----------------------------
+# Machine-readable exports
+# -----------------------------
+
+OUTPUT_DIR = "roster_output"
+EXPORT_FORMATS = ("json", "csv", "parquet")
+
+INTERVAL_FIELDS = ["employee", "employee_id", "department", "task", "start_slot", "end_slot",
+                   "start_time", "end_time"]
+COVERAGE_FIELDS = ["slot", "time", "task", "count"]
+
+
+def iter_employee_intervals(roster: Dict[int, Dict[str, List[str]]],
+                            working_employees: Dict[str, Dict[str, str]],
+                            intervals: Optional[RosterIntervals] = None) -> Iterator[Dict[str, object]]:
+    """Yield one row per assignment block, end slot exclusive"""
+    if intervals is None:
+        intervals = RosterIntervals.from_roster(roster)
+    label = time_grid().label
+    for emp in sorted(intervals.employees()):
+        info = working_employees.get(emp, {})
+        for start, end, task in intervals.intervals(emp):
+            yield {
+                "employee": emp,
+                "employee_id": info.get("employee_id", ""),
+                "department": info.get("department", ""),
+                "task": task,
+                "start_slot": start,
+                "end_slot": end,
+                "start_time": label(start),
+                "end_time": label(end),
+            }
+
+
+def iter_slot_coverage(roster: Dict[int, Dict[str, List[str]]]) -> Iterator[Dict[str, object]]:
+    """Yield one row per slot and task with at least one person on it"""
+    grid = time_grid()
+    for slot in sorted(roster):
+        label = grid.label(slot)
+        for task, employees in roster[slot].items():
+            if employees:
+                yield {"slot": slot, "time": label, "task": task, "count": len(employees)}
+
+
+def _atomic_write(path: str, write: Callable, mode: str = "w") -> str:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".export_", suffix=".tmp")
+    try:
+        if mode == "w":
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                write(f)
+        else:
+            os.close(fd)
+            write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def export_roster_json(roster: Dict[int, Dict[str, List[str]]], current_day: str,
+                       working_employees: Dict[str, Dict[str, str]], path: str,
+                       intervals: Optional[RosterIntervals] = None) -> str:
+    """Write intervals and coverage as one JSON document"""
+    def write(f):
+        json.dump({
+            "day": current_day,
+            "intervals": list(iter_employee_intervals(roster, working_employees, intervals)),
+            "coverage": list(iter_slot_coverage(roster)),
+        }, f, separators=(",", ":"))
+    return _atomic_write(path, write)
+
+
+def _write_csv(path: str, fields: List[str], rows: Iterator[Dict[str, object]]) -> str:
+    def write(f):
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return _atomic_write(path, write)
+
+
+def export_roster_csv(roster: Dict[int, Dict[str, List[str]]], current_day: str,
+                      working_employees: Dict[str, Dict[str, str]], base_path: str,
+                      intervals: Optional[RosterIntervals] = None) -> List[str]:
+    """Write <base>_intervals.csv and <base>_coverage.csv"""
+    return [
+        _write_csv(f"{base_path}_intervals.csv", INTERVAL_FIELDS,
+                   iter_employee_intervals(roster, working_employees, intervals)),
+        _write_csv(f"{base_path}_coverage.csv", COVERAGE_FIELDS, iter_slot_coverage(roster)),
+    ]
+
+
+def export_roster_parquet(roster: Dict[int, Dict[str, List[str]]], current_day: str,
+                          working_employees: Dict[str, Dict[str, str]], base_path: str,
+                          intervals: Optional[RosterIntervals] = None) -> List[str]:
+    """Write <base>_intervals.parquet and <base>_coverage.parquet (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from None
+
+    def table(fields, rows):
+        columns = {field: [] for field in fields}
+        for row in rows:
+            for field in fields:
+                columns[field].append(row[field])
+        return pa.table(columns)
+
+    written = []
+    for suffix, fields, rows in (
+        ("intervals", INTERVAL_FIELDS, iter_employee_intervals(roster, working_employees, intervals)),
+        ("coverage", COVERAGE_FIELDS, iter_slot_coverage(roster)),
+    ):
+        data = table(fields, rows)
+        written.append(_atomic_write(f"{base_path}_{suffix}.parquet",
+                                     lambda tmp_path: pq.write_table(data, tmp_path), mode="b"))
+    return written
+
+
+def export_roster_formats(roster: Dict[int, Dict[str, List[str]]],
+                          current_day: str,
+                          working_employees: Dict[str, Dict[str, str]],
+                          formats: Sequence[str] = ("json", "csv"),
+                          name: Optional[str] = None,
+                          intervals: Optional[RosterIntervals] = None) -> List[str]:
+    """Write the roster in each requested format into roster_output/
+
+    Args:
+        roster: Dictionary mapping time slots to task assignments
+        current_day: Day of the week
+        working_employees: Full employee information
+        formats: Any of EXPORT_FORMATS
+        name: Base file name (default roster_<day>)
+        intervals: Optional interval view of the roster
+
+    Returns:
+        Paths written
+    """
+    for fmt in formats:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid format: {fmt}. Must be one of: {list(EXPORT_FORMATS)}")
+    if intervals is None:
+        intervals = RosterIntervals.from_roster(roster)
+    base_path = os.path.join(OUTPUT_DIR, name or f"roster_{current_day}")
+
+    written = []
+    if "json" in formats:
+        written.append(export_roster_json(roster, current_day, working_employees, base_path + ".json", intervals))
+    if "csv" in formats:
+        written.extend(export_roster_csv(roster, current_day, working_employees, base_path, intervals))
+    if "parquet" in formats:
+        written.extend(export_roster_parquet(roster, current_day, working_employees, base_path, intervals))
+    return written
+
+
+def main() -> None:
+    """Generate a roster and write it as JSON/CSV/Parquet"""
+    parser = argparse.ArgumentParser(description="Export a roster as JSON, CSV or Parquet")
+    parser.add_argument("file_path", help="Roster workbook or shift file")
+    parser.add_argument("day", help="Day of the week")
+    parser.add_argument("--formats", nargs="+", choices=EXPORT_FORMATS, default=["json", "csv"],
+                        help="Output formats")
+    parser.add_argument("--name", help="Base output file name")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = parser.parse_args()
+
+    # Imported here so the exporters themselves stay free of the generator's dependencies
+    from helper import read_from_excel
+    from roster_generator import generate_roster
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    intervals = RosterIntervals()
+    with contextlib.redirect_stdout(io.StringIO()):
+        working_employees = read_from_excel(args.day, args.file_path)
+        roster = generate_roster(args.day, args.file_path, intervals)
+    try:
+        written = export_roster_formats(roster, args.day, working_employees, args.formats, args.name, intervals)
+    except ImportError as e:
+        print(f"❌ {e}")
+        return
+    for path in written:
+        print(f"✅ Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
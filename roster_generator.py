@@ -1,25 +1,38 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, List, Tuple, Set, Optional, TYPE_CHECKING
 from collections import defaultdict
+import contextlib
+import hashlib
+import io
+import json
+import os
 import random
-
-from helper import timespan_to_slot, read_from_excel, select_excel_file
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from helper import read_from_excel, select_excel_file, store_name
+from roster_intervals import RosterIntervals
+from roster_fairness import RECENT_DAYS_KEPT, FairnessState
+from roster_matching import min_cost_assignment
+from roster_eligibility import (
+    DEFAULT_ELIGIBILITY_RULES,
+    EligibilityTable,
+    normalize_department_key,
+    resolve_rules,
+)
+from roster_readers import DEFAULT_READER_BACKEND, available_backends
 from roster_printer import (
     print_roster_header,
-    print_coverage_summary,
-    print_cs_coverage_totals,
     export_roster_to_excel 
 )
+from roster_report import build_report, write_report
+from roster_time import time_grid
 
-# Normalize department keys to match roster structure
-def normalize_department_key(department: str) -> str:
-    mapping = {
-        "M": "M's",
-        "L": "L's",
-        "Acc": "Acc.",
-        "Stat": "Stat.",
-    }
-    return mapping.get(department, department)
+if TYPE_CHECKING:
+    # Only needed for annotations; the recorder pulls in NumPy
+    from roster_trace import TraceRecorder
 
 # Configuration Constants
 class RosterConfig:
@@ -64,32 +77,89 @@ class RosterConfig:
     AFTERNOON_SHIFT_MIN = 40
     AFTERNOON_SHIFT_MAX = 50
     LATE_SHIFT_MIN = 50
-
-def generate_roster(current_day: str, file_path: str = None) -> Dict[int, Dict[str, List[str]]]:
+    # Hurdle (H) goes to shifts starting in this slot
+    HURDLE_SLOT = 48
+    # The windows and hurdle above are laid out for a 09:30 (slot 38) opening.
+    # Stores open past midnight, round the clock, or outside those windows get
+    # each long shift's break windows at the same offsets from its own start,
+    # and the hurdle at the same offset from opening
+    BREAK_REFERENCE_SLOT = 38
+
+    # Horizon mode: CS task counters carried across days and weeks
+    FAIRNESS_STATE_FILE = os.path.join("roster_state", "fairness.json")
+
+    # CS assignment engines: "greedy" fills FR, GR, R one after another,
+    # "matching" fills all of a slot's CS seats together as a min-cost flow
+    ASSIGNMENT_ENGINES = ("greedy", "matching")
+    DEFAULT_ENGINE = "greedy"
+
+    # Matching engine costs (lower is preferred); tiers dominate repeats, repeats dominate history
+    MATCHING_FALLBACK_COST = 1000
+    MATCHING_REPEAT_COST = 100
+
+    # Task eligibility rules (JSON) used when a workbook has no Skills sheet
+    ELIGIBILITY_RULES_FILE = os.path.join("roster_state", "eligibility.json")
+
+    # Result cache for seeded generate + export runs (least recently used entries evicted)
+    RESULT_CACHE_DIR = os.path.join("roster_state", "results")
+    RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+def generate_roster(current_day: str, file_path: str = None,
+                    intervals: Optional[RosterIntervals] = None,
+                    fairness_state_file: Optional[str] = None,
+                    engine: str = RosterConfig.DEFAULT_ENGINE,
+                    improve_seconds: float = 0.0,
+                    trace: Optional["TraceRecorder"] = None,
+                    rules_file: Optional[str] = None,
+                    working_employees: Optional[Dict[str, Dict[str, object]]] = None,
+                    rules: Optional[Dict[str, Dict[str, object]]] = None,
+                    fairness_day_key: Optional[str] = None,
+                    reader: str = DEFAULT_READER_BACKEND) -> Dict[int, Dict[str, List[str]]]:
     """Generate roster for the given day
     
     Args:
         current_day: Day of the week (M, T, W, Th, F, Sa, Su)
         file_path: Path to Excel file (optional, will prompt user if not provided)
+        intervals: Optional interval view filled alongside the roster
+        fairness_state_file: Horizon mode state file; when given, candidates with the
+            fewest past slots on a task are preferred and the file is updated afterwards
+        engine: CS assignment engine, one of RosterConfig.ASSIGNMENT_ENGINES
+        improve_seconds: Wall-clock budget for the local-search improver (0 skips it)
+        trace: Optional recorder for the decisions made while filling the roster
+        rules_file: Optional JSON eligibility rule table; otherwise the workbook's
+            Skills sheet, RosterConfig.ELIGIBILITY_RULES_FILE or the default rules are used
+        working_employees: Already-read shift rows for the day; file_path is not read when given
+        rules: Already-resolved eligibility rule table; overrides rules_file when given
+        fairness_day_key: Key this day is recorded under in horizon mode; re-recording a
+            key replaces its earlier totals. Defaults to the store, the day and a
+            fingerprint of the day's shift rows, so the same weekday of another
+            week counts separately
+        reader: Weekly/Team workbook reader, one of roster_readers.READER_BACKENDS
         
     Returns:
         Dictionary mapping time slots to task assignments
     """
-    working_employees = read_from_excel(current_day, file_path)
+    if working_employees is None:
+        working_employees = read_from_excel(current_day, file_path, reader)
+    if rules is None:
+        rules = resolve_rules(file_path, rules_file, RosterConfig.ELIGIBILITY_RULES_FILE)
 
     # Get store and employee working slots
-    store_opening_slots = timespan_to_slot(RosterConfig.STORE_HOURS[current_day])
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[current_day])
+    store_opening_slots = grid.open_slots
 
-    working_employee_slots = {
-        employee: timespan_to_slot(working_employees[employee]["shift"])
-        for employee in working_employees
-    }
+    working_employee_slots = grid.shift_slots(working_employees)
 
     working_employee_departments = {
         employee: info["department"] 
         for employee, info in working_employees.items()
     }
 
+    eligibility = EligibilityTable(
+        rules, working_employee_departments, working_employee_slots,
+        {employee: info.get("employee_id") for employee, info in working_employees.items()}
+    )
+
     print_roster_header(current_day, RosterConfig.STORE_HOURS)
     print(f"Available employees: {len(working_employees)}")
     print(f"Store operating slots: {len(store_opening_slots)}")
@@ -97,17 +167,52 @@ def generate_roster(current_day: str, file_path: str = None) -> Dict[int, Dict[s
     # Initialize roster structure
     roster = _initialize_roster_structure(store_opening_slots)
 
+    fairness = None
+    if fairness_state_file:
+        fairness = FairnessState.load(fairness_state_file)
+        if intervals is None:
+            intervals = RosterIntervals()
+
     # Generate roster
     roster = fill_roster(roster, current_day, working_employee_slots,
-                         working_employee_departments, working_employees)
+                         working_employee_departments, working_employees, intervals,
+                         fairness, engine, trace, eligibility)
+
+    if improve_seconds > 0:
+        # Imported here: the improver builds on this module
+        from roster_improver import improve_roster
+        roster = improve_roster(roster, current_day, working_employee_slots,
+                                working_employee_departments, improve_seconds, eligibility)
+        if intervals is not None:
+            intervals.rebuild(roster)
+
+    if fairness is not None:
+        day_key = fairness_day_key or _fairness_day_key(file_path, current_day, working_employees)
+        try:
+            fairness.record_day(day_key, intervals, working_employees)
+            fairness.save(fairness_state_file)
+        except ValueError as e:
+            print(f"⚠️ Fairness counters not updated: {e}")
 
     # Print formatted output
-    print_cs_coverage_totals(roster, current_day, RosterConfig.STORE_HOURS)
-    print_coverage_summary(roster, current_day, RosterConfig.STORE_HOURS)
+    write_report([build_report(roster, current_day, RosterConfig.STORE_HOURS)], "text",
+                 sections=("cs_totals", "coverage"))
 
     return roster
 
 
+def _fairness_day_key(file_path: Optional[str], current_day: str,
+                      working_employees: Dict[str, Dict[str, object]]) -> str:
+    """Default horizon key: "store:day:fingerprint of the day's shift rows"
+
+    Edits to other days of the workbook leave the key alone, so regenerating a day
+    replaces its totals; another week with different shifts gets a new key.
+    """
+    rows = json.dumps(working_employees, sort_keys=True, default=str, separators=(",", ":"))
+    fingerprint = hashlib.sha256(rows.encode("utf-8")).hexdigest()[:16]
+    return f"{store_name(file_path) if file_path else ''}:{current_day}:{fingerprint}"
+
+
 def _initialize_roster_structure(store_opening_slots: range) -> Dict[int, Dict[str, List[str]]]:
     """Initialize the roster data structure with empty task lists
     
@@ -145,7 +250,12 @@ def fill_roster(roster: Dict[int, Dict[str, List[str]]],
                 current_day: str, 
                 working_employee_slots: Dict[str, range], 
                 working_employee_departments: Dict[str, str], 
-                working_employees: Dict[str, Dict[str, str]]) -> Dict[int, Dict[str, List[str]]]:
+                working_employees: Dict[str, Dict[str, str]],
+                intervals: Optional[RosterIntervals] = None,
+                fairness: Optional[FairnessState] = None,
+                engine: str = RosterConfig.DEFAULT_ENGINE,
+                trace: Optional["TraceRecorder"] = None,
+                eligibility: Optional[EligibilityTable] = None) -> Dict[int, Dict[str, List[str]]]:
     """Assign tasks to employees, iterate every 15 minutes until the end of the day
     
     Args:
@@ -154,23 +264,36 @@ def fill_roster(roster: Dict[int, Dict[str, List[str]]],
         working_employee_slots: Employee working time slots
         working_employee_departments: Employee department assignments
         working_employees: Full employee information
+        intervals: Interval view kept in step with the roster (created if not given)
+        fairness: Optional horizon state used to rank CS candidates
+        engine: CS assignment engine, one of RosterConfig.ASSIGNMENT_ENGINES
+        trace: Optional decision recorder
+        eligibility: Compiled task eligibility (the default rules if not given)
         
     Returns:
         Updated roster with task assignments
     """
+    if engine not in RosterConfig.ASSIGNMENT_ENGINES:
+        raise ValueError(f"Invalid engine: {engine}. Must be one of: {list(RosterConfig.ASSIGNMENT_ENGINES)}")
+
+    if intervals is None:
+        intervals = RosterIntervals.from_roster(roster)
+
+    if eligibility is None:
+        eligibility = EligibilityTable(DEFAULT_ELIGIBILITY_RULES, working_employee_departments,
+                                       working_employee_slots)
+
     # Track which employees have done each task today
     employee_CS_task_done_tracker = _initialize_task_tracker(working_employee_slots)
     
-    # Categorize employees by shift
-    shift_employees = _categorize_employees_by_shift(working_employee_slots)
-    
     # Assign breaks for all shift groups
-    roster = _assign_all_breaks(roster, shift_employees, current_day, working_employees)
+    roster = _assign_all_breaks(roster, current_day, working_employee_slots, working_employees, intervals, trace)
 
     # Process each time slot
     for idx, slot in enumerate(roster):
         roster = _process_slot(roster, slot, idx, current_day, working_employee_slots, 
-                              working_employee_departments, employee_CS_task_done_tracker)
+                              working_employee_departments, employee_CS_task_done_tracker,
+                              intervals, fairness, engine, trace, eligibility)
 
     return roster
 
@@ -205,36 +328,89 @@ def _categorize_employees_by_shift(working_employee_slots: Dict[str, range]) ->
     }
 
 
+def uses_daytime_breaks(current_day: str) -> bool:
+    """Whether the configured break windows and hurdle slot fit a day's store hours
+
+    True for a store open within one day whose morning and afternoon windows fall
+    inside its open slots; other days get shift-relative breaks (see break_batches).
+    """
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[current_day])
+    open_slots = grid.open_slots
+    if open_slots.stop > grid.slots_per_day:
+        return False
+    return all(window[0] in open_slots and window[-1] in open_slots
+               for window in (RosterConfig.MORNING_BREAK_SLOTS, RosterConfig.AFTERNOON_BREAK_SLOTS))
+
+
+def hurdle_slot(current_day: str) -> int:
+    """Slot whose starting shifts take the hurdle (H) on a day"""
+    if uses_daytime_breaks(current_day):
+        return RosterConfig.HURDLE_SLOT
+    open_slots = time_grid(hours=RosterConfig.STORE_HOURS[current_day]).open_slots
+    return open_slots.start + RosterConfig.HURDLE_SLOT - RosterConfig.BREAK_REFERENCE_SLOT
+
+
+def shift_break_window(start_slot: int) -> Tuple[int, int, int, int]:
+    """MORNING_BREAK_SLOTS moved from the reference opening to a shift's start slot"""
+    offset = start_slot - RosterConfig.BREAK_REFERENCE_SLOT
+    return tuple(slot + offset for slot in RosterConfig.MORNING_BREAK_SLOTS)
+
+
+def break_batches(current_day: str,
+                  working_employee_slots: Dict[str, range],
+                  working_employees: Dict[str, Dict[str, str]]) -> List[Tuple[List[str], Tuple[int, int, int, int]]]:
+    """Long-shift (> 6 hours) employees batched with the window their 40-min breaks fall in
+
+    On daytime days (see uses_daytime_breaks) the batches are the morning and
+    afternoon shift groups with the configured windows, plus the late group on
+    Thursday. Otherwise employees are batched by shift start and each batch gets
+    shift_break_window of that start, as long as the window is inside store hours.
+
+    Returns:
+        (employees, (start_slot, mid_slot_1, mid_slot_2, end_slot)) per non-empty batch
+    """
+    def long_shift(emp):
+        return working_employees[emp]["hours"] > 6.0
+
+    if uses_daytime_breaks(current_day):
+        shift_employees = _categorize_employees_by_shift(working_employee_slots)
+        windows = {"morning": RosterConfig.MORNING_BREAK_SLOTS,
+                   "afternoon": RosterConfig.AFTERNOON_BREAK_SLOTS}
+        # Late shift breaks only on Thursday
+        if current_day == "Th":
+            windows["late"] = RosterConfig.LATE_BREAK_SLOTS
+        batches = [([emp for emp in shift_employees[group] if long_shift(emp)], window)
+                   for group, window in windows.items()]
+    else:
+        open_slots = time_grid(hours=RosterConfig.STORE_HOURS[current_day]).open_slots
+        by_start: Dict[int, List[str]] = {}
+        for emp, shift in working_employee_slots.items():
+            if shift and long_shift(emp):
+                by_start.setdefault(shift.start, []).append(emp)
+        batches = [(emps, shift_break_window(start)) for start, emps in sorted(by_start.items())
+                   if shift_break_window(start)[0] in open_slots and shift_break_window(start)[-1] in open_slots]
+    return [(emps, window) for emps, window in batches if emps]
+
+
 def _assign_all_breaks(roster: Dict[int, Dict[str, List[str]]], 
-                      shift_employees: Dict[str, List[str]], 
                       current_day: str,
-                      working_employees: Dict[str, Dict[str, str]]) -> Dict[int, Dict[str, List[str]]]:
+                      working_employee_slots: Dict[str, range],
+                      working_employees: Dict[str, Dict[str, str]],
+                      intervals: Optional[RosterIntervals] = None,
+                      trace: Optional["TraceRecorder"] = None) -> Dict[int, Dict[str, List[str]]]:
     """Assign breaks for all shift groups - only 40-min breaks for shifts > 6 hours"""
-    # Filter employees who have shifts longer than 6 hours for 40-minute breaks
-    long_shift_morning = [
-        emp for emp in shift_employees["morning"] 
-        if working_employees[emp]["hours"] > 6.0
-    ]
-    long_shift_afternoon = [
-        emp for emp in shift_employees["afternoon"] 
-        if working_employees[emp]["hours"] > 6.0
-    ]
-    long_shift_late = [
-        emp for emp in shift_employees["late"] 
-        if working_employees[emp]["hours"] > 6.0
-    ]
-    
-    # Assign 40-minute breaks only to long shifts
-    if long_shift_morning:
-        roster = assign_breaks(roster, long_shift_morning, *RosterConfig.MORNING_BREAK_SLOTS)
-    
-    if long_shift_afternoon:
-        roster = assign_breaks(roster, long_shift_afternoon, *RosterConfig.AFTERNOON_BREAK_SLOTS)
-    
-    # Late shift breaks (only for Thursday and only for long shifts)
-    if current_day == "Th" and long_shift_late:
-        roster = assign_breaks(roster, long_shift_late, *RosterConfig.LATE_BREAK_SLOTS)
-    
+    for batch, window in break_batches(current_day, working_employee_slots, working_employees):
+        roster = assign_breaks(roster, batch, *window, intervals=intervals, trace=trace)
+
+    # Long shifts left without a 40-min break inside their shift
+    on_break = {emp for slot, tasks in roster.items() for emp in tasks["40"]
+                if slot in working_employee_slots.get(emp, ())}
+    missed = sorted(emp for emp, shift in working_employee_slots.items()
+                    if shift and working_employees[emp]["hours"] > 6.0 and emp not in on_break)
+    if missed:
+        print(f"⚠️  {len(missed)} employee(s) with shifts over 6 hours got no 40-min break "
+              f"on {current_day}: {', '.join(missed)}")
+
     return roster
 
 
@@ -244,23 +420,34 @@ def _process_slot(roster: Dict[int, Dict[str, List[str]]],
                   current_day: str,
                   working_employee_slots: Dict[str, range],
                   working_employee_departments: Dict[str, str],
-                  employee_CS_task_done_tracker: Dict[str, Dict[str, bool]]) -> Dict[int, Dict[str, List[str]]]:
+                  employee_CS_task_done_tracker: Dict[str, Dict[str, bool]],
+                  intervals: RosterIntervals,
+                  fairness: Optional[FairnessState] = None,
+                  engine: str = RosterConfig.DEFAULT_ENGINE,
+                  trace: Optional["TraceRecorder"] = None,
+                  eligibility: Optional[EligibilityTable] = None) -> Dict[int, Dict[str, List[str]]]:
     """Process a single time slot and assign tasks"""
     # Get available employees for this slot
     employees_available = _get_available_employees_for_slot(
-        roster, slot, working_employee_slots
+        roster, slot, working_employee_slots, intervals
     )
+    if trace is not None:
+        trace.record(slot, None, len(employees_available), None, "slot_available")
     
     # Assign hurdle tasks for employees starting their shift
-    roster = _assign_hurdle_tasks(roster, slot, working_employee_slots, employees_available)
+    roster = _assign_hurdle_tasks(roster, slot, hurdle_slot(current_day), working_employee_slots,
+                                  employees_available, intervals)
     
     # Assign customer service tasks
-    roster = _assign_customer_service_tasks(
-        roster, slot, idx, current_day, employees_available, employee_CS_task_done_tracker, working_employee_slots, working_employee_departments
+    assign_cs_tasks = (_assign_customer_service_tasks_matching if engine == "matching"
+                       else _assign_customer_service_tasks)
+    roster = assign_cs_tasks(
+        roster, slot, idx, current_day, employees_available, employee_CS_task_done_tracker, working_employee_slots, working_employee_departments,
+        intervals, fairness, trace, eligibility
     )
     
     # Assign remaining employees to their departments
-    roster = _assign_department_tasks(roster, slot, employees_available, working_employee_departments)
+    roster = _assign_department_tasks(roster, slot, employees_available, working_employee_departments, intervals)
     
     # Check for duplicate assignments
     _check_duplicate_assignments(roster, slot)
@@ -270,29 +457,28 @@ def _process_slot(roster: Dict[int, Dict[str, List[str]]],
 
 def _get_available_employees_for_slot(roster: Dict[int, Dict[str, List[str]]], 
                                      slot: int, 
-                                     working_employee_slots: Dict[str, range]) -> List[str]:
+                                     working_employee_slots: Dict[str, range],
+                                     intervals: RosterIntervals) -> List[str]:
     """Get employees available for assignment in this slot"""
     available = []
     for emp in working_employee_slots:
         if slot in working_employee_slots[emp]:
             # Check if employee is already assigned to any task in this slot
-            already_assigned = any(
-                emp in roster[slot][task_or_dept] 
-                for task_or_dept in roster[slot]
-            )
-            if not already_assigned:
+            if intervals.task_at(emp, slot) is None:
                 available.append(emp)
     return available
 
 
 def _assign_hurdle_tasks(roster: Dict[int, Dict[str, List[str]]], 
                         slot: int, 
+                        hurdle_slot: int,
                         working_employee_slots: Dict[str, range],
-                        employees_available: List[str]) -> Dict[int, Dict[str, List[str]]]:
+                        employees_available: List[str],
+                        intervals: RosterIntervals) -> Dict[int, Dict[str, List[str]]]:
     """Assign hurdle tasks to employees starting their shift"""
     for emp in working_employee_slots:
-        if working_employee_slots[emp] and working_employee_slots[emp][0] == slot and slot == 48:
-            roster[slot]["H"].append(emp)
+        if working_employee_slots[emp] and working_employee_slots[emp][0] == slot and slot == hurdle_slot:
+            record_assignment(roster, slot, "H", emp, intervals)
             if emp in employees_available:
                 employees_available.remove(emp)
     return roster
@@ -305,7 +491,11 @@ def _assign_customer_service_tasks(roster: Dict[int, Dict[str, List[str]]],
                                   employees_available: List[str],
                                   task_tracker: Dict[str, Dict[str, bool]],
                                   working_employee_slots: Dict[str, range],
-                                  working_employee_departments: Dict[str, str]) -> Dict[int, Dict[str, List[str]]]:
+                                  working_employee_departments: Dict[str, str],
+                                  intervals: RosterIntervals,
+                                  fairness: Optional[FairnessState] = None,
+                                  trace: Optional["TraceRecorder"] = None,
+                                  eligibility: Optional[EligibilityTable] = None) -> Dict[int, Dict[str, List[str]]]:
     """Assign customer service tasks for this slot"""
     for task in RosterConfig.CUSTOMER_SERVICE_TASKS:
         num_required, num_required_before = _get_task_requirements(task, slot, idx, current_day, roster)
@@ -318,19 +508,89 @@ def _assign_customer_service_tasks(roster: Dict[int, Dict[str, List[str]]],
             print(f"Task R at slot {slot} needs {num_required} more")
         
         selected_employees = _select_employees_for_task(
-            roster, slot, task, employees_available, task_tracker, num_required, working_employee_departments, working_employee_slots
+            roster, slot, task, employees_available, task_tracker, num_required, working_employee_departments, working_employee_slots,
+            fairness, trace, eligibility
         )
         
         if selected_employees:
             roster = _apply_task_assignment(
                 roster, slot, task, selected_employees, employees_available, 
-                working_employee_slots, num_required_before, current_day
+                working_employee_slots, num_required_before, current_day, intervals, trace
             )
             task_tracker = mark_task_done(selected_employees, task, task_tracker)
     
     return roster
 
 
+def _assign_customer_service_tasks_matching(roster: Dict[int, Dict[str, List[str]]],
+                                           slot: int,
+                                           idx: int,
+                                           current_day: str,
+                                           employees_available: List[str],
+                                           task_tracker: Dict[str, Dict[str, bool]],
+                                           working_employee_slots: Dict[str, range],
+                                           working_employee_departments: Dict[str, str],
+                                           intervals: RosterIntervals,
+                                           fairness: Optional[FairnessState] = None,
+                                           trace: Optional["TraceRecorder"] = None,
+                                           eligibility: Optional[EligibilityTable] = None) -> Dict[int, Dict[str, List[str]]]:
+    """Assign all customer service seats for this slot in one matching
+    
+    FR, GR and R are solved together, so an earlier task never takes the only
+    person a later task could use. Coverage is maximised first; among full
+    assignments, primary FR departments, people who have not done the task today
+    and (in horizon mode) people with the fewest past slots are preferred.
+    """
+    seats = {}
+    required_before = {}
+    for task in RosterConfig.CUSTOMER_SERVICE_TASKS:
+        _, num_required_before = _get_task_requirements(task, slot, idx, current_day, roster)
+        required_before[task] = num_required_before
+        seats[task] = max(num_required_before - slot_covered(roster, slot, task), 0)
+
+    # Shuffle so equal-cost candidates still rotate between runs
+    shuffled = random.sample(employees_available, len(employees_available))
+
+    costs = {}
+    for task, needed in seats.items():
+        if not needed:
+            continue
+        primary_pool, fallback_pool = _filter_pool_for_task(
+            task, slot, shuffled, working_employee_departments, working_employee_slots, eligibility
+        )
+        task_costs = {emp: RosterConfig.MATCHING_FALLBACK_COST for emp in fallback_pool}
+        task_costs.update({emp: 0 for emp in primary_pool})
+        for emp in task_costs:
+            if task_tracker[emp][task]:
+                task_costs[emp] += RosterConfig.MATCHING_REPEAT_COST
+            if fairness is not None:
+                task_costs[emp] += min(fairness.count(emp, task), RosterConfig.MATCHING_REPEAT_COST - 1)
+        costs[task] = task_costs
+
+    assignment = min_cost_assignment(seats, costs)
+
+    for task in RosterConfig.CUSTOMER_SERVICE_TASKS:
+        selected_employees = assignment.get(task, [])
+        if len(selected_employees) < seats[task]:
+            print(f"⚠️ Not enough candidates for {task} at slot {slot}. "
+                  f"Assigned {len(selected_employees)} instead of {seats[task]}.")
+            if trace is not None:
+                trace.record(slot, task, len(costs.get(task, ())), None, "shortfall",
+                             seats[task] - len(selected_employees))
+        if selected_employees:
+            print(f"Selected for {task} at slot {slot}: {selected_employees}")
+            if trace is not None:
+                for emp in selected_employees:
+                    trace.record(slot, task, len(costs[task]), emp, "matched", costs[task][emp])
+            roster = _apply_task_assignment(
+                roster, slot, task, selected_employees, employees_available,
+                working_employee_slots, required_before[task], current_day, intervals, trace
+            )
+            task_tracker = mark_task_done(selected_employees, task, task_tracker)
+
+    return roster
+
+
 def _get_task_requirements(task: str, slot: int, idx: int, current_day: str, 
                           roster: Dict[int, Dict[str, List[str]]]) -> Tuple[int, int]:
     """Get the number of employees required for a task"""
@@ -348,42 +608,19 @@ def _select_employees_for_task(roster: Dict[int, Dict[str, List[str]]],
                               task_tracker: Dict[str, Dict[str, bool]], 
                               num_required: int,
                               working_employee_departments: Dict[str, str],
-                              working_employee_slots: Dict[str, range]) -> List[str]:
+                              working_employee_slots: Dict[str, range],
+                              fairness: Optional[FairnessState] = None,
+                              trace: Optional["TraceRecorder"] = None,
+                              eligibility: Optional[EligibilityTable] = None) -> List[str]:
     """Select employees for a specific task"""
     # Filter by department and role restrictions
-    if task == "FR":
-        # FR: only M's, L's, Acc. are eligible, exclude SPV, ASM, SM, ADM
-        # Also exclude employees whose shift ends within next 2 slots (30 mins)
-        filtered_pool = [
-            emp for emp in employees_available 
-            if (normalize_department_key(working_employee_departments.get(emp)) in ("M's", "L's", "Acc.") and
-                working_employee_departments.get(emp) not in ("SPV", "ASM", "SM", "ADM") and
-                max(working_employee_slots[emp]) - slot > 2)
-        ]
-        # If no M's or L's available, allow all departments except management
-        if not filtered_pool: 
-            filtered_pool = [
-                emp for emp in employees_available 
-                if (working_employee_departments.get(emp) not in ("SPV", "ASM", "SM", "ADM") and
-                    max(working_employee_slots[emp]) - slot > 2)
-            ]
-            
-    elif task == "GR":
-        # GR: exclude SPV, ASM, SM, ADM and employees ending shift within 2 slots
-        filtered_pool = [
-            emp for emp in employees_available 
-            if (working_employee_departments.get(emp) not in ("SPV", "ASM", "SM", "ADM") and
-                max(working_employee_slots[emp]) - slot > 2)
-        ]
-    elif task == "R":
-        # R: exclude ADM and employees ending shift within 2 slots
-        filtered_pool = [
-            emp for emp in employees_available 
-            if (working_employee_departments.get(emp) not in ("ADM",) and
-                max(working_employee_slots[emp]) - slot > 2)
-        ]
-    else:
-        filtered_pool = employees_available
+    primary_pool, fallback_pool = _filter_pool_for_task(
+        task, slot, employees_available, working_employee_departments, working_employee_slots, eligibility
+    )
+    # If no M's or L's available for FR, allow all departments except management
+    filtered_pool = primary_pool if primary_pool else fallback_pool
+    if trace is not None and not primary_pool and fallback_pool:
+        trace.record(slot, task, len(fallback_pool), None, "fallback_pool")
 
     candidates = find_employees_for_task(roster, slot, task, filtered_pool, task_tracker)
     
@@ -392,8 +629,12 @@ def _select_employees_for_task(roster: Dict[int, Dict[str, List[str]]],
         for emp in task_tracker:
             task_tracker[emp][task] = False
         candidates = find_employees_for_task(roster, slot, task, filtered_pool, task_tracker)
+        if trace is not None:
+            trace.record(slot, task, len(candidates), None, "tracker_reset")
     
     if not candidates:
+        if trace is not None:
+            trace.record(slot, task, 0, None, "shortfall", num_required)
         return []
     
     if task == "R":
@@ -405,9 +646,14 @@ def _select_employees_for_task(roster: Dict[int, Dict[str, List[str]]],
             print(employees_available)
             candidates = find_employees_for_task(roster, slot, task, filtered_pool, task_tracker)
             print(f"Task R af: {candidates}, {len(candidates)}, {num_required}")
+            if trace is not None:
+                trace.record(slot, task, len(candidates), None, "tracker_reset")
         
         try:
-            selected = random.sample(candidates, k=num_required)
+            if fairness is not None:
+                selected = fairness.pick(candidates, task, k=num_required)
+            else:
+                selected = random.sample(candidates, k=num_required)
         except ValueError:
             # Not enough candidates, use what we have plus some from previous slot
             selected = candidates[:] + random.sample(
@@ -416,13 +662,42 @@ def _select_employees_for_task(roster: Dict[int, Dict[str, List[str]]],
             )
             print(f"⚠️ Not enough candidates for {task} at slot {slot}. "
                   f"Assigned {len(selected)} instead of {num_required}.")
+            if trace is not None:
+                for emp in selected[len(candidates):]:
+                    trace.record(slot, task, len(candidates), emp, "previous_slot_fallback")
+    elif fairness is not None:
+        selected = fairness.pick(candidates, task)
     else:
         selected = [random.choice(candidates)]
     
     print(f"Selected for {task} at slot {slot}: {selected}")
+    if trace is not None:
+        for emp in selected:
+            trace.record(slot, task, len(candidates), emp, "selected")
     return selected
 
 
+def _filter_pool_for_task(task: str,
+                          slot: int,
+                          employees_available: List[str],
+                          working_employee_departments: Dict[str, str],
+                          working_employee_slots: Dict[str, range],
+                          eligibility: Optional[EligibilityTable] = None) -> Tuple[List[str], List[str]]:
+    """Split available employees into primary and fallback pools for a task
+    
+    With the default rules FR takes M's, L's and Acc. first and falls back to any
+    non-management department, GR excludes management and R excludes ADM; nobody
+    whose shift ends within the next 2 slots (30 mins) is eligible.
+    
+    Returns:
+        (primary pool, fallback pool); the fallback pool is only non-empty for tiered tasks
+    """
+    if eligibility is None:
+        eligibility = EligibilityTable(DEFAULT_ELIGIBILITY_RULES, working_employee_departments,
+                                       working_employee_slots)
+    return eligibility.split(task, slot, employees_available)
+
+
 def _apply_task_assignment(roster: Dict[int, Dict[str, List[str]]], 
                           slot: int, 
                           task: str, 
@@ -430,7 +705,9 @@ def _apply_task_assignment(roster: Dict[int, Dict[str, List[str]]],
                           employees_available: List[str],
                           working_employee_slots: Dict[str, range],
                           num_required_before: int,
-                          current_day: str) -> Dict[int, Dict[str, List[str]]]:
+                          current_day: str,
+                          intervals: RosterIntervals,
+                          trace: Optional["TraceRecorder"] = None) -> Dict[int, Dict[str, List[str]]]:
     """Apply task assignment to selected employees"""
     # Get store opening slot
     store_opening_slot = min(roster.keys())
@@ -449,21 +726,23 @@ def _apply_task_assignment(roster: Dict[int, Dict[str, List[str]]],
         
         # Look ahead up to 2 blocks (8 slots) for a 40-min break
         lookahead_slots = 8
-        break_slot = None
-        for i in range(1, lookahead_slots):
-            next_slot = slot + i
-            if next_slot in roster and emp in roster[next_slot]["40"]:
-                break_slot = next_slot
-                break
+        break_slot = intervals.next_break_after(emp, slot, limit=slot + lookahead_slots)
         
         # Extended block if near end of employee's shift OR store closing OR 40-min break
+        reason, value = "block", None
         if emp_end_slot - (slot + block_size) < 3:
             block_size = emp_end_slot - slot + 1
+            reason = "block_extension"
         elif store_closing_slot - (slot + block_size) < 3:
             block_size = store_closing_slot - slot + 1
+            reason = "block_extension"
         elif break_slot is not None and break_slot > slot:
             # If break found within 3 slots, extend task to reach the break
             block_size = break_slot - slot + 1
+            reason, value = "break_lookahead", break_slot
+        if trace is not None:
+            trace.record(slot, task, len(selected_employees), emp, reason,
+                         block_size if value is None else value)
         
         if block_size <= 0:
             continue
@@ -471,17 +750,15 @@ def _apply_task_assignment(roster: Dict[int, Dict[str, List[str]]],
         for i in range(block_size):
             next_slot = slot + i
             if next_slot in roster and next_slot in working_employee_slots[emp]:
-                assigned_emps = {
-                    emp: task_name for task_name, emps in roster[next_slot].items() for emp in emps
-                }
-                if emp not in assigned_emps:
+                assigned_task = intervals.task_at(emp, next_slot)
+                if assigned_task is None:
                     if len(roster[next_slot][task]) >= num_required_before:
                         continue
-                    roster[next_slot][task].append(emp)
+                    record_assignment(roster, next_slot, task, emp, intervals)
                     if emp in employees_available:
                         employees_available.remove(emp)
                 else:
-                    print(f"⚠️ Employee {emp} already assigned to {assigned_emps[emp]} at slot {next_slot}")
+                    print(f"⚠️ Employee {emp} already assigned to {assigned_task} at slot {next_slot}")
 
     
     return roster
@@ -490,7 +767,8 @@ def _apply_task_assignment(roster: Dict[int, Dict[str, List[str]]],
 def _assign_department_tasks(roster: Dict[int, Dict[str, List[str]]], 
                             slot: int, 
                             employees_available: List[str],
-                            working_employee_departments: Dict[str, str]) -> Dict[int, Dict[str, List[str]]]:
+                            working_employee_departments: Dict[str, str],
+                            intervals: RosterIntervals) -> Dict[int, Dict[str, List[str]]]:
     """Assign remaining employees to their departments"""
     for employee in employees_available:
         raw_dept = working_employee_departments[employee]
@@ -498,7 +776,7 @@ def _assign_department_tasks(roster: Dict[int, Dict[str, List[str]]],
         target_key = dept if dept in roster[slot] else raw_dept
         if target_key not in roster[slot]:
             continue
-        roster[slot][target_key].append(employee)
+        record_assignment(roster, slot, target_key, employee, intervals)
     return roster
 
 
@@ -521,7 +799,9 @@ def assign_breaks(roster: Dict[int, Dict[str, List[str]]],
                  start_slot: int, 
                  mid_slot_1: int,
                  mid_slot_2: int,
-                 end_slot: int) -> Dict[int, Dict[str, List[str]]]:
+                 end_slot: int,
+                 intervals: Optional[RosterIntervals] = None,
+                 trace: Optional["TraceRecorder"] = None) -> Dict[int, Dict[str, List[str]]]:
     """Assign 40-minute breaks and 10-minute breaks to a batch of employees
     
     Args:
@@ -531,6 +811,8 @@ def assign_breaks(roster: Dict[int, Dict[str, List[str]]],
         mid_slot_1: End slot for first group 40-min breaks (10-min break follows)
         mid_slot_2: Start slot for second group 40-min breaks
         end_slot: End slot for second group 40-min breaks (10-min break follows)
+        intervals: Optional interval view to keep in step with the roster
+        trace: Optional decision recorder
         
     Returns:
         Updated roster with breaks assigned
@@ -538,30 +820,54 @@ def assign_breaks(roster: Dict[int, Dict[str, List[str]]],
     # Split employees into two groups
     first_half = random.sample(current_batch, len(current_batch) // 2)  
     second_half = [emp for emp in current_batch if emp not in first_half]
+    if trace is not None:
+        for emp in first_half:
+            trace.record(start_slot, "40", len(current_batch), emp, "break_assigned", start_slot)
+        for emp in second_half:
+            trace.record(mid_slot_2, "40", len(current_batch), emp, "break_assigned", mid_slot_2)
 
     # Assign 40-minute breaks to first group
     for slot in range(start_slot, mid_slot_1):
         for emp in first_half:
-            roster[slot]["40"].append(emp)
+            record_assignment(roster, slot, "40", emp, intervals)
     
     # Assign 10-minute break to first group (right after their 40-min break)
     for emp in first_half:
         if mid_slot_1 in roster:
-            roster[mid_slot_1]["10"].append(emp)
+            record_assignment(roster, mid_slot_1, "10", emp, intervals)
 
     # Assign 40-minute breaks to second group
     for slot in range(mid_slot_2, end_slot):
         for emp in second_half:
-            roster[slot]["40"].append(emp)
+            record_assignment(roster, slot, "40", emp, intervals)
     
     # Assign 10-minute break to second group (right after their 40-min break)
     for emp in second_half:
         if end_slot in roster:
-            roster[end_slot]["10"].append(emp)
+            record_assignment(roster, end_slot, "10", emp, intervals)
     
     return roster
 
 
+def record_assignment(roster: Dict[int, Dict[str, List[str]]],
+                      slot: int,
+                      task: str,
+                      employee: str,
+                      intervals: Optional[RosterIntervals] = None) -> None:
+    """Add an employee to a task in a slot, keeping the interval view in step
+    
+    Args:
+        roster: Dictionary mapping time slots to task assignments
+        slot: Time slot to assign
+        task: Task or department key
+        employee: Employee name
+        intervals: Optional interval view to update
+    """
+    roster[slot][task].append(employee)
+    if intervals is not None:
+        intervals.add(employee, slot, task)
+
+
 def find_employees_for_task(roster: Dict[int, Dict[str, List[str]]], 
                            slot: int, 
                            task: str, 
@@ -653,8 +959,38 @@ def main() -> None:
         if current_day not in RosterConfig.STORE_HOURS:
             print("Invalid day. Please enter one of M, T, W, Th, F, Sa, Su.")
 
-    roster = generate_roster(current_day, selected_file)
-    working_employees = read_from_excel(current_day, selected_file)
+    horizon_choice = input(
+        "Carry task rotation over from previous days (horizon mode)? (y/n): ").lower().strip()
+    fairness_state_file = None
+    if horizon_choice in ['y', 'yes']:
+        fairness_state_file = RosterConfig.FAIRNESS_STATE_FILE
+
+    engine = ""
+    while engine not in RosterConfig.ASSIGNMENT_ENGINES:
+        engine = input(f"Assignment engine ({'/'.join(RosterConfig.ASSIGNMENT_ENGINES)}) "
+                       f"[{RosterConfig.DEFAULT_ENGINE}]: ").strip() or RosterConfig.DEFAULT_ENGINE
+        if engine not in RosterConfig.ASSIGNMENT_ENGINES:
+            print(f"Invalid engine. Please enter one of {', '.join(RosterConfig.ASSIGNMENT_ENGINES)}.")
+
+    backends = available_backends()
+    reader = ""
+    while reader not in backends:
+        reader = input(f"Workbook reader ({'/'.join(backends)}) "
+                       f"[{DEFAULT_READER_BACKEND}]: ").strip() or DEFAULT_READER_BACKEND
+        if reader not in backends:
+            print(f"Invalid reader. Please enter one of {', '.join(backends)}.")
+
+    improve_seconds = 0.0
+    improve_choice = input("Improvement time budget in seconds (0 to skip) [0]: ").strip()
+    try:
+        improve_seconds = max(float(improve_choice or 0), 0.0)
+    except ValueError:
+        print("Invalid number. Skipping improvement.")
+
+    working_employees = read_from_excel(current_day, selected_file, reader)
+    intervals = RosterIntervals()
+    roster = generate_roster(current_day, selected_file, intervals, fairness_state_file, engine,
+                             improve_seconds, working_employees=working_employees, reader=reader)
 
     # Ask if user wants to export to Excel
     export_choice = input(
@@ -662,12 +998,122 @@ def main() -> None:
 
     if export_choice in ['y', 'yes']:
         exported_file = export_roster_to_excel(
-            roster, current_day, working_employees, filename=None)
+            roster, current_day, working_employees, filename=None, intervals=intervals)
         if exported_file:
             print(f"\n📊 Excel file created successfully: {exported_file}")
         else:
             print("\n❌ Excel export failed. Please check the error messages above.")
 
 
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_generator`
+
+def _overnight_staff(count: int, shifts: List[Tuple[str, str]]) -> Dict[str, Dict[str, object]]:
+    departments = ["M's", "L's", "Acc.", "HH", "SPV"]
+    staff = {}
+    for i in range(count):
+        start, end = shifts[i % len(shifts)]
+        staff[f"E{i}"] = {"shift": (start, end), "department": departments[i % len(departments)],
+                          "employee_id": None, "hours": time_grid().minutes((start, end)) / 60}
+    return staff
+
+
+class TestStoreHoursOffDaytime(unittest.TestCase):
+    def _generate(self, hours, coverage, working_employees):
+        config = {"STORE_HOURS": {**RosterConfig.STORE_HOURS, "F": hours},
+                  "REGISTER_COVERAGE": {**RosterConfig.REGISTER_COVERAGE, "F": coverage}}
+        random.seed(0)
+        with mock.patch.multiple(RosterConfig, **config), contextlib.redirect_stdout(io.StringIO()) as out:
+            roster = generate_roster("F", intervals=RosterIntervals(), rules=DEFAULT_ELIGIBILITY_RULES,
+                                     working_employees=working_employees)
+        return roster, out.getvalue()
+
+    def test_late_store_long_shifts_get_breaks(self):
+        staff = _overnight_staff(25, [("18:00", "02:00"), ("18:30", "01:30"), ("18:00", "01:00")])
+        roster, output = self._generate(("18:00", "02:00"), [2] * 32, staff)
+        self.assertEqual(min(roster), 72)
+        on_break = {emp for tasks in roster.values() for emp in tasks["40"]}
+        self.assertEqual(on_break, set(staff))
+        self.assertNotIn("got no 40-min break", output)
+
+    def test_shift_starting_after_midnight_is_rostered(self):
+        staff = _overnight_staff(6, [("18:00", "02:00")])
+        staff["Night"] = {"shift": ("00:00", "04:00"), "department": "M's", "employee_id": None, "hours": 4.0}
+        roster, _ = self._generate(("18:00", "02:00"), [2] * 32, staff)
+        night = [slot for slot, tasks in roster.items() if any("Night" in emps for emps in tasks.values())]
+        self.assertEqual(night, list(range(96, 104)))
+
+    def test_full_day_store(self):
+        staff = _overnight_staff(24, [("06:00", "14:00"), ("14:00", "22:00"), ("22:00", "06:00")])
+        roster, _ = self._generate(("06:00", "06:00"), [2] * 96, staff)
+        self.assertEqual(sorted(roster), list(range(24, 120)))
+        self.assertEqual({emp for tasks in roster.values() for emp in tasks["40"]}, set(staff))
+        self.assertTrue(all(tasks["R"] for tasks in roster.values()))
+
+    def test_daytime_store_keeps_configured_windows(self):
+        self.assertTrue(uses_daytime_breaks("M"))
+        self.assertEqual(hurdle_slot("M"), RosterConfig.HURDLE_SLOT)
+        staff = {"A": {"shift": ("09:30", "18:00"), "hours": 8.5},
+                 "B": {"shift": ("13:00", "21:00"), "hours": 8.0}}
+        batches = break_batches("M", time_grid().shift_slots(staff), staff)
+        self.assertEqual(batches, [(["A"], RosterConfig.MORNING_BREAK_SLOTS)])
+
+
+
+class TestFairnessDayKey(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.folder, "fairness.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _week(self, subfolder, start):
+        path = os.path.join(self.folder, subfolder, "store.csv")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("name,day,start,end,department\n")
+            for i, department in enumerate(["M's", "L's", "Acc.", "HH"]):
+                f.write(f"E{i},M,{start},18:00,{department}\n")
+        return path
+
+    def _generate(self, path):
+        random.seed(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_roster("M", path, RosterIntervals(), self.state_file, rules=DEFAULT_ELIGIBILITY_RULES)
+        return [key for key, _ in FairnessState.load(self.state_file).recent]
+
+    def test_same_weekday_of_another_week_is_kept(self):
+        first, second = self._week("week1", "09:30"), self._week("week2", "10:00")
+        self.assertEqual(len(self._generate(first)), 1)
+        self.assertEqual(len(self._generate(second)), 2)
+        # Regenerating a week replaces its earlier totals
+        self.assertEqual(len(self._generate(first)), 2)
+
+    def test_editing_another_day_keeps_the_key(self):
+        path = self._week("week1", "09:30")
+        self._generate(path)
+        total = lambda: sum(sum(slots) for slots in FairnessState.load(self.state_file).counts.values())
+        first = total()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("E0,T,12:00,18:00,M's\n")
+        self.assertEqual(len(self._generate(path)), 1)
+        # Monday replaced, not counted twice (picks may differ now the counters are seeded)
+        self.assertEqual(total(), first)
+
+    def test_day_older_than_recent_window_is_refused(self):
+        state = FairnessState()
+        intervals = RosterIntervals()
+        intervals.add("E0", 40, "R")
+        for n in range(RECENT_DAYS_KEPT + 1):
+            state.record_day(f"store:M:{n}", intervals, ["E0"])
+        self.assertEqual(state.count("E0", "R"), RECENT_DAYS_KEPT + 1)
+        with self.assertRaises(ValueError):
+            state.record_day("store:M:0", intervals, ["E0"])
+        self.assertEqual(state.count("E0", "R"), RECENT_DAYS_KEPT + 1)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+# -----------------------------
+# Import-time benchmark
+# -----------------------------
+
+DEFAULT_MODULES = [
+    "helper",
+    "roster_input",
+    "roster_printer",
+    "roster_generator",
+    "roster_formats",
+    "roster_watch",
+    "roster_cache",
+]
+HEAVY_MODULES = ("pandas", "openpyxl", "numpy")
+
+# Runs in a fresh interpreter: time the import and report which heavy modules it pulled in
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeats: int = 5) -> Dict[str, object]:
+    """Median cold import time of a module over fresh interpreters
+
+    Returns:
+        {"module", "median_ms", "min_ms", "loaded": heavy modules the import loaded}
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    timings: List[float] = []
+    loaded: List[str] = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True,
+                                text=True, check=True)
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(sample["seconds"] * 1000)
+        loaded = sample["loaded"]
+    return {
+        "module": module,
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "loaded": loaded,
+    }
+
+
+def main() -> None:
+    """Print cold import times for the roster modules"""
+    parser = argparse.ArgumentParser(description="Measure cold import time of roster modules")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [measure_import(module, args.repeats) for module in args.modules]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'Module':<20} {'median':>10} {'min':>10}  heavy imports")
+    for result in results:
+        heavy = ", ".join(result["loaded"]) or "-"
+        print(f"{result['module']:<20} {result['median_ms']:>8.1f}ms {result['min_ms']:>8.1f}ms  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
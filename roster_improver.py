@@ -0,0 +1,441 @@
+import argparse
+import contextlib
+import io
+import math
+import random
+import time
+import unittest
+from typing import Dict, List, Optional, Tuple
+
+from helper import read_from_excel
+from roster_eligibility import DEFAULT_ELIGIBILITY_RULES, EligibilityTable, resolve_rules
+from roster_generator import (
+    RosterConfig,
+    generate_roster,
+    normalize_department_key,
+    shift_break_window,
+    uses_daytime_breaks,
+)
+from roster_time import time_grid
+
+# -----------------------------
+# Local-search improver
+# -----------------------------
+
+CS_TASKS = tuple(RosterConfig.CUSTOMER_SERVICE_TASKS)
+BREAK_UNIT = ("40", "40", "40", "10")  # 40-minute break then 10-minute break
+
+# Score weights (lower score is better)
+GAP_WEIGHT = 100       # each missing CS seat in a slot
+OVER_WEIGHT = 10       # each CS seat above requirement
+SWITCH_WEIGHT = 1      # each change of task between consecutive slots
+FALLBACK_WEIGHT = 5    # each CS slot taken on a fallback tier (or outside the rule table)
+
+START_TEMPERATURE = 5.0
+END_TEMPERATURE = 0.05
+CLOCK_CHECK_EVERY = 200
+
+# Changes are (employee, slot index, new task)
+Change = Tuple[str, int, Optional[str]]
+
+
+class _ImproverState:
+    """Flat employee x slot task grid with running per-slot CS counts
+
+    Cells the improver cannot move (hurdles, double bookings, unknown tasks)
+    are frozen and restored untouched when the roster is rebuilt.
+    """
+
+    def __init__(self, roster: Dict[int, Dict[str, List[str]]],
+                 current_day: str,
+                 working_employee_slots: Dict[str, range],
+                 working_employee_departments: Dict[str, str],
+                 eligibility: Optional[EligibilityTable] = None):
+        self.roster = roster
+        self.slots = sorted(roster)
+        self.n = len(self.slots)
+        register = RosterConfig.REGISTER_COVERAGE[current_day]
+        self.required = [
+            {"FR": 1, "GR": 1, "R": register[i] if i < len(register) else register[-1]}
+            for i in range(self.n)
+        ]
+
+        self.employees = list(working_employee_slots)
+        self.working = {emp: [slot in working_employee_slots[emp] for slot in self.slots]
+                        for emp in self.employees}
+        self.tasks: Dict[str, List[Optional[str]]] = {emp: [None] * self.n for emp in self.employees}
+        self.frozen = {emp: [False] * self.n for emp in self.employees}
+        self.extras = []  # (slot, task, emp) entries kept verbatim
+
+        self.dept_key = {}
+        sample_slot = roster[self.slots[0]] if self.slots else {}
+        for emp in self.employees:
+            raw = working_employee_departments.get(emp)
+            dept = normalize_department_key(raw)
+            key = dept if dept in sample_slot else raw
+            self.dept_key[emp] = key if key in sample_slot else None
+
+        if eligibility is None:
+            eligibility = EligibilityTable(DEFAULT_ELIGIBILITY_RULES, working_employee_departments,
+                                           working_employee_slots)
+        # emp -> task -> rule tier per slot (0 primary, None where the table rules the employee out)
+        self.tiers = {
+            emp: {task: [eligibility.tier_of(task, slot, emp) for slot in self.slots] for task in CS_TASKS}
+            for emp in self.employees
+        }
+
+        for i, slot in enumerate(self.slots):
+            for task, emps in roster[slot].items():
+                for emp in emps:
+                    if emp not in self.tasks or self.tasks[emp][i] is not None:
+                        self.extras.append((slot, task, emp))
+                        if emp in self.frozen:
+                            self.frozen[emp][i] = True
+                        continue
+                    self.tasks[emp][i] = task
+                    if not self._movable_task(emp, task) and task not in ("40", "10"):
+                        self.frozen[emp][i] = True
+
+        self.counts = [{task: 0 for task in CS_TASKS} for _ in range(self.n)]
+        for emp in self.employees:
+            for i, task in enumerate(self.tasks[emp]):
+                if task in CS_TASKS:
+                    self.counts[i][task] += 1
+
+        if uses_daytime_breaks(current_day):
+            self.break_windows = [
+                RosterConfig.MORNING_BREAK_SLOTS,
+                RosterConfig.AFTERNOON_BREAK_SLOTS,
+                RosterConfig.LATE_BREAK_SLOTS,
+            ]
+        else:
+            # Breaks were placed relative to each shift's start (see break_batches)
+            self.break_windows = sorted({shift_break_window(shift.start)
+                                         for shift in working_employee_slots.values() if shift})
+
+    def _movable_task(self, emp: str, task: Optional[str]) -> bool:
+        return task in CS_TASKS or (task is not None and task == self.dept_key[emp])
+
+    def eligible(self, emp: str, task: Optional[str], i: int) -> bool:
+        """Whether the rule table lets an employee take a task at slot index i (non-CS tasks always)"""
+        return task not in CS_TASKS or self.tiers[emp][task][i] is not None
+
+    def movable(self, emp: str, i: int) -> bool:
+        """Cell holds a CS or own-department task the improver may change"""
+        return (0 <= i < self.n and self.working[emp][i] and not self.frozen[emp][i]
+                and self._movable_task(emp, self.tasks[emp][i]))
+
+    # -- scoring --
+
+    def _slot_cost(self, i: int) -> int:
+        cost = 0
+        for task in CS_TASKS:
+            diff = self.counts[i][task] - self.required[i][task]
+            cost += GAP_WEIGHT * -diff if diff < 0 else OVER_WEIGHT * diff
+        return cost
+
+    def _pair_cost(self, emp: str, i: int) -> int:
+        tasks = self.tasks[emp]
+        a, b = tasks[i], tasks[i + 1]
+        return SWITCH_WEIGHT if a is not None and b is not None and a != b else 0
+
+    def _cell_cost(self, emp: str, i: int) -> int:
+        task = self.tasks[emp][i]
+        if task in CS_TASKS and self.tiers[emp][task][i] != 0:
+            return FALLBACK_WEIGHT
+        return 0
+
+    def total_score(self) -> int:
+        score = sum(self._slot_cost(i) for i in range(self.n))
+        for emp in self.employees:
+            score += sum(self._pair_cost(emp, i) for i in range(self.n - 1))
+            score += sum(self._cell_cost(emp, i) for i in range(self.n))
+        return score
+
+    def local_score(self, changes: List[Change]) -> int:
+        """Score of only the slots, neighbouring pairs and cells a move touches"""
+        slots = {i for _, i, _ in changes}
+        pairs = {(emp, j) for emp, i, _ in changes for j in (i - 1, i) if 0 <= j < self.n - 1}
+        cells = {(emp, i) for emp, i, _ in changes}
+        return (sum(self._slot_cost(i) for i in slots)
+                + sum(self._pair_cost(emp, j) for emp, j in pairs)
+                + sum(self._cell_cost(emp, i) for emp, i in cells))
+
+    def apply(self, changes: List[Change]) -> List[Change]:
+        """Apply changes and return the changes that undo them"""
+        undo = []
+        for emp, i, new in changes:
+            old = self.tasks[emp][i]
+            if old in CS_TASKS:
+                self.counts[i][old] -= 1
+            if new in CS_TASKS:
+                self.counts[i][new] += 1
+            self.tasks[emp][i] = new
+            undo.append((emp, i, old))
+        undo.reverse()
+        return undo
+
+    def metrics(self) -> Dict[str, int]:
+        """Coverage gaps, over-coverage and task switches for reporting"""
+        gaps = over = 0
+        for i in range(self.n):
+            for task in CS_TASKS:
+                diff = self.counts[i][task] - self.required[i][task]
+                gaps += max(-diff, 0)
+                over += max(diff, 0)
+        switches = sum(self._pair_cost(emp, i) for emp in self.employees for i in range(self.n - 1))
+        return {"gaps": gaps, "over": over, "switches": switches // max(SWITCH_WEIGHT, 1)}
+
+    # -- moves --
+
+    def propose_swap(self) -> List[Change]:
+        """Hand a CS block from one employee to another over the slots where both are steady"""
+        i = random.randrange(self.n)
+        candidates = [emp for emp in self.employees if self.movable(emp, i)]
+        if len(candidates) < 2:
+            return []
+        a, b = random.sample(candidates, 2)
+        task_a, task_b = self.tasks[a][i], self.tasks[b][i]
+        if task_a == task_b or (task_a not in CS_TASKS and task_b not in CS_TASKS):
+            return []
+        new_a = task_b if task_b in CS_TASKS else self.dept_key[a]
+        new_b = task_a if task_a in CS_TASKS else self.dept_key[b]
+        if new_a is None or new_b is None:
+            return []
+        if not self.eligible(a, new_a, i) or not self.eligible(b, new_b, i):
+            return []
+
+        steady = lambda j: (self.movable(a, j) and self.movable(b, j)
+                            and self.tasks[a][j] == task_a and self.tasks[b][j] == task_b
+                            and self.eligible(a, new_a, j) and self.eligible(b, new_b, j))
+        lo, hi = i, i + 1
+        while steady(lo - 1):
+            lo -= 1
+        while steady(hi):
+            hi += 1
+        changes = []
+        for j in range(lo, hi):
+            changes.append((a, j, new_a))
+            changes.append((b, j, new_b))
+        return changes
+
+    def propose_break_shift(self) -> List[Change]:
+        """Move an employee's 40 + 10 minute break to another start inside its window"""
+        emp = random.choice(self.employees)
+        tasks = self.tasks[emp]
+        starts = [i for i in range(self.n - 3) if tuple(tasks[i:i + 4]) == BREAK_UNIT
+                  and not any(self.frozen[emp][i:i + 4])]
+        if not starts:
+            return []
+        old = starts[0]
+        old_slot = self.slots[old]
+        window = next((w for w in self.break_windows if w[0] <= old_slot and old_slot + 3 <= w[3]), None)
+        if window is None:
+            return []
+        new_slot = random.randint(window[0], window[3] - 3)
+        new = new_slot - self.slots[0]
+        if new == old or new < 0 or new + 4 > self.n:
+            return []
+
+        old_cells, new_cells = set(range(old, old + 4)), set(range(new, new + 4))
+        for j in new_cells - old_cells:
+            if not self.movable(emp, j):
+                return []
+        dept = self.dept_key[emp]
+        if dept is None:
+            return []
+        changes = [(emp, j, dept) for j in sorted(old_cells - new_cells)]
+        changes += [(emp, new + k, BREAK_UNIT[k]) for k in range(4)]
+        return changes
+
+    def propose_extension(self) -> List[Change]:
+        """Grow a CS block by one slot into neighbouring department time
+
+        The new slot has to pass the rule table like any other CS cell, so a block
+        never grows into the end buffer before the employee's shift ends.
+        """
+        emp = random.choice(self.employees)
+        tasks = self.tasks[emp]
+        ends = [i for i in range(self.n) if tasks[i] in CS_TASKS and self.movable(emp, i)]
+        if not ends:
+            return []
+        i = random.choice(ends)
+        j = i + random.choice((-1, 1))
+        if not self.movable(emp, j) or tasks[j] in CS_TASKS or not self.eligible(emp, tasks[i], j):
+            return []
+        return [(emp, j, tasks[i])]
+
+    def propose_trim(self) -> List[Change]:
+        """Hand the first or last slot of a CS block back to the employee's department"""
+        emp = random.choice(self.employees)
+        tasks = self.tasks[emp]
+        dept = self.dept_key[emp]
+        if dept is None:
+            return []
+        edges = [i for i in range(self.n) if tasks[i] in CS_TASKS and self.movable(emp, i)
+                 and (i == 0 or tasks[i - 1] != tasks[i] or i == self.n - 1 or tasks[i + 1] != tasks[i])]
+        if not edges:
+            return []
+        return [(emp, random.choice(edges), dept)]
+
+    def to_roster(self) -> Dict[int, Dict[str, List[str]]]:
+        """Rebuild the slot -> task -> employees roster"""
+        roster = {slot: {task: [] for task in self.roster[slot]} for slot in self.slots}
+        for emp in self.employees:
+            for i, task in enumerate(self.tasks[emp]):
+                if task is not None:
+                    roster[self.slots[i]].setdefault(task, []).append(emp)
+        for slot, task, emp in self.extras:
+            roster[slot].setdefault(task, []).append(emp)
+        return roster
+
+
+def improve_roster(roster: Dict[int, Dict[str, List[str]]],
+                   current_day: str,
+                   working_employee_slots: Dict[str, range],
+                   working_employee_departments: Dict[str, str],
+                   budget_seconds: float = 1.5,
+                   eligibility: Optional[EligibilityTable] = None) -> Dict[int, Dict[str, List[str]]]:
+    """Improve a filled roster with simulated annealing until the time budget runs out
+
+    Moves hand CS blocks between employees, shift a 40-minute break within its
+    break window, and extend or trim CS blocks. Each move is scored only over the slots and
+    employees it touches. The best roster seen is returned, so stopping early is safe.
+
+    Args:
+        roster: Dictionary mapping time slots to task assignments (left unchanged)
+        current_day: Day of the week
+        working_employee_slots: Employee working time slots
+        working_employee_departments: Employee department assignments
+        budget_seconds: Wall-clock budget
+        eligibility: The day's rule table; CS moves only hand tasks to eligible
+            employees (the default rules when not given)
+
+    Returns:
+        Improved roster
+    """
+    if not roster:
+        return roster
+    state = _ImproverState(roster, current_day, working_employee_slots, working_employee_departments, eligibility)
+    before = state.metrics()
+    score = best = state.total_score()
+    journal: List[List[Change]] = []  # undo steps since the best state
+
+    moves = (state.propose_swap, state.propose_break_shift, state.propose_extension, state.propose_trim)
+    start = time.perf_counter()
+    deadline = start + budget_seconds
+    temperature = START_TEMPERATURE
+    proposed = accepted = 0
+
+    while True:
+        if proposed % CLOCK_CHECK_EVERY == 0:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            progress = (now - start) / budget_seconds if budget_seconds > 0 else 1.0
+            temperature = START_TEMPERATURE * (END_TEMPERATURE / START_TEMPERATURE) ** progress
+        proposed += 1
+
+        changes = random.choice(moves)()
+        if not changes:
+            continue
+        local_before = state.local_score(changes)
+        undo = state.apply(changes)
+        delta = state.local_score(changes) - local_before
+
+        if delta <= 0 or random.random() < math.exp(-delta / temperature):
+            accepted += 1
+            score += delta
+            journal.append(undo)
+            if score < best:
+                best = score
+                journal.clear()
+        else:
+            state.apply(undo)
+
+    # Roll back to the best state seen
+    for undo in reversed(journal):
+        state.apply(undo)
+
+    after = state.metrics()
+    print(f"Improver: gaps {before['gaps']} -> {after['gaps']}, "
+          f"switches {before['switches']} -> {after['switches']}, "
+          f"over-coverage {before['over']} -> {after['over']} "
+          f"({accepted}/{proposed} moves accepted)")
+    return state.to_roster()
+
+
+def main() -> None:
+    """Generate a roster and report what the improver gains on it"""
+    parser = argparse.ArgumentParser(description="Anytime local-search roster improver")
+    parser.add_argument("file_path", help="Roster workbook (.xlsx)")
+    parser.add_argument("day", choices=list(RosterConfig.STORE_HOURS), help="Day of the week")
+    parser.add_argument("--budget", type=float, default=1.5, help="Improvement budget in seconds")
+    parser.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    working_employees = read_from_excel(args.day, args.file_path)
+    # Generation is chatty; only the improver summary matters here
+    with contextlib.redirect_stdout(io.StringIO()):
+        roster = generate_roster(args.day, args.file_path, engine=args.engine)
+
+    working_employee_slots = time_grid(hours=RosterConfig.STORE_HOURS[args.day]).shift_slots(working_employees)
+    working_employee_departments = {
+        emp: info["department"] for emp, info in working_employees.items()
+    }
+    eligibility = EligibilityTable(resolve_rules(args.file_path, None, RosterConfig.ELIGIBILITY_RULES_FILE),
+                                   working_employee_departments, working_employee_slots,
+                                   {emp: info.get("employee_id") for emp, info in working_employees.items()})
+    improve_roster(roster, args.day, working_employee_slots, working_employee_departments, args.budget,
+                   eligibility)
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+
+class TestImproverEligibility(unittest.TestCase):
+    def _improve(self, shifts, departments, cs_blocks, rules):
+        # Imported here: only the tests need an empty roster skeleton
+        from roster_generator import _initialize_roster_structure
+        roster = _initialize_roster_structure(range(38, 50))
+        for slot in roster:
+            for emp, shift in shifts.items():
+                if slot in shift:
+                    task, block = cs_blocks.get(emp, (None, ()))
+                    roster[slot][task if slot in block else departments[emp]].append(emp)
+        table = EligibilityTable(rules, departments, shifts)
+        random.seed(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return improve_roster(roster, "M", shifts, departments, 0.2, table)
+
+    def test_swap_skips_denied_employee(self):
+        # B is a primary FR department, so taking A's fallback FR would score better
+        rules = {**DEFAULT_ELIGIBILITY_RULES,
+                 "FR": {**DEFAULT_ELIGIBILITY_RULES["FR"], "deny": ["B"]}}
+        shifts = {"A": range(38, 70), "B": range(38, 70)}
+        departments = {"A": "HH", "B": "M's"}
+        improved = self._improve(shifts, departments, {"A": ("FR", range(38, 50))}, rules)
+        self.assertFalse(any("B" in improved[slot]["FR"] for slot in improved))
+
+    def test_extension_stays_inside_tier_window(self):
+        rules = {**DEFAULT_ELIGIBILITY_RULES,
+                 "R": {"end_buffer": 2, "tiers": [{"exclude": ["ADM"], "window": ["09:30", "11:00"]}]}}
+        shifts = {"A": range(38, 70)}
+        improved = self._improve(shifts, {"A": "M's"}, {"A": ("R", range(38, 42))}, rules)
+        self.assertEqual([slot for slot in improved if improved[slot]["R"]], list(range(38, 44)))
+
+    def test_no_cs_within_end_buffer(self):
+        # A's shift ends after slot 47; CS may not run into the last 2 slots
+        shifts = {"A": range(38, 48)}
+        improved = self._improve(shifts, {"A": "M's"}, {"A": ("R", range(38, 44))}, DEFAULT_ELIGIBILITY_RULES)
+        self.assertEqual([slot for slot in improved if improved[slot]["R"]], list(range(38, 45)))
+
+
+
+if __name__ == "__main__":
+    main()
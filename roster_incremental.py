@@ -0,0 +1,179 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from helper import read_from_excel, store_name
+from roster_cache import config_fingerprint
+from roster_eligibility import resolve_rules
+from roster_generator import RosterConfig, generate_roster
+from roster_input import is_shift_file
+from roster_intervals import RosterIntervals
+from roster_printer import export_roster_to_excel
+from roster_readers import read_weekly_week, sheet_names
+
+# -----------------------------
+# Incremental week regeneration
+# -----------------------------
+
+OUTPUT_DIR = "roster_output"
+STATE_SUFFIX = ".days.json"
+STATE_VERSION = 1
+
+
+def week_inputs(file_path: str, days: Optional[List[str]] = None) -> Dict[str, Dict[str, Dict[str, object]]]:
+    """day -> working_employees for a workbook or shift file
+
+    Weekly/Team workbooks are read once for the whole week; other inputs per day.
+    """
+    days = days or list(RosterConfig.STORE_HOURS)
+    if not is_shift_file(file_path) and "Weekly" in sheet_names(file_path):
+        week = read_weekly_week(file_path)
+        return {day: week[day] for day in days}
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {day: read_from_excel(day, file_path) for day in days}
+
+
+def day_fingerprint(working_employees: Dict[str, Dict[str, object]], day: str, engine: str,
+                    rules: Optional[Dict[str, Dict[str, object]]] = None) -> str:
+    """Hash of everything one day's roster depends on
+
+    That is the day's shift rows and departments as read, the day, the engine,
+    the eligibility rules and the RosterConfig constants.
+    """
+    payload = json.dumps([day, engine, config_fingerprint(), rules, working_employees],
+                         sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def state_path(file_path: str) -> str:
+    """Per-store fingerprint file, kept next to the exported rosters"""
+    return os.path.join(OUTPUT_DIR, store_name(file_path) + STATE_SUFFIX)
+
+
+def load_state(file_path: str) -> Dict[str, object]:
+    """Fingerprints, seeds and outputs recorded for a store's days"""
+    path = state_path(file_path)
+    if not os.path.exists(path):
+        return {"version": STATE_VERSION, "days": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION:
+        return {"version": STATE_VERSION, "days": {}}
+    return state
+
+
+def save_state(file_path: str, state: Dict[str, object]) -> None:
+    """Write the fingerprint file atomically"""
+    path = state_path(file_path)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=OUTPUT_DIR, prefix=".days_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def plan_week(file_path: str, days: Optional[List[str]] = None,
+              engine: str = RosterConfig.DEFAULT_ENGINE,
+              force: bool = False) -> Dict[str, Tuple[str, int]]:
+    """Days that need regenerating, each with its new fingerprint and the seed to use
+
+    A day is stale when its fingerprint changed, it was never generated or its
+    output file is gone. Days keep the seed they were first generated with.
+    """
+    state = load_state(file_path)
+    rules = resolve_rules(file_path)
+    changed = {}
+    for day, working_employees in week_inputs(file_path, days).items():
+        fingerprint = day_fingerprint(working_employees, day, engine, rules)
+        entry = state["days"].get(day)
+        output = entry.get("output") if entry else None
+        if (not force and entry and entry["fingerprint"] == fingerprint
+                and (output is None or os.path.exists(output))):
+            continue
+        seed = entry["seed"] if entry else random.randrange(2 ** 32)
+        changed[day] = (fingerprint, seed)
+    return changed
+
+
+def mark_day_done(file_path: str, day: str, fingerprint: str, seed: int, output: Optional[str]) -> None:
+    """Record a regenerated day so the next run can skip it"""
+    state = load_state(file_path)
+    state["days"][day] = {"fingerprint": fingerprint, "seed": seed, "output": output}
+    save_state(file_path, state)
+
+
+def generate_day(file_path: str, day: str, engine: str, seed: int) -> Optional[str]:
+    """Generate and export one day with a fixed seed; None when nobody works that day"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        working_employees = read_from_excel(day, file_path)
+        if not working_employees:
+            return None
+        random.seed(seed)
+        intervals = RosterIntervals()
+        roster = generate_roster(day, file_path, intervals, engine=engine)
+        exported = export_roster_to_excel(roster, day, working_employees,
+                                          filename=f"{store_name(file_path)}_{day}.xlsx", intervals=intervals)
+    if exported is None:
+        raise RuntimeError(f"Export failed for {file_path} ({day})")
+    return exported
+
+
+def regenerate_week(file_path: str, days: Optional[List[str]] = None,
+                    engine: str = RosterConfig.DEFAULT_ENGINE,
+                    force: bool = False) -> Dict[str, str]:
+    """Regenerate only the days whose inputs changed
+
+    Returns:
+        day -> "regenerated", "unchanged", "empty" or an error message
+    """
+    days = days or list(RosterConfig.STORE_HOURS)
+    changed = plan_week(file_path, days, engine, force)
+    status = {}
+    for day in days:
+        if day not in changed:
+            status[day] = "unchanged"
+            continue
+        fingerprint, seed = changed[day]
+        try:
+            exported = generate_day(file_path, day, engine, seed)
+        except Exception as e:
+            status[day] = f"failed: {e}"
+            continue
+        mark_day_done(file_path, day, fingerprint, seed, exported)
+        status[day] = "regenerated" if exported else "empty"
+    return status
+
+
+def main() -> None:
+    """Regenerate the changed days of one or more workbooks"""
+    parser = argparse.ArgumentParser(description="Regenerate only the days whose inputs changed")
+    parser.add_argument("files", nargs="+", help="Roster workbooks or shift files")
+    parser.add_argument("--days", nargs="*", choices=list(RosterConfig.STORE_HOURS), help="Days to consider")
+    parser.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    parser.add_argument("--force", action="store_true", help="Regenerate every day")
+    args = parser.parse_args()
+
+    icons = {"regenerated": "🔄", "unchanged": "✅", "empty": "➖"}
+    for file_path in args.files:
+        status = regenerate_week(file_path, args.days, args.engine, args.force)
+        print(f"{os.path.basename(file_path)}: " +
+              "  ".join(f"{icons.get(s, '❌')} {day}" for day, s in status.items()))
+        for day, s in status.items():
+            if s.startswith("failed"):
+                print(f"   ❌ {day}: {s}")
+
+
+if __name__ == "__main__":
+    main()
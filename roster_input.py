@@ -0,0 +1,205 @@
+import argparse
+import csv
+import json
+import os
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+from roster_time import time_grid
+
+# -----------------------------
+# Plain-text shift input
+# -----------------------------
+
+# One record per employee per day. Either "name" or "first_name"/"last_name" is required.
+SHIFT_SCHEMA = {
+    "employee_id": "optional, text",
+    "name": "optional, text (used when first_name/last_name are absent)",
+    "first_name": "optional, text",
+    "last_name": "optional, text",
+    "department": "optional, text (falls back to the departments file, then contract)",
+    "contract": "optional, text",
+    "day": "required, one of M T W Th F Sa Su or the full day name",
+    "start": "required, HH:MM",
+    "end": "required, HH:MM (earlier than start for shifts past midnight)",
+    "hours": "optional, number (defaults to end - start)",
+}
+
+SHIFT_EXTENSIONS = (".csv", ".json", ".ndjson", ".jsonl")
+# A departments file kept next to a shift file: shifts.csv -> shifts.departments.csv
+DEPARTMENTS_SUFFIX = ".departments"
+
+DAY_ALIASES = {
+    "m": "M", "mon": "M", "monday": "M",
+    "t": "T", "tue": "T", "tues": "T", "tuesday": "T",
+    "w": "W", "wed": "W", "wednesday": "W",
+    "th": "Th", "thu": "Th", "thur": "Th", "thurs": "Th", "thursday": "Th",
+    "f": "F", "fri": "F", "friday": "F",
+    "sa": "Sa", "sat": "Sa", "saturday": "Sa",
+    "su": "Su", "sun": "Su", "sunday": "Su",
+}
+
+
+def is_shift_file(path: str) -> bool:
+    """Whether a path has one of the plain-text shift input extensions"""
+    return os.path.splitext(path)[1].lower() in SHIFT_EXTENSIONS
+
+
+def departments_file_for(path: str) -> Optional[str]:
+    """The <name>.departments file next to a shift file (any shift extension), if there is one"""
+    stem = os.path.splitext(path)[0]
+    for extension in SHIFT_EXTENSIONS:
+        candidate = stem + DEPARTMENTS_SUFFIX + extension
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def normalize_day(value: str) -> Optional[str]:
+    """Canonical day code for a day name or code, or None if unrecognised"""
+    return DAY_ALIASES.get(str(value).strip().lower())
+
+
+def normalize_time(value: str) -> str:
+    """Convert H:MM, HH:MM or HH:MM:SS to HH:MM"""
+    parts = str(value).strip().split(":")
+    if len(parts) not in (2, 3):
+        raise ValueError(f"invalid time {value!r}")
+    hours, minutes = int(parts[0]), int(parts[1])
+    if not (0 <= hours <= 24 and 0 <= minutes < 60):
+        raise ValueError(f"invalid time {value!r}")
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def iter_records(path: str) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """Stream (line number, record) pairs from a CSV, JSON or NDJSON file
+
+    CSV and NDJSON are read one line at a time; a .json file holds an array of records.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, {k.strip().lower(): v for k, v in record.items() if k}
+    elif ext in (".ndjson", ".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_num, _lower_keys(json.loads(line))
+    elif ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        if isinstance(records, dict):
+            records = records.get("shifts", [])
+        for index, record in enumerate(records, 1):
+            yield index, _lower_keys(record)
+    else:
+        raise ValueError(f"Unsupported shift file type: {path}. Must be one of: {list(SHIFT_EXTENSIONS)}")
+
+
+def _lower_keys(record: Dict[str, object]) -> Dict[str, object]:
+    return {str(k).strip().lower(): v for k, v in record.items()}
+
+
+def _text(record: Dict[str, object], field: str) -> str:
+    value = record.get(field)
+    return "" if value is None else str(value).strip()
+
+
+def read_departments(path: str) -> Dict[str, str]:
+    """Employee id or name -> department from a CSV/JSON/NDJSON departments file"""
+    departments = {}
+    for _, record in iter_records(path):
+        department = _text(record, "department")
+        name = _text(record, "name") or f"{_text(record, 'first_name')} {_text(record, 'last_name')}".strip()
+        if _text(record, "employee_id"):
+            departments[_text(record, "employee_id")] = department
+        if name:
+            departments[name] = department
+    return departments
+
+
+def read_shifts(day_of_week: str, path: str,
+                departments_path: Optional[str] = None) -> Dict[str, Dict[str, object]]:
+    """Read one day's shifts from a schema-defined CSV/JSON/NDJSON file
+
+    Args:
+        day_of_week: Day of the week (M, T, W, Th, F, Sa, Su)
+        path: Shift file, one record per employee per day (see SHIFT_SCHEMA)
+        departments_path: Optional file mapping employee_id or name to department
+
+    Returns:
+        Same structure as read_from_excel: name -> shift, department, employee_id, hours
+
+    Raises:
+        ValueError: On an unknown day or a record that breaks the schema
+    """
+    day = normalize_day(day_of_week)
+    if day is None:
+        raise ValueError(f"Invalid day: {day_of_week}. Must be one of: {sorted(set(DAY_ALIASES.values()))}")
+    departments = read_departments(departments_path) if departments_path else {}
+
+    working_employees = {}
+    for line_num, record in iter_records(path):
+        record_day = normalize_day(_text(record, "day"))
+        if record_day is None:
+            raise ValueError(f"{path}:{line_num}: invalid day {record.get('day')!r}")
+        if record_day != day:
+            continue
+
+        name = _text(record, "name") or f"{_text(record, 'first_name')} {_text(record, 'last_name')}".strip()
+        if not name:
+            raise ValueError(f"{path}:{line_num}: missing employee name")
+        if not _text(record, "start") or not _text(record, "end"):
+            # No shift on this day
+            continue
+
+        try:
+            start = normalize_time(_text(record, "start"))
+            end = normalize_time(_text(record, "end"))
+            hours_text = _text(record, "hours")
+            hours = float(hours_text) if hours_text else time_grid().minutes((start, end)) / 60
+        except ValueError as e:
+            raise ValueError(f"{path}:{line_num}: {e}") from None
+        if hours <= 0:
+            continue
+
+        employee_id = _text(record, "employee_id")
+        department = (_text(record, "department") or departments.get(employee_id)
+                      or departments.get(name) or _text(record, "contract"))
+        working_employees[name] = {
+            "shift": (start, end),
+            "department": department,
+            "employee_id": employee_id,
+            "hours": hours,
+        }
+
+    return working_employees
+
+
+def main() -> None:
+    """Parse a shift file from the command line"""
+    parser = argparse.ArgumentParser(description="Read shifts from a CSV/JSON/NDJSON file")
+    parser.add_argument("path", help="Shift file")
+    parser.add_argument("day", help="Day of the week")
+    parser.add_argument("--departments", help=f"Departments file (defaults to <name>{DEPARTMENTS_SUFFIX}.<ext> "
+                                               "next to the shift file)")
+    parser.add_argument("--schema", action="store_true", help="Print the expected fields and exit")
+    args = parser.parse_args()
+
+    if args.schema:
+        for field, description in SHIFT_SCHEMA.items():
+            print(f"{field:<12} {description}")
+        return
+
+    start = time.perf_counter()
+    working_employees = read_shifts(args.day, args.path, args.departments or departments_file_for(args.path))
+    elapsed = time.perf_counter() - start
+    for name, info in working_employees.items():
+        print(f"{name:<25} {info['shift'][0]}-{info['shift'][1]}  {info['department']:<8} {info['hours']}")
+    print(f"✅ {len(working_employees)} employees read in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import random
+import unittest
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# -----------------------------
+# Interval schedule
+# -----------------------------
+
+# Tasks that count as a break when looking ahead for the next break
+BREAK_TASKS = ("40",)
+
+
+class RosterIntervals:
+    """Run-length view of a roster: employee -> sorted list of (start, end, task)
+
+    Intervals are half-open, so (48, 51, "40") covers slots 48, 49 and 50.
+    Adjacent slots with the same task are merged as they are added, which lets
+    printers and exporters walk whole blocks instead of regrouping slot by slot.
+    """
+
+    def __init__(self):
+        # Parallel per-employee lists: block starts (for bisect) and [start, end, task] blocks
+        self._starts: Dict[str, List[int]] = {}
+        self._blocks: Dict[str, List[List]] = {}
+
+    @classmethod
+    def from_roster(cls, roster: Dict[int, Dict[str, List[str]]]) -> "RosterIntervals":
+        """Build the interval view from an existing slot -> task -> employees roster"""
+        intervals = cls()
+        for slot in sorted(roster):
+            for task, employees in roster[slot].items():
+                for emp in employees:
+                    intervals.add(emp, slot, task)
+        return intervals
+
+    def rebuild(self, roster: Dict[int, Dict[str, List[str]]]) -> None:
+        """Replace the contents in place from a roster that was rewritten wholesale"""
+        rebuilt = self.from_roster(roster)
+        self._starts = rebuilt._starts
+        self._blocks = rebuilt._blocks
+
+    def add(self, emp: str, slot: int, task: str) -> None:
+        """Record that emp does task during slot, merging with neighbouring blocks"""
+        starts = self._starts.setdefault(emp, [])
+        blocks = self._blocks.setdefault(emp, [])
+        i = bisect_right(starts, slot)
+
+        prev = blocks[i - 1] if i else None
+        nxt = blocks[i] if i < len(blocks) else None
+
+        if prev is not None and prev[2] == task and prev[0] <= slot < prev[1]:
+            return
+
+        if prev is not None and prev[2] == task and prev[1] == slot:
+            prev[1] = slot + 1
+            # Close the gap with the following block of the same task
+            if nxt is not None and nxt[2] == task and nxt[0] == slot + 1:
+                prev[1] = nxt[1]
+                del blocks[i]
+                del starts[i]
+            return
+
+        if nxt is not None and nxt[2] == task and nxt[0] == slot + 1:
+            nxt[0] = slot
+            starts[i] = slot
+            return
+
+        blocks.insert(i, [slot, slot + 1, task])
+        starts.insert(i, slot)
+
+    def remove(self, emp: str, slot: int, task: str) -> None:
+        """Drop task from emp's schedule at slot, splitting the block if needed"""
+        blocks = self._blocks.get(emp)
+        if not blocks:
+            return
+        starts = self._starts[emp]
+        for i in range(bisect_right(starts, slot) - 1, -1, -1):
+            start, end, block_task = blocks[i]
+            if block_task != task or not start <= slot < end:
+                continue
+            if start == slot and end == slot + 1:
+                del blocks[i]
+                del starts[i]
+            elif start == slot:
+                blocks[i][0] = slot + 1
+                starts[i] = slot + 1
+            elif end == slot + 1:
+                blocks[i][1] = slot
+            else:
+                blocks[i][1] = slot
+                blocks.insert(i + 1, [slot + 1, end, task])
+                starts.insert(i + 1, slot + 1)
+            return
+
+    def employees(self) -> List[str]:
+        """Employees with at least one block"""
+        return [emp for emp, blocks in self._blocks.items() if blocks]
+
+    def intervals(self, emp: str) -> List[Tuple[int, int, str]]:
+        """Sorted (start, end, task) blocks for emp"""
+        return [tuple(block) for block in self._blocks.get(emp, [])]
+
+    def items(self) -> Iterator[Tuple[str, List[Tuple[int, int, str]]]]:
+        """Iterate (employee, blocks) pairs"""
+        for emp in self._blocks:
+            yield emp, self.intervals(emp)
+
+    def tasks_at(self, emp: str, slot: int) -> List[str]:
+        """All tasks emp holds during slot (more than one only for double bookings)"""
+        blocks = self._blocks.get(emp)
+        if not blocks:
+            return []
+        i = bisect_right(self._starts[emp], slot)
+        return [task for start, end, task in blocks[:i] if start <= slot < end]
+
+    def task_at(self, emp: str, slot: int) -> Optional[str]:
+        """Task emp holds during slot, or None if unassigned"""
+        blocks = self._blocks.get(emp)
+        if not blocks:
+            return None
+        i = bisect_right(self._starts[emp], slot)
+        if i and blocks[i - 1][1] > slot:
+            return blocks[i - 1][2]
+        # Only reachable when an earlier block overlaps this one
+        tasks = self.tasks_at(emp, slot)
+        return tasks[0] if tasks else None
+
+    def next_break_after(self, emp: str, slot: int, limit: Optional[int] = None,
+                         break_tasks: Tuple[str, ...] = BREAK_TASKS) -> Optional[int]:
+        """First slot after `slot` (and before `limit`) where emp is on a break"""
+        blocks = self._blocks.get(emp)
+        if not blocks:
+            return None
+        i = max(bisect_right(self._starts[emp], slot + 1) - 1, 0)
+        for start, end, task in blocks[i:]:
+            if limit is not None and start >= limit:
+                break
+            if task in break_tasks and end > slot + 1:
+                found = max(start, slot + 1)
+                if limit is None or found < limit:
+                    return found
+        return None
+
+    def free_until(self, emp: str, slot: int, limit: int) -> int:
+        """First slot at or after `slot` where emp is busy, capped at limit"""
+        blocks = self._blocks.get(emp)
+        if not blocks:
+            return limit
+        i = max(bisect_right(self._starts[emp], slot) - 1, 0)
+        for start, end, _ in blocks[i:]:
+            if end <= slot:
+                continue
+            return min(max(start, slot), limit)
+        return limit
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+
+class TestRosterIntervals(unittest.TestCase):
+    def test_add_merges_and_remove_splits(self):
+        intervals = RosterIntervals()
+        for slot in (40, 42, 41):
+            intervals.add("Ann", slot, "R")
+        self.assertEqual(intervals.intervals("Ann"), [(40, 43, "R")])
+        intervals.remove("Ann", 41, "R")
+        self.assertEqual(intervals.intervals("Ann"), [(40, 41, "R"), (42, 43, "R")])
+        intervals.remove("Ann", 40, "R")
+        intervals.remove("Ann", 42, "R")
+        self.assertEqual(intervals.intervals("Ann"), [])
+        self.assertEqual(intervals.employees(), [])
+
+    def test_random_edits_match_slot_model(self):
+        rng = random.Random(11)
+        intervals = RosterIntervals()
+        held = {}  # slot -> task, one task per slot
+        for _ in range(2000):
+            slot = rng.randrange(30, 50)
+            if slot in held and rng.random() < 0.5:
+                intervals.remove("Ann", slot, held.pop(slot))
+            elif slot not in held:
+                held[slot] = rng.choice(("R", "FR", "40"))
+                intervals.add("Ann", slot, held[slot])
+            expected = []
+            for s in sorted(held):
+                if expected and expected[-1][1] == s and expected[-1][2] == held[s]:
+                    expected[-1][1] = s + 1
+                else:
+                    expected.append([s, s + 1, held[s]])
+            self.assertEqual(intervals.intervals("Ann"), [tuple(block) for block in expected])
+        for slot in range(30, 50):
+            self.assertEqual(intervals.task_at("Ann", slot), held.get(slot))
+
+if __name__ == "__main__":
+    unittest.main()
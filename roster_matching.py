@@ -0,0 +1,135 @@
+import itertools
+import random
+import unittest
+from collections import deque
+from typing import Dict, List
+
+# -----------------------------
+# Min-cost seat matching
+# -----------------------------
+
+
+def min_cost_assignment(seats: Dict[str, int],
+                        costs: Dict[str, Dict[str, int]]) -> Dict[str, List[str]]:
+    """Fill task seats with employees, each employee used at most once
+
+    Solved as min-cost max-flow (source -> task seats -> employee -> sink) with
+    successive shortest paths, so the most seats possible are filled whenever a
+    full assignment exists, and among those the cheapest one is picked.
+
+    Args:
+        seats: Task -> number of people needed
+        costs: Task -> {eligible employee: cost}; lower is preferred
+
+    Returns:
+        Task -> employees assigned, in the order they were matched
+    """
+    tasks = [task for task in seats if seats[task] > 0 and costs.get(task)]
+    employees = []
+    emp_index = {}
+    for task in tasks:
+        for emp in costs[task]:
+            if emp not in emp_index:
+                emp_index[emp] = len(employees)
+                employees.append(emp)
+
+    # Nodes: 0 source, 1 sink, then tasks, then employees
+    source, sink = 0, 1
+    task_node = {task: 2 + i for i, task in enumerate(tasks)}
+    emp_offset = 2 + len(tasks)
+    n_nodes = emp_offset + len(employees)
+
+    # Arc: [to, capacity, cost, reverse index]
+    graph: List[List[list]] = [[] for _ in range(n_nodes)]
+
+    def add_arc(u, v, capacity, cost):
+        graph[u].append([v, capacity, cost, len(graph[v])])
+        graph[v].append([u, 0, -cost, len(graph[u]) - 1])
+
+    for task in tasks:
+        add_arc(source, task_node[task], seats[task], 0)
+        for emp, cost in costs[task].items():
+            add_arc(task_node[task], emp_offset + emp_index[emp], 1, cost)
+    for i in range(len(employees)):
+        add_arc(emp_offset + i, sink, 1, 0)
+
+    while True:
+        # SPFA shortest path in the residual graph (handles negative reverse arcs)
+        dist = [float("inf")] * n_nodes
+        parent = [None] * n_nodes
+        in_queue = [False] * n_nodes
+        dist[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            in_queue[u] = False
+            for i, (v, capacity, cost, _) in enumerate(graph[u]):
+                if capacity > 0 and dist[u] + cost < dist[v]:
+                    dist[v] = dist[u] + cost
+                    parent[v] = (u, i)
+                    if not in_queue[v]:
+                        in_queue[v] = True
+                        queue.append(v)
+        if dist[sink] == float("inf"):
+            break
+
+        # Every path carries one unit: employee -> sink arcs have capacity 1
+        node = sink
+        while node != source:
+            u, i = parent[node]
+            arc = graph[u][i]
+            arc[1] -= 1
+            graph[node][arc[3]][1] += 1
+            node = u
+
+    assignment = {task: [] for task in seats}
+    for task in tasks:
+        for v, capacity, _, _ in graph[task_node[task]]:
+            if v >= emp_offset and capacity == 0:
+                assignment[task].append(employees[v - emp_offset])
+    return assignment
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+
+def _brute_force(seats: Dict[str, int], costs: Dict[str, Dict[str, int]]):
+    """(seats filled, total cost) of the best assignment, by trying every one"""
+    slots = [task for task in sorted(seats) for _ in range(seats[task])]
+    employees = sorted({emp for task in costs for emp in costs[task]})
+    best = (0, 0)
+    for size in range(1, len(slots) + 1):
+        for chosen in itertools.combinations(range(len(slots)), size):
+            for people in itertools.permutations(employees, size):
+                if all(emp in costs.get(slots[i], {}) for i, emp in zip(chosen, people)):
+                    cost = sum(costs[slots[i]][emp] for i, emp in zip(chosen, people))
+                    if (-size, cost) < (-best[0], best[1]):
+                        best = (size, cost)
+    return best
+
+
+class TestMinCostAssignment(unittest.TestCase):
+    def test_prefers_filling_seats_over_cost(self):
+        # Greedy on cost would give Ann FR and leave R empty
+        result = min_cost_assignment({"FR": 1, "R": 1}, {"FR": {"Ann": 0, "Bo": 9}, "R": {"Ann": 5}})
+        self.assertEqual(result, {"FR": ["Bo"], "R": ["Ann"]})
+
+    def test_matches_brute_force(self):
+        rng = random.Random(5)
+        for _ in range(60):
+            employees = [f"E{i}" for i in range(rng.randint(1, 4))]
+            seats = {task: rng.randint(0, 2) for task in ("FR", "GR", "R")}
+            costs = {task: {emp: rng.randint(0, 9) for emp in employees if rng.random() < 0.6}
+                     for task in seats}
+            result = min_cost_assignment(seats, costs)
+            assigned = [emp for emps in result.values() for emp in emps]
+            self.assertEqual(len(assigned), len(set(assigned)))
+            for task, emps in result.items():
+                self.assertLessEqual(len(emps), seats[task])
+                self.assertTrue(all(emp in costs[task] for emp in emps))
+            cost = sum(costs[task][emp] for task, emps in result.items() for emp in emps)
+            self.assertEqual((len(assigned), cost), _brute_force(seats, costs))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from helper import store_name
+from roster_bulk_export import OUTPUT_DIR, _export_worker, compact_job
+from roster_eligibility import resolve_rules
+from roster_generator import RosterConfig, generate_roster
+from roster_incremental import week_inputs
+from roster_intervals import RosterIntervals
+
+# -----------------------------
+# Staged read -> generate -> export pipeline
+# -----------------------------
+
+STAGES = ("ingest", "generate", "export")
+
+
+def ingest_file(file_path: str, days: List[str], engine: str, seed: Optional[int] = None,
+                template: bool = False) -> List[Dict[str, object]]:
+    """Read a workbook's days and eligibility rules into generation jobs (ingest stage)
+
+    Days nobody works are dropped.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        week = week_inputs(file_path, days)
+        rules = resolve_rules(file_path, None, RosterConfig.ELIGIBILITY_RULES_FILE)
+    store = store_name(file_path)
+    return [
+        {"store": store, "day": day, "employees": working_employees, "rules": rules,
+         "engine": engine, "seed": seed, "template": template}
+        for day, working_employees in week.items() if working_employees
+    ]
+
+
+def generate_job(job: Dict[str, object]) -> Dict[str, object]:
+    """Generate one day from already-read rows into a compact export job (generate stage)
+
+    With a seed, the generator is reseeded per job, so results do not depend on
+    which worker runs the job or in what order.
+    """
+    if job["seed"] is not None:
+        random.seed(job["seed"])
+    intervals = RosterIntervals()
+    with contextlib.redirect_stdout(io.StringIO()):
+        roster = generate_roster(job["day"], intervals=intervals, engine=job["engine"],
+                                 working_employees=job["employees"], rules=job["rules"])
+    return compact_job(job["store"], roster, job["day"], job["employees"], intervals, job["template"])
+
+
+def run_pipeline(files: List[str], days: Optional[List[str]] = None,
+                 engine: str = RosterConfig.DEFAULT_ENGINE,
+                 seed: Optional[int] = None,
+                 template: bool = False,
+                 ingest_workers: int = 1,
+                 generate_workers: Optional[int] = None,
+                 export_workers: int = 1,
+                 queue_size: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """Read, generate and export rosters on three overlapping process pools
+
+    Each stage has its own pool, so the next workbook is read and the previous
+    roster written while the current one is being scheduled. The stages are joined
+    by bounded queues: a slot is reserved when a job is submitted, and a stage only
+    takes new work while the queue after it has room. At most queue_size parsed
+    workbooks and queue_size generated rosters are held at once, however many files
+    are queued.
+
+    Args:
+        files: Roster workbooks or shift files
+        days: Days to generate (defaults to every day in RosterConfig.STORE_HOURS)
+        engine: CS assignment engine
+        seed: Seed every generation job with this value
+        template: Export by filling cached pre-styled templates
+        ingest_workers: Processes reading workbooks
+        generate_workers: Processes generating rosters (defaults to the CPUs left over)
+        export_workers: Processes writing workbooks
+        queue_size: Capacity of each queue between stages (defaults to twice generate_workers)
+
+    Returns:
+        "store:day" -> exported file path, None where a stage failed
+    """
+    days = days or list(RosterConfig.STORE_HOURS)
+    if generate_workers is None:
+        generate_workers = max(1, (os.cpu_count() or 1) - ingest_workers - export_workers)
+    if queue_size is None:
+        queue_size = 2 * generate_workers
+    capacity = {"ingest": ingest_workers, "generate": generate_workers, "export": export_workers}
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    waiting_files = deque(files)
+    parsed: deque = deque()  # one deque of generation jobs per parsed workbook
+    generated: deque = deque()  # compact export jobs
+    in_flight = {stage: 0 for stage in STAGES}
+    busy = {stage: 0.0 for stage in STAGES}
+    running = {}
+    results: Dict[str, Optional[str]] = {}
+
+    def fail(stage, keys, error):
+        print(f"❌ {stage} {', '.join(keys)}: {type(error).__name__}: {error}")
+        for key in keys:
+            results[key] = None
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=ingest_workers) as ingest_pool, \
+            ProcessPoolExecutor(max_workers=generate_workers) as generate_pool, \
+            ProcessPoolExecutor(max_workers=export_workers) as export_pool:
+
+        def submit(stage, future, key):
+            in_flight[stage] += 1
+            running[future] = (stage, key, time.perf_counter())
+
+        while waiting_files or parsed or generated or running:
+            # Downstream first, so finished work frees queue room before new work is read
+            while generated and in_flight["export"] < capacity["export"]:
+                job = generated.popleft()
+                submit("export", export_pool.submit(_export_worker, job), f"{job['store']}:{job['day']}")
+            while (parsed and in_flight["generate"] < capacity["generate"]
+                   and len(generated) + in_flight["generate"] < queue_size):
+                job = parsed[0].popleft()
+                if not parsed[0]:
+                    parsed.popleft()
+                submit("generate", generate_pool.submit(generate_job, job), f"{job['store']}:{job['day']}")
+            while (waiting_files and in_flight["ingest"] < capacity["ingest"]
+                   and len(parsed) + in_flight["ingest"] < queue_size):
+                file_path = waiting_files.popleft()
+                submit("ingest", ingest_pool.submit(ingest_file, file_path, days, engine, seed, template),
+                       file_path)
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key, began = running.pop(future)
+                in_flight[stage] -= 1
+                busy[stage] += time.perf_counter() - began
+                try:
+                    output = future.result()
+                except Exception as e:
+                    keys = [f"{store_name(key)}:{day}" for day in days] if stage == "ingest" else [key]
+                    fail(stage, keys, e)
+                    continue
+                if stage == "ingest":
+                    if output:
+                        parsed.append(deque(output))
+                elif stage == "generate":
+                    generated.append(output)
+                else:
+                    results[key] = output
+                    print(f"✅ {key} -> {output}")
+
+    wall = time.perf_counter() - started
+    exported = sum(1 for path in results.values() if path)
+    print(f"📦 Exported {exported}/{len(results)} rosters from {len(files)} files in {wall:.2f}s")
+    print("   worker time: " + ", ".join(
+        f"{stage} {busy[stage]:.2f}s on {capacity[stage]}" for stage in STAGES))
+    return results
+
+
+def main() -> None:
+    """Run the staged pipeline over several workbooks"""
+    parser = argparse.ArgumentParser(description="Pipelined read -> generate -> export with bounded queues")
+    parser.add_argument("files", nargs="+", help="Roster workbooks or shift files")
+    parser.add_argument("--days", nargs="*", choices=list(RosterConfig.STORE_HOURS), help="Days to generate")
+    parser.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    parser.add_argument("--seed", type=int, default=None, help="Seed every generation job with this value")
+    parser.add_argument("--template", action="store_true", help="Export through cached pre-styled templates")
+    parser.add_argument("--ingest-workers", type=int, default=1, help="Processes reading workbooks")
+    parser.add_argument("--generate-workers", type=int, default=None, help="Processes generating rosters")
+    parser.add_argument("--export-workers", type=int, default=1, help="Processes writing workbooks")
+    parser.add_argument("--queue-size", type=int, default=None, help="Capacity of each queue between stages")
+    args = parser.parse_args()
+
+    run_pipeline(args.files, args.days, args.engine, args.seed, args.template,
+                 args.ingest_workers, args.generate_workers, args.export_workers, args.queue_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,569 @@
+import argparse
+import itertools
+import json
+import math
+import unittest
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from roster_eligibility import DEFAULT_ELIGIBILITY_RULES, EligibilityTable, load_rules_file, resolve_rules
+from roster_generator import (
+    RosterConfig,
+    hurdle_slot,
+    normalize_department_key,
+    shift_break_window,
+    uses_daytime_breaks,
+)
+from roster_time import time_grid
+
+# -----------------------------
+# Minimum-headcount planner
+# -----------------------------
+
+LONG_SHIFT_HOURS = 6.0
+
+
+def parse_template(template: str) -> Tuple[str, str]:
+    """Parse "HH:MM-HH:MM" into a (start, end) shift tuple"""
+    start, end = template.split("-")
+    return start.strip(), end.strip()
+
+
+def default_templates(current_day: str) -> List[Tuple[str, str]]:
+    """Full-day shift plus 5-hour opening and closing shifts for the store hours"""
+    open_time, close_time = RosterConfig.STORE_HOURS[current_day]
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[current_day])
+    five_hours = 300 // grid.interval
+    return [
+        (open_time, close_time),
+        (open_time, grid.label(grid.open_slots.start + five_hours)),
+        (grid.label(grid.open_slots.stop - five_hours), close_time),
+    ]
+
+
+def slot_demand(current_day: str) -> List[Tuple[int, int]]:
+    """Per store slot (FR + GR seats, total CS seats) required by the roster rules"""
+    return [(demand["FR"] + demand["GR"], sum(demand.values())) for demand in task_demand(current_day)]
+
+
+def task_demand(current_day: str) -> List[Dict[str, int]]:
+    """Per store slot seats required on each CS task (one FR, one GR, REGISTER_COVERAGE on R)"""
+    open_slots = time_grid(hours=RosterConfig.STORE_HOURS[current_day]).open_slots
+    register = RosterConfig.REGISTER_COVERAGE[current_day]
+    demand = []
+    for idx in range(len(open_slots)):
+        r_required = register[idx] if idx < len(register) else register[-1]
+        demand.append({"FR": 1, "GR": 1, "R": r_required})
+    return demand
+
+
+def _department_tasks(department: str, rules: Dict[str, Dict[str, object]]) -> FrozenSet[str]:
+    """CS tasks some tier of the rules admits the department to, ignoring windows and end buffers"""
+    department = normalize_department_key(department)
+    tasks = set()
+    for task in RosterConfig.CUSTOMER_SERVICE_TASKS:
+        for tier in rules.get(task, {"tiers": [{}]})["tiers"]:
+            include = tier.get("departments")
+            if (not include or department in include) and department not in tier.get("exclude", ()):
+                tasks.add(task)
+    return frozenset(tasks)
+
+
+def _apportion(count: int, shares: Dict[str, float], rules: Dict[str, Dict[str, object]]) -> Dict[str, int]:
+    """Split count across departments by largest remainder, favouring the least capable on ties
+
+    Departments the rules admit to the same CS tasks are apportioned together
+    first, then split among themselves, so rounding towards the groups that can
+    take fewer tasks keeps the feasibility check conservative.
+    """
+    def largest_remainder(total: int, weights: Dict[object, float], rank) -> Dict[object, int]:
+        weight_sum = sum(weights.values()) or 1.0
+        raw = {key: total * weight / weight_sum for key, weight in weights.items()}
+        result = {key: int(math.floor(value)) for key, value in raw.items()}
+        leftover = total - sum(result.values())
+        order = sorted(raw, key=lambda key: (-(raw[key] - result[key]), rank(key)))
+        for key in order[:leftover]:
+            result[key] += 1
+        return result
+
+    groups: Dict[FrozenSet[str], Dict[str, float]] = {}
+    for dept, share in shares.items():
+        groups.setdefault(_department_tasks(dept, rules), {})[dept] = share
+    per_group = largest_remainder(count, {tasks: sum(g.values()) for tasks, g in groups.items()},
+                                  lambda tasks: (len(tasks), sorted(tasks)))
+    result = {}
+    for tasks, members in groups.items():
+        result.update(largest_remainder(per_group[tasks], members, lambda dept: dept))
+    return result
+
+
+def _held_until(last_eligible: int, shift_end: int) -> int:
+    """Last slot a block started at last_eligible runs to, as _apply_task_assignment extends it"""
+    block_end = last_eligible + RosterConfig.DEFAULT_BLOCK_SIZE
+    if shift_end - block_end < 3:
+        return shift_end
+    return block_end - 1
+
+
+@lru_cache(maxsize=256)
+def _capabilities(current_day: str,
+                  templates: Tuple[Tuple[str, str], ...],
+                  departments: Tuple[str, ...],
+                  rules_json: str) -> Dict[Tuple[int, str], Dict[int, FrozenSet[str]]]:
+    """CS tasks one person on each (template, department) can hold at each store slot
+
+    Eligibility comes from the compiled rule table (tiers, windows, end buffer):
+    a person can be picked for a task while the rules admit them, and the block
+    started at their last eligible slot carries them on towards their shift end.
+    People starting on the hurdle slot are busy with it there.
+    """
+    rules = json.loads(rules_json)
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[current_day])
+    open_slots = grid.open_slots
+    hurdle = hurdle_slot(current_day)
+    people_departments, people_slots = {}, {}
+    for i, template in enumerate(templates):
+        for dept in departments:
+            people_departments[(i, dept)] = dept
+            people_slots[(i, dept)] = grid.shift_span(template)
+    eligibility = EligibilityTable(rules, people_departments, people_slots)
+
+    capabilities = {}
+    for person, shift in people_slots.items():
+        if not shift:
+            capabilities[person] = {}
+            continue
+        held: Dict[int, set] = {}
+        for task in RosterConfig.CUSTOMER_SERVICE_TASKS:
+            eligible = [slot for slot in shift if eligibility.tier_of(task, slot, person) is not None]
+            if eligible:
+                eligible += range(eligible[-1] + 1, _held_until(eligible[-1], shift[-1]) + 1)
+            for slot in eligible:
+                held.setdefault(slot, set()).add(task)
+        if shift.start == hurdle:
+            held.pop(hurdle, None)
+        capabilities[person] = {slot: frozenset(tasks) for slot, tasks in held.items() if slot in open_slots}
+    return capabilities
+
+
+@lru_cache(maxsize=65536)
+def _shortfall(demand: Tuple[Tuple[str, int], ...], staff: FrozenSet[Tuple[FrozenSet[str], int]]) -> int:
+    """People missing to seat demand, from how many people can hold each set of tasks
+
+    By Hall's theorem the shortfall is the largest gap, over every set of tasks,
+    between its seats and the people who can hold any task in it.
+    """
+    short = 0
+    for size in range(1, len(demand) + 1):
+        for subset in itertools.combinations(demand, size):
+            tasks = {task for task, _ in subset}
+            able = sum(n for held, n in staff if not held.isdisjoint(tasks))
+            short = max(short, sum(n for _, n in subset) - able)
+    return short
+
+
+def _shift_group(start_slot: int) -> str:
+    """Same thresholds as _categorize_employees_by_shift"""
+    if start_slot <= RosterConfig.MORNING_SHIFT_MAX:
+        return "morning"
+    if RosterConfig.AFTERNOON_SHIFT_MIN < start_slot < RosterConfig.AFTERNOON_SHIFT_MAX:
+        return "afternoon"
+    return "late"
+
+
+def _break_window(current_day: str, start_slot: int) -> Optional[Tuple[range, range]]:
+    """Slots each half of a long shift's batch is away on 40 + 10 minute breaks, per break_batches
+
+    None where the generator gives no break (late shifts outside Thursday, windows
+    outside store hours).
+    """
+    if uses_daytime_breaks(current_day):
+        window = {
+            "morning": RosterConfig.MORNING_BREAK_SLOTS,
+            "afternoon": RosterConfig.AFTERNOON_BREAK_SLOTS,
+            "late": RosterConfig.LATE_BREAK_SLOTS if current_day == "Th" else None,
+        }[_shift_group(start_slot)]
+    else:
+        window = shift_break_window(start_slot)
+        open_slots = time_grid(hours=RosterConfig.STORE_HOURS[current_day]).open_slots
+        if window[0] not in open_slots or window[-1] not in open_slots:
+            window = None
+    if window is None:
+        return None
+    start, mid_1, mid_2, end = window
+    return range(start, mid_1 + 1), range(mid_2, end + 1)
+
+
+def evaluate_staffing(current_day: str,
+                      templates: List[Tuple[str, str]],
+                      counts: List[int],
+                      department_mix: Dict[str, float],
+                      rules: Optional[Dict[str, Dict[str, object]]] = None) -> List[int]:
+    """Check a staffing level slot by slot
+
+    Who can hold FR, GR and R at each slot follows the eligibility rules, so staff
+    are not counted in their shift's last slots unless already on a task there.
+    Breaks are assumed to fall on the most capable staff first, so a slot reported
+    as covered stays covered however the engine splits break groups.
+
+    Args:
+        current_day: Day of the week
+        templates: Shift templates as (start, end) tuples
+        counts: Headcount on each template
+        department_mix: Department -> share of headcount
+        rules: Eligibility rule table (DEFAULT_ELIGIBILITY_RULES if not given)
+
+    Returns:
+        Per store slot shortfall in people (0 where the slot is feasible)
+    """
+    rules = rules or DEFAULT_ELIGIBILITY_RULES
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[current_day])
+    open_slot = grid.open_slots.start
+    demand = task_demand(current_day)
+    capabilities = _capabilities(current_day, tuple(templates), tuple(sorted(department_mix)),
+                                 json.dumps(rules, sort_keys=True))
+
+    # Per store slot: tasks a person can hold -> people
+    available: List[Dict[FrozenSet[str], int]] = [{} for _ in demand]
+    # Long-shift people per break window, as (template, department) -> people
+    long_groups: Dict[Tuple[range, range], Dict[Tuple[int, str], int]] = {}
+
+    for i, ((start, end), count) in enumerate(zip(templates, counts)):
+        if count <= 0:
+            continue
+        shift = grid.shift_span((start, end))
+        for dept, n in _apportion(count, department_mix, rules).items():
+            if n <= 0:
+                continue
+            for slot, held in capabilities[(i, dept)].items():
+                staff = available[slot - open_slot]
+                staff[held] = staff.get(held, 0) + n
+            windows = _break_window(current_day, shift.start)
+            if len(shift) * grid.interval / 60 > LONG_SHIFT_HOURS and windows is not None:
+                group = long_groups.setdefault(windows, {})
+                group[(i, dept)] = group.get((i, dept), 0) + n
+
+    for windows, members in long_groups.items():
+        total = sum(members.values())
+        for window, away in zip(windows, (total // 2, total - total // 2)):
+            for slot in window:
+                idx = slot - open_slot
+                if not 0 <= idx < len(demand):
+                    continue
+                present: Dict[FrozenSet[str], int] = {}
+                for person, n in members.items():
+                    held = capabilities[person].get(slot)
+                    if held:
+                        present[held] = present.get(held, 0) + n
+                left = away
+                for held in sorted(present, key=lambda tasks: (-len(tasks), sorted(tasks))):
+                    gone = min(left, present[held], available[idx].get(held, 0))
+                    available[idx][held] = available[idx].get(held, 0) - gone
+                    left -= gone
+
+    return [_shortfall(tuple(seats.items()), frozenset(staff.items())) for seats, staff in zip(demand, available)]
+
+
+@lru_cache(maxsize=4096)
+def _solve_covering(demand: Tuple[int, ...], intervals: Tuple[Tuple[int, int], ...]) -> Optional[Tuple[int, ...]]:
+    """Minimum total x with sum of x over intervals covering t >= demand[t]
+
+    Intervals are half-open [a, b) over slot positions. The constraint matrix has
+    consecutive ones, so differencing rows turns it into a min-cost flow on a path:
+    interval arcs b -> a cost 1, surplus arcs t -> t+1 cost 0. Successive shortest
+    paths gives an integral optimum. Returns None if some demand cannot be covered.
+    """
+    n_nodes = len(demand) + 1
+    # Arc lists: [to, residual capacity, cost, reverse arc index, interval index or -1]
+    graph: List[List[list]] = [[] for _ in range(n_nodes)]
+    infinite = sum(demand) + 1
+
+    def add_arc(u, v, cost, interval):
+        graph[u].append([v, infinite, cost, len(graph[v]), interval])
+        graph[v].append([u, 0, -cost, len(graph[u]) - 1, -1])
+
+    for k, (a, b) in enumerate(intervals):
+        if a < b:
+            add_arc(b, a, 1, k)
+    for t in range(n_nodes - 1):
+        add_arc(t, t + 1, 0, -1)
+
+    balance = [0] * n_nodes
+    previous = 0
+    for t in range(n_nodes):
+        current = demand[t] if t < len(demand) else 0
+        balance[t] = current - previous  # > 0 means node needs inflow
+        previous = current
+
+    while any(b < 0 for b in balance):
+        # Bellman-Ford from every remaining supply at once (a zero-cost super source)
+        dist = [0 if balance[t] < 0 else math.inf for t in range(n_nodes)]
+        parent = [None] * n_nodes
+        for _ in range(n_nodes):
+            changed = False
+            for u in range(n_nodes):
+                if dist[u] == math.inf:
+                    continue
+                for i, (v, cap, cost, _, _) in enumerate(graph[u]):
+                    if cap > 0 and dist[u] + cost < dist[v]:
+                        dist[v] = dist[u] + cost
+                        parent[v] = (u, i)
+                        changed = True
+            if not changed:
+                break
+
+        sinks = [t for t in range(n_nodes) if balance[t] > 0 and dist[t] < math.inf]
+        if not sinks:
+            return None
+        sink = min(sinks, key=lambda t: dist[t])
+
+        path = []
+        node = sink
+        while parent[node] is not None:
+            u, i = parent[node]
+            path.append((u, i))
+            node = u
+        source = node
+
+        amount = min([-balance[source], balance[sink]] + [graph[u][i][1] for u, i in path])
+        for u, i in path:
+            arc = graph[u][i]
+            arc[1] -= amount
+            graph[arc[0]][arc[3]][1] += amount
+        balance[source] += amount
+        balance[sink] -= amount
+
+    result = [0] * len(intervals)
+    for u in range(n_nodes):
+        for v, cap, cost, rev, interval in graph[u]:
+            if interval >= 0:
+                result[interval] = graph[v][rev][1]
+    return tuple(result)
+
+
+def plan_minimum_staffing(current_day: str,
+                          templates: List[Tuple[str, str]],
+                          department_mix: Dict[str, float],
+                          max_rounds: int = 200,
+                          rules: Optional[Dict[str, Dict[str, object]]] = None) -> Dict[str, object]:
+    """Find the fewest people on the given shift templates that keep every slot feasible
+
+    The covering core is solved exactly as a min-cost flow. Break relief, the hurdle
+    slot and class rounding are folded in by re-checking with evaluate_staffing and
+    raising demand where a slot is still short, until every slot passes.
+    A short descent then removes the slack rounding leaves behind.
+
+    Returns:
+        Dictionary with "counts" per template (None if infeasible), "total",
+        and "uncoverable" store slots no template can serve
+    """
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[current_day])
+    open_slot = grid.open_slots.start
+    demand = slot_demand(current_day)
+    rules = rules or DEFAULT_ELIGIBILITY_RULES
+
+    if not any(_department_tasks(dept, rules) for dept, share in department_mix.items() if share > 0):
+        return {"counts": None, "total": None, "uncoverable": [open_slot + i for i in range(len(demand))]}
+
+    # Every CS seat needs a person, so the seat count is a lower bound on headcount
+    people = [cs for _, cs in demand]
+
+    # Each template covers the slots its staff can hold a CS task on, per the rules
+    capabilities = _capabilities(current_day, tuple(templates), tuple(sorted(department_mix)),
+                                 json.dumps(rules, sort_keys=True))
+    intervals = []
+    covered = set()
+    for i in range(len(templates)):
+        held = sorted({slot - open_slot for dept, share in department_mix.items() if share > 0
+                       for slot in capabilities[(i, dept)]})
+        covered.update(held)
+        intervals.append((held[0], held[-1] + 1) if held else (0, 0))
+    intervals = tuple(intervals)
+
+    uncoverable = [open_slot + i for i in range(len(demand)) if i not in covered]
+    if uncoverable:
+        return {"counts": None, "total": None, "uncoverable": uncoverable}
+
+    counts = None
+    for _ in range(max_rounds):
+        solution = _solve_covering(tuple(people), intervals)
+        if solution is None:
+            break
+        shortfall = evaluate_staffing(current_day, templates, list(solution), department_mix, rules)
+        if not any(shortfall):
+            counts = list(solution)
+            break
+        for i, short in enumerate(shortfall):
+            if short:
+                people[i] += 1
+
+    if counts is None:
+        return {"counts": None, "total": None, "uncoverable": []}
+
+    counts = _trim_staffing(current_day, templates, counts, department_mix, rules)
+    return {"counts": counts, "total": sum(counts), "uncoverable": []}
+
+
+def _is_feasible(current_day: str, templates: List[Tuple[str, str]], counts: Tuple[int, ...],
+                 department_mix: Tuple[Tuple[str, float], ...],
+                 rules: Optional[Dict[str, Dict[str, object]]] = None) -> bool:
+    return not any(evaluate_staffing(current_day, templates, list(counts), dict(department_mix), rules))
+
+
+def _trim_staffing(current_day: str,
+                   templates: List[Tuple[str, str]],
+                   counts: List[int],
+                   department_mix: Dict[str, float],
+                   rules: Optional[Dict[str, Dict[str, object]]] = None) -> List[int]:
+    """Drop people, or move one person between templates and drop another, while still feasible
+
+    Class rounding and break groups are not linear, so the flow answer can carry a
+    person or two of slack; this descent removes it.
+    """
+    mix = tuple(sorted(department_mix.items()))
+    feasible = lru_cache(maxsize=None)(
+        lambda candidate: _is_feasible(current_day, templates, candidate, mix, rules))
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(counts)):
+            if counts[i] == 0:
+                continue
+            candidate = list(counts)
+            candidate[i] -= 1
+            if feasible(tuple(candidate)):
+                counts = candidate
+                improved = True
+                break
+            # Swap two people on template i for one on template j
+            for j in range(len(counts)):
+                if j == i or counts[i] < 2:
+                    continue
+                swapped = list(counts)
+                swapped[i] -= 2
+                swapped[j] += 1
+                if feasible(tuple(swapped)):
+                    counts = swapped
+                    improved = True
+                    break
+            if improved:
+                break
+    return counts
+
+
+def print_plan(current_day: str, templates: List[Tuple[str, str]], plan: Dict[str, object]) -> None:
+    """Print a planner result"""
+    print(f"\n📐 MINIMUM STAFFING - {current_day}")
+    print("-" * 40)
+    if plan["counts"] is None:
+        if plan["uncoverable"]:
+            print(f"⚠️  No template covers slots: {plan['uncoverable']}")
+        else:
+            print("⚠️  No feasible staffing found")
+        return
+    for (start, end), count in zip(templates, plan["counts"]):
+        print(f"  {start}-{end}: {count}")
+    print(f"  Total: {plan['total']}")
+
+
+def print_what_if(current_day: str, counts: List[int], shortfall: List[int]) -> None:
+    """Print per-slot shortfalls for a proposed staffing"""
+    open_slot = time_grid(hours=RosterConfig.STORE_HOURS[current_day]).open_slots.start
+    print(f"\n🔍 WHAT-IF - {current_day} ({sum(counts)} people)")
+    print("-" * 40)
+    short_slots = [(open_slot + i, short) for i, short in enumerate(shortfall) if short]
+    if not short_slots:
+        print("✅ Every slot feasible")
+        return
+    for slot, short in short_slots:
+        print(f"⚠️  Slot {slot}: short {short}")
+
+
+def _parse_mix(pairs: Optional[List[str]]) -> Dict[str, float]:
+    mix = {}
+    for pair in pairs or []:
+        dept, _, share = pair.rpartition("=")
+        mix[dept] = float(share)
+    return mix or {"M's": 1.0}
+
+
+def main() -> None:
+    """Plan minimum headcount per day, or check a proposed staffing"""
+    parser = argparse.ArgumentParser(description="Minimum-headcount what-if planner")
+    parser.add_argument("days", nargs="*", default=list(RosterConfig.STORE_HOURS),
+                        help="Days to plan (default: whole week)")
+    parser.add_argument("--template", action="append", metavar="HH:MM-HH:MM",
+                        help="Shift template (repeatable; defaults to full/opening/closing shifts)")
+    parser.add_argument("--mix", nargs="*", metavar="DEPT=SHARE", help="Department mix")
+    parser.add_argument("--counts", nargs="*", type=int, metavar="N",
+                        help="Headcount per template to check instead of planning")
+    parser.add_argument("--minus", type=int, default=0,
+                        help="Check the minimum plan with this many fewer people")
+    parser.add_argument("--rules-file", default=None,
+                        help="JSON eligibility rule table (default: RosterConfig.ELIGIBILITY_RULES_FILE or built-in rules)")
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    rules = load_rules_file(args.rules_file) if args.rules_file else resolve_rules(
+        config_file=RosterConfig.ELIGIBILITY_RULES_FILE)
+    for day in args.days:
+        templates = [parse_template(t) for t in args.template] if args.template else default_templates(day)
+        if args.counts is not None:
+            if len(args.counts) != len(templates):
+                parser.error(f"--counts needs one headcount per template: got {len(args.counts)} for "
+                             f"{len(templates)} templates on {day} "
+                             f"({', '.join(f'{start}-{end}' for start, end in templates)})")
+            print_what_if(day, args.counts, evaluate_staffing(day, templates, args.counts, mix, rules))
+            continue
+
+        plan = plan_minimum_staffing(day, templates, mix, rules=rules)
+        print_plan(day, templates, plan)
+        if args.minus and plan["counts"] is not None:
+            reduced = list(plan["counts"])
+            for _ in range(args.minus):
+                largest = max(range(len(reduced)), key=lambda i: reduced[i])
+                reduced[largest] = max(reduced[largest] - 1, 0)
+            print_what_if(day, reduced, evaluate_staffing(day, templates, reduced, mix, rules))
+
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_planner`
+
+class TestEvaluateStaffing(unittest.TestCase):
+    def _seats(self, day):
+        return [sum(seats.values()) for seats in task_demand(day)]
+
+    def test_only_candidate_within_end_buffer_is_short(self):
+        # The 17:15 shift ends inside FR/GR/R's 2-slot end buffer from its first slot
+        templates = [("09:30", "17:15"), ("17:15", "18:00")]
+        open_slot = time_grid(hours=RosterConfig.STORE_HOURS["M"]).open_slots.start
+        shortfall = evaluate_staffing("M", templates, [6, 6], {"M's": 1.0})
+        self.assertEqual(shortfall[69 - open_slot:], self._seats("M")[69 - open_slot:])
+        # The day shift is held on its last task through its own buffer
+        self.assertEqual(shortfall[68 - open_slot], 0)
+        self.assertEqual(plan_minimum_staffing("M", templates, {"M's": 1.0})["uncoverable"], [69, 70, 71])
+
+    def test_fallback_tier_counts_and_rules_are_followed(self):
+        templates = [("09:30", "18:00")]
+        # F is only on FR's fallback tier
+        self.assertFalse(any(evaluate_staffing("M", templates, [12], {"F": 1.0})))
+        primary_only = {
+            "FR": {"end_buffer": 2, "tiers": [{"departments": ["M's"]}]},
+            "GR": {"end_buffer": 2, "tiers": [{}]},
+            "R": {"end_buffer": 2, "tiers": [{}]},
+        }
+        shortfall = evaluate_staffing("M", templates, [12], {"F": 1.0}, primary_only)
+        self.assertTrue(all(short >= 1 for short in shortfall))
+
+    def test_management_only_takes_registers(self):
+        templates = [("09:30", "18:00")]
+        self.assertEqual(set(evaluate_staffing("M", templates, [12], {"SPV": 1.0})), {2})
+        self.assertEqual(set(evaluate_staffing("M", templates, [12], {"ADM": 1.0})), set(self._seats("M")))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,48 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
-from helper import timespan_to_slot
-from collections import defaultdict
-import pandas as pd
-from openpyxl.styles import PatternFill, Alignment, Font, Border, Side
-from openpyxl.utils import get_column_letter
+from roster_intervals import RosterIntervals
+from roster_eligibility import normalize_department_key
+from roster_time import time_grid
+
+# Define colors for tasks and departments (RGB hex without '#')
+TASK_COLORS = {
+    # Departments
+    "M's": "DAF2D0",        # Mens (incl. M's inner)
+    "L's": "B5E6A2",        # Ladies (incl. W's inner)
+    "K": "8ED973",          # Kids
+    "M/K": "47D359",        # Mens + Kids
+    "Acc.": "C1F0C8",       # Accessories
+    "Fab": "DAE9F8",        # Fabric
+    "Fab.": "DAE9F8",       # Fabric (alt label)
+    "HW": "A6C9EC",         # Homewear
+    "Stat.": "83CCEB",      # Stationery
+    "H&B": "44B3E1",        # Health & Beauty
+    "HH": "4D93D9",         # Household
+    "F": "FBE2D5",          # Food
+    # Tasks
+    "40": "D9D9D9",         # 40min break
+    "15": "D9D9D9",         # 15min break
+    "10": "D9D9D9",         # 10min break
+    "R": "BE5014",          # Register
+    "FR": "F1A983",         # Fitting room
+    "LD": "FFC000",         # Leader
+    "GR": "F7C7AC",         # Greeter
+    "H": "074F69"           # H
+}
 
 def slot_to_time(slot):
     """Convert slot number back to time string (00:00 base, 15-min slots)."""
-    # Start from midnight so slot 40 => 10:00 (40*15 = 600 minutes)
-    start_time = datetime.strptime("00:00", "%H:%M")
-    slot_time = start_time + timedelta(minutes=slot * 15)
-    return slot_time.strftime("%H:%M")
+    # Start from midnight so slot 40 => 10:00 (40*15 = 600 minutes); slot 96 => next day's 00:00
+    return time_grid().label(slot)
 def to_12h(time_str: str) -> str:
     """Convert 'HH:MM' (24h) to 'H:MM AM/PM' (12h)."""
-    try:
-        dt = datetime.strptime(time_str, "%H:%M")
-        return dt.strftime("%I:%M %p").lstrip("0")
-    except Exception:
-        return time_str
+    return time_grid().to_12h(time_str)
 
 
 def add_15_minutes(time_str):
     """Add 15 minutes to a time string - kept for potential future use"""
-    time_obj = datetime.strptime(time_str, "%H:%M")
-    new_time = time_obj + timedelta(minutes=15)
-    return new_time.strftime("%H:%M")
+    minute_grid = time_grid(1)
+    return minute_grid.label(minute_grid.slot(time_str) + 15)
 
 
 def format_task_name(task):
@@ -46,246 +63,61 @@ def format_task_name(task):
     return task_names.get(task, task)
 
 
+def _print_sections(sections, roster, current_day, store_hours, working_employees=None, intervals=None):
+    """Build the report model once and print the requested sections in a single write"""
+    # Imported here: the report engine builds on this module
+    from roster_report import build_report, write_report
+    report = build_report(roster, current_day, store_hours, working_employees, intervals)
+    write_report([report], "text", sections=sections)
+
+
 def print_roster_header(current_day, store_hours):
     """Print formatted header for the roster"""
-    day_names = {
-        "M": "Monday", "T": "Tuesday", "W": "Wednesday",
-        "Th": "Thursday", "F": "Friday", "Sa": "Saturday", "Su": "Sunday"
-    }
-
-    print("=" * 80)
-    print(f"STORE ROSTER - {day_names[current_day].upper()}")
-    print(
-        f"Store Hours: {store_hours[current_day][0]} - {store_hours[current_day][1]}")
-    print("=" * 80)
+    _print_sections(("header",), {}, current_day, store_hours)
 
 
 def print_coverage_summary(roster, current_day, store_hours):
     """Print coverage summary for customer service tasks"""
-    print("\n📋 CUSTOMER SERVICE COVERAGE SUMMARY")
-    print("-" * 50)
-
-    store_opening_slots = timespan_to_slot(store_hours[current_day])
-    uncovered_slots = {"FR": [], "GR": [], "R": []}
+    _print_sections(("coverage",), roster, current_day, store_hours)
 
-    for slot in store_opening_slots:
-        for task in ["FR", "GR", "R"]:
-            if len(roster[slot][task]) == 0:
-                uncovered_slots[task].append(slot)
 
-    task_names = {"FR": "Fitting Room", "GR": "Greeter", "R": "Register"}
-
-    for task, task_name in task_names.items():
-        if uncovered_slots[task]:
-            uncovered_slots_str = [
-                f"Slot {slot}" for slot in uncovered_slots[task]]
-            print(
-                f"⚠️  {task_name}: UNCOVERED at {', '.join(uncovered_slots_str)}")
-        else:
-            print(f"✅ {task_name}: Fully covered")
-
-
-def print_employee_schedule(roster, current_day, working_employees):
+def print_employee_schedule(roster, current_day, working_employees, intervals=None):
     """Print individual employee schedules"""
-    print("\n👥 INDIVIDUAL EMPLOYEE SCHEDULES")
-    print("-" * 50)
-
-    # Get all employees and their shifts
-    employee_schedules = defaultdict(list)
-
-    for slot in roster:
-        for task_or_dept in roster[slot]:
-            for employee in roster[slot][task_or_dept]:
-                employee_schedules[employee].append((slot, task_or_dept))
-
-    # Sort employees by name
-    for employee in sorted(employee_schedules.keys()):
-        print(
-            f"{employee} ({working_employees[employee]['department']} - Shift {working_employees[employee]['shift']}):")
-
-        # Group consecutive same tasks
-        schedule = employee_schedules[employee]
-        if schedule:
-            # Sort by slot number
-            schedule.sort(key=lambda x: x[0])
-
-            current_task = schedule[0][1]
-            start_slot = schedule[0][0]
-            end_slot = schedule[0][0]
-
-            for i, (slot, task) in enumerate(schedule[1:], 1):
-                if task == current_task and slot == end_slot + 1:
-                    end_slot = slot
-                else:
-                    # Print previous task block
-                    if start_slot == end_slot:
-                        print(
-                            f"  Slot {start_slot}: {format_task_name(current_task)}")
-                    else:
-                        print(
-                            f"  Slots {start_slot}-{end_slot}: {format_task_name(current_task)}")
-                    current_task = task
-                    start_slot = slot
-                    end_slot = slot
-
-            # Print the last task block
-            if start_slot == end_slot:
-                print(f"  Slot {start_slot}: {format_task_name(current_task)}")
-            else:
-                print(
-                    f"  Slots {start_slot}-{end_slot}: {format_task_name(current_task)}")
-        else:
-            print("  No assignments")
+    _print_sections(("schedules",), roster, current_day, None, working_employees, intervals)
 
 
 def print_hourly_breakdown(roster, current_day, store_hours):
     """Print slot-by-slot breakdown showing who's doing what"""
-    print("\n🕒 SLOT-BY-SLOT BREAKDOWN")
-    print("-" * 80)
-
-    store_opening_slots = timespan_to_slot(store_hours[current_day])
-
-    for slot in roster:
-        if slot in store_opening_slots:
-            print(f"Slot {slot}:")
-
-            # Customer Service Tasks
-            cs_tasks = []
-            for task in ["FR", "GR", "R"]:
-                if roster[slot][task]:
-                    cs_tasks.append(f"{task}: {', '.join(roster[slot][task])}")
-                else:
-                    cs_tasks.append(f"{task}: EMPTY")
-
-            print(f"  CS: {' | '.join(cs_tasks)}")
-
-            # Other activities
-            other_activities = []
-            for activity in ["Break", "H"]:
-                if roster[slot][activity]:
-                    other_activities.append(
-                        f"{activity}: {', '.join(roster[slot][activity])}")
-
-            if other_activities:
-                print(f"  Other: {' | '.join(other_activities)}")
-
-            # Department work
-            dept_work = []
-            for dept in ["HH", "L's", "M's", "H&B"]:
-                if roster[slot][dept]:
-                    dept_work.append(
-                        f"{dept}: {', '.join(roster[slot][dept])}")
-
-            if dept_work:
-                print(f"  Dept: {' | '.join(dept_work)}")
-
-            print()  # Add space between slots
+    _print_sections(("breakdown",), roster, current_day, store_hours)
 
 
 def print_register_coverage(roster, current_day, store_hours):
     """Print register staffing levels for each slot"""
-    print("\n🧾 REGISTER STAFFING LEVELS")
-    print("-" * 50)
-
-    store_opening_slots = timespan_to_slot(store_hours[current_day])
-
-    for slot in store_opening_slots:
-        register_staff = roster[slot]["R"]
-        staff_count = len(register_staff)
-
-        if staff_count == 0:
-            status = "⚠️  NO COVERAGE"
-        elif staff_count == 1:
-            status = "✅ MINIMAL"
-        elif staff_count <= 3:
-            status = "✅ GOOD"
-        else:
-            status = "🔥 HEAVY"
-
-        time_str = slot_to_time(slot)
-        print(f"Slot {slot} ({time_str}): {staff_count} people - {status}")
-        if register_staff:
-            print(f"  Staff: {', '.join(register_staff)}")
-        print()
+    _print_sections(("register",), roster, current_day, store_hours)
 
 
 def print_statistics(roster, current_day, store_hours, working_employees):
     """Print useful statistics"""
-    print("\n📊 ROSTER STATISTICS")
-    print("-" * 40)
-
-    store_opening_slots = timespan_to_slot(store_hours[current_day])
-
-    # Count task assignments per employee
-    employee_task_counts = defaultdict(lambda: defaultdict(int))
-    total_cs_slots = 0
-
-    for slot in store_opening_slots:
-        for task in ["FR", "GR", "R"]:
-            for employee in roster[slot][task]:
-                employee_task_counts[employee][task] += 1
-                total_cs_slots += 1
-
-    print("Customer Service Task Distribution:")
-    for employee in sorted(working_employees.keys()):
-        fr_count = employee_task_counts[employee]["FR"]
-        gr_count = employee_task_counts[employee]["GR"]
-        r_count = employee_task_counts[employee]["R"]
-        total = fr_count + gr_count + r_count
-
-        if total > 0:
-            print(
-                f"  {employee}: FR({fr_count}) GR({gr_count}) R({r_count}) = {total} slots")
-
-    print(f"\nTotal CS slots filled: {total_cs_slots}")
-    print(f"Required CS slots: {len(store_opening_slots) * 3}")
-    coverage_percentage = (
-        total_cs_slots / (len(store_opening_slots) * 3)) * 100
-    print(f"Coverage: {coverage_percentage:.1f}%")
-
-    # Register staffing summary
-    register_counts = []
-    for slot in store_opening_slots:
-        register_counts.append(len(roster[slot]["R"]))
-
-    if register_counts:
-        print(f"\nRegister Staffing Summary:")
-        print(
-            f"  Average staff per slot: {sum(register_counts) / len(register_counts):.1f}")
-        print(f"  Minimum staff: {min(register_counts)}")
-        print(f"  Maximum staff: {max(register_counts)}")
-
-        # Count slots by staffing level
-        no_coverage = sum(1 for count in register_counts if count == 0)
-        minimal = sum(1 for count in register_counts if count == 1)
-        good = sum(1 for count in register_counts if 2 <= count <= 3)
-        heavy = sum(1 for count in register_counts if count > 3)
-
-        print(f"  Slots with no coverage: {no_coverage}")
-        print(f"  Slots with minimal coverage (1): {minimal}")
-        print(f"  Slots with good coverage (2-3): {good}")
-        print(f"  Slots with heavy coverage (4+): {heavy}")
+    _print_sections(("statistics",), roster, current_day, store_hours, working_employees)
 
 
 def print_cs_coverage_totals(roster, current_day, store_hours):
     """Print total coverage count for each CS task per slot"""
-    print("\n CS TASK COVERAGE TOTALS")
-    print("-" * 50)
-
-    store_opening_slots = timespan_to_slot(store_hours[current_day])
+    _print_sections(("cs_totals",), roster, current_day, store_hours)
 
-    print(f"{'Slot':<6} {'FR':<4} {'GR':<4} {'R':<4}")
-    print("-" * 20)
 
-    for slot in store_opening_slots:
-        fr_count = len(roster[slot]["FR"])
-        gr_count = len(roster[slot]["GR"])
-        r_count = len(roster[slot]["R"])
+def export_roster_to_excel(roster, current_day, working_employees, filename=None, intervals=None,
+                           template=False):
+    if template:
+        # Imported here: the template exporter builds on this module
+        from roster_template import export_roster_from_template
+        return export_roster_from_template(roster, current_day, working_employees, filename, intervals)
 
-        print(f"{slot:<6} {fr_count:<4} {gr_count:<4} {r_count:<4}")
+    # Heavy imports stay here so console-only runs never load pandas/openpyxl
+    import pandas as pd
+    from openpyxl.styles import PatternFill, Alignment, Font, Border, Side
+    from openpyxl.utils import get_column_letter
 
-
-def export_roster_to_excel(roster, current_day, working_employees, filename=None):
     output_dir = "roster_output"
     os.makedirs(output_dir, exist_ok=True)  # create folder if not exists
 
@@ -307,15 +139,19 @@ def export_roster_to_excel(roster, current_day, working_employees, filename=None
     employee_schedules = {emp: {slot: "" for slot in slots}
                           for emp in working_employees.keys()}
 
-    for slot in original_slots:
-        for task_or_dept, employees in roster[slot].items():
-            for emp in employees:
-                if emp in employee_schedules:
-                    task_name = task_or_dept
-                    if employee_schedules[emp][slot]:
-                        employee_schedules[emp][slot] += f" + {task_name}"
-                    else:
-                        employee_schedules[emp][slot] = task_name
+    if intervals is None:
+        intervals = RosterIntervals.from_roster(roster)
+
+    for emp, blocks in intervals.items():
+        if emp not in employee_schedules:
+            continue
+        schedule = employee_schedules[emp]
+        for start, end, task_name in blocks:
+            for slot in range(start, end):
+                if schedule[slot]:
+                    schedule[slot] += f" + {task_name}"
+                else:
+                    schedule[slot] = task_name
 
     # Sort employees by shift then name
     sorted_employees = sorted(employee_schedules.keys(),
@@ -346,31 +182,7 @@ def export_roster_to_excel(roster, current_day, working_employees, filename=None
     df.insert(2, "Start", start_info)
     df.insert(3, "Finish", finish_info)
 
-    # Define colors for tasks and departments (RGB hex without '#')
-    color_map = {
-        # Departments
-        "M's": "DAF2D0",        # Mens (incl. M's inner)
-        "L's": "B5E6A2",        # Ladies (incl. W's inner)
-        "K": "8ED973",          # Kids
-        "M/K": "47D359",        # Mens + Kids
-        "Acc.": "C1F0C8",       # Accessories
-        "Fab": "DAE9F8",        # Fabric
-        "Fab.": "DAE9F8",       # Fabric (alt label)
-        "HW": "A6C9EC",         # Homewear
-        "Stat.": "83CCEB",      # Stationery
-        "H&B": "44B3E1",        # Health & Beauty
-        "HH": "4D93D9",         # Household
-        "F": "FBE2D5",          # Food
-        # Tasks
-        "40": "D9D9D9",         # 40min break
-        "15": "D9D9D9",         # 15min break
-        "10": "D9D9D9",         # 10min break
-        "R": "BE5014",          # Register
-        "FR": "F1A983",         # Fitting room
-        "LD": "FFC000",         # Leader
-        "GR": "F7C7AC",         # Greeter
-        "H": "074F69"           # H
-    }
+    color_map = TASK_COLORS
 
     try:
         with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
@@ -382,9 +194,8 @@ def export_roster_to_excel(roster, current_day, working_employees, filename=None
             worksheet.insert_rows(1)
             first_time_col = 5  # A:First Name, B:Dept, C:Start, D:Finish, E: first slot
             # Populate minute row (row 2) as 00, 15, 30, 45 and hour row (row 1) with merged headers
-            for i, slot in enumerate(slots):
+            for i, time_str in enumerate(time_grid().labels(slots)):  # e.g. "10:15"
                 col_idx = first_time_col + i
-                time_str = slot_to_time(slot)  # e.g. "10:15"
                 hour_str, minute_str = time_str.split(":")
                 # Set minute on row 2
                 worksheet.cell(row=2, column=col_idx).value = minute_str
@@ -466,16 +277,8 @@ def export_roster_to_excel(roster, current_day, working_employees, filename=None
             # Color the Dept column based on department
             for row_idx, emp in enumerate(list(df["First Name"]), start=3):
                 cell = worksheet.cell(row=row_idx, column=2)
-                dept = working_employees.get(emp, {}).get("department", "")
                 # Normalize department keys to match color map
-                if dept == "M":
-                    dept = "M's"
-                elif dept == "L":
-                    dept = "L's"
-                elif dept == "Acc":
-                    dept = "Acc."
-                elif dept == "Stat":
-                    dept = "Stat."
+                dept = normalize_department_key(working_employees.get(emp, {}).get("department", ""))
                 fill_color = color_map.get(dept, "FFFFFF")
                 cell.fill = PatternFill(start_color=fill_color,
                                         end_color=fill_color,
@@ -489,7 +292,8 @@ def export_roster_to_excel(roster, current_day, working_employees, filename=None
                 emp_slots = []
                 if emp_info and emp_info.get("shift"):
                     try:
-                        emp_slots = list(timespan_to_slot(emp_info["shift"]))
+                        emp_slots = list(time_grid().shift_span(
+                            emp_info["shift"], range(open_start_slot, open_end_slot + 1)))
                     except Exception:
                         emp_slots = []
                 for i, slot in enumerate(slots):
@@ -504,15 +308,7 @@ def export_roster_to_excel(roster, current_day, working_employees, filename=None
                     elif slot > open_end_slot:
                         if slot in emp_slots:
                             # After-closing buffer: if still working, show department
-                            dept = working_employees.get(emp, {}).get("department", "")
-                            if dept == "M":
-                                dept = "M's"
-                            elif dept == "L":
-                                dept = "L's"
-                            elif dept == "Acc":
-                                dept = "Acc."
-                            elif dept == "Stat":
-                                dept = "Stat."
+                            dept = normalize_department_key(working_employees.get(emp, {}).get("department", ""))
                             cell.value = dept
                             fill_color = color_map.get(dept, "FFFFFF")
                             cell.fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
@@ -547,9 +343,8 @@ def export_roster_to_excel(roster, current_day, working_employees, filename=None
         print(f"❌ Error exporting to Excel: {str(e)}")
         return None
 
-def create_summary_sheet(writer, roster, current_day, slots):
-    """Create a summary sheet with coverage statistics"""
-
+def summary_rows(roster, slots):
+    """Per-slot coverage counts shown on the summary sheet"""
     summary_data = []
 
     # Coverage summary for each slot
@@ -578,9 +373,16 @@ def create_summary_sheet(writer, roster, current_day, slots):
         slot_summary["Total Working"] = total_working
 
         summary_data.append(slot_summary)
+    return summary_data
+
+
+def create_summary_sheet(writer, roster, current_day, slots):
+    """Create a summary sheet with coverage statistics"""
+    import pandas as pd
+    from openpyxl.styles import Alignment
 
     # Convert to DataFrame
-    summary_df = pd.DataFrame(summary_data)
+    summary_df = pd.DataFrame(summary_rows(roster, slots))
 
     # Write to Excel
     summary_df.to_excel(
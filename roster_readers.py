@@ -0,0 +1,303 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# -----------------------------
+# Weekly/Team workbook readers
+# -----------------------------
+
+# Layout of the Weekly sheet (0-based row/column indices, as pandas numbers them)
+WEEKLY_HEADER_ROW = 7
+WEEKLY_ID_COLUMNS = (1, 2, 3, 4)  # ID, first name, last name, contract
+DAY_START_COLUMNS = {
+    "M": 6,   # Monday Start column
+    "T": 9,   # Tuesday Start column
+    "W": 12,  # Wednesday Start column
+    "Th": 15, # Thursday Start column
+    "F": 18,  # Friday Start column
+    "Sa": 21, # Saturday Start column
+    "Su": 24  # Sunday Start column
+}
+
+# The Team sheet's header is on its third row
+TEAM_HEADER_ROW = 2
+TEAM_COLUMNS = ("Employee Id", "First Name", "Last Name", "Department")
+
+# "pandas" is the original full-sheet read in helper.read_from_excel_new_format
+READER_BACKENDS = ("pandas", "pandas-usecols", "openpyxl", "calamine")
+DEFAULT_READER_BACKEND = "pandas"
+
+
+def available_backends() -> List[str]:
+    """Backends usable in this environment"""
+    backends = list(READER_BACKENDS)
+    if importlib.util.find_spec("python_calamine") is None:
+        backends.remove("calamine")
+    return backends
+
+
+def day_columns(day_of_week: str) -> List[int]:
+    """Weekly sheet columns one day needs: ID/name/contract plus Start, End, Hours"""
+    if day_of_week not in DAY_START_COLUMNS:
+        raise ValueError(f"Invalid day: {day_of_week}. Must be one of: {list(DAY_START_COLUMNS.keys())}")
+    start_col = DAY_START_COLUMNS[day_of_week]
+    return list(WEEKLY_ID_COLUMNS) + [start_col, start_col + 1, start_col + 2]
+
+
+def sheet_names(file_path: str) -> List[str]:
+    """Sheet names of a workbook without reading any cells"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _blank(value) -> bool:
+    # None from openpyxl, NaN/NaT from pandas
+    return value is None or value != value
+
+
+def _text(value) -> str:
+    return "" if _blank(value) else str(value)
+
+
+def _time_text(value) -> str:
+    return value.strftime("%H:%M") if hasattr(value, "strftime") else str(value)
+
+
+def department_mapping(team_rows: Iterable[Sequence]) -> Dict[str, str]:
+    """Employee name -> department from (id, first, last, department) rows"""
+    mapping = {}
+    for employee_id, first_name, last_name, department in team_rows:
+        if _blank(employee_id) or _blank(first_name) or _blank(last_name):
+            continue
+        employee_name = f"{first_name} {last_name}".strip()
+        mapping[employee_name] = "" if _blank(department) else department
+    return mapping
+
+
+def employees_from_rows(rows: Iterable[Sequence], day_of_week: str,
+                        employee_dept_mapping: Dict[str, str]) -> Dict[str, Dict[str, object]]:
+    """Build working_employees from Weekly data rows
+
+    Each row holds the values of day_columns(day_of_week), in that order.
+    """
+    working_employees = {}
+    for row in rows:
+        employee_id, first_name, last_name, contract, start_time, end_time, hours = row
+        # Skip empty rows
+        if _blank(employee_id):
+            continue
+        employee_name = f"{_text(first_name)} {_text(last_name)}".strip()
+        if not employee_name:
+            continue
+        # Only include employees who have a shift on the selected day
+        if _blank(start_time) or _blank(end_time):
+            continue
+        try:
+            hours_float = 0 if _blank(hours) or hours == 0 else float(hours)
+        except (ValueError, TypeError):
+            continue
+        if hours_float <= 0:
+            continue
+        working_employees[employee_name] = {
+            "shift": (_time_text(start_time), _time_text(end_time)),
+            "department": employee_dept_mapping.get(employee_name, _text(contract)),
+            "employee_id": str(employee_id),
+            "hours": hours_float,
+        }
+    return working_employees
+
+
+def _read_openpyxl(file_path: str, day_of_week: str) -> Dict[str, Dict[str, object]]:
+    """Stream only the needed columns with openpyxl's read-only mode"""
+    from openpyxl import load_workbook
+
+    columns = day_columns(day_of_week)
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        team_rows = workbook["Team"].iter_rows(min_row=TEAM_HEADER_ROW + 1, values_only=True)
+        header = list(next(team_rows, ()))
+        team_idx = [header.index(name) for name in TEAM_COLUMNS]
+        mapping = department_mapping(
+            tuple(row[i] if i < len(row) else None for i in team_idx) for row in team_rows
+        )
+
+        weekly_rows = workbook["Weekly"].iter_rows(min_row=WEEKLY_HEADER_ROW + 2,
+                                                   max_col=max(columns) + 1, values_only=True)
+        return employees_from_rows(
+            (tuple(row[i] if i < len(row) else None for i in columns) for row in weekly_rows),
+            day_of_week, mapping,
+        )
+    finally:
+        workbook.close()
+
+
+def read_weekly_week(file_path: str) -> Dict[str, Dict[str, Dict[str, object]]]:
+    """Read every day of a Weekly/Team workbook in one openpyxl pass
+
+    Returns:
+        day -> working_employees, as read_weekly_format returns for that day
+    """
+    from openpyxl import load_workbook
+
+    last_col = max(DAY_START_COLUMNS.values()) + 2
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        team_rows = workbook["Team"].iter_rows(min_row=TEAM_HEADER_ROW + 1, values_only=True)
+        header = list(next(team_rows, ()))
+        team_idx = [header.index(name) for name in TEAM_COLUMNS]
+        mapping = department_mapping(
+            tuple(row[i] if i < len(row) else None for i in team_idx) for row in team_rows
+        )
+        weekly_rows = [
+            tuple(row) + (None,) * (last_col + 1 - len(row))
+            for row in workbook["Weekly"].iter_rows(min_row=WEEKLY_HEADER_ROW + 2, max_col=last_col + 1,
+                                                    values_only=True)
+        ]
+    finally:
+        workbook.close()
+
+    week = {}
+    for day in DAY_START_COLUMNS:
+        columns = day_columns(day)
+        week[day] = employees_from_rows((tuple(row[i] for i in columns) for row in weekly_rows), day, mapping)
+    return week
+
+
+def _read_pandas_usecols(file_path: str, day_of_week: str, engine: Optional[str] = None) -> Dict[str, Dict[str, object]]:
+    """Read only the needed columns through pandas"""
+    import pandas as pd
+
+    columns = day_columns(day_of_week)
+    team_df = pd.read_excel(file_path, sheet_name="Team", header=TEAM_HEADER_ROW,
+                            usecols=list(TEAM_COLUMNS), engine=engine)
+    mapping = department_mapping(team_df[list(TEAM_COLUMNS)].itertuples(index=False, name=None))
+
+    df = pd.read_excel(file_path, sheet_name="Weekly", header=None, usecols=columns, engine=engine)
+    rows = df.iloc[WEEKLY_HEADER_ROW + 1:].reindex(columns=columns)
+    return employees_from_rows(rows.itertuples(index=False, name=None), day_of_week, mapping)
+
+
+def read_weekly_format(file_path: str, day_of_week: str, backend: str = DEFAULT_READER_BACKEND) -> Dict[str, Dict[str, object]]:
+    """Read one day from a Weekly/Team workbook with the given backend
+
+    Raises:
+        ValueError: On an unknown backend or day
+    """
+    if backend == "openpyxl":
+        return _read_openpyxl(file_path, day_of_week)
+    if backend == "pandas-usecols":
+        return _read_pandas_usecols(file_path, day_of_week)
+    if backend == "calamine":
+        return _read_pandas_usecols(file_path, day_of_week, engine="calamine")
+    if backend == "pandas":
+        # Imported here: helper dispatches to this module
+        from helper import read_from_excel_new_format
+        return read_from_excel_new_format(file_path, day_of_week)
+    raise ValueError(f"Invalid backend: {backend}. Must be one of: {list(READER_BACKENDS)}")
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+
+def make_weekly_workbook(path: str, employees: int = 30, extra_columns: int = 0, seed: int = 0) -> str:
+    """Write a synthetic Weekly/Team workbook for benchmarks and stress runs
+
+    Args:
+        path: Output .xlsx path
+        employees: Number of employee rows
+        extra_columns: Filler columns appended after Sunday, like corporate exports carry
+        seed: Random seed for shifts and departments
+    """
+    import datetime
+    from openpyxl import Workbook
+
+    rnd = random.Random(seed)
+    departments = ["M", "L", "Acc", "HH", "H&B", "Stat", "F", "SPV", "ASM", "SM", "ADM"]
+    shifts = [(9, 0, 17, 30), (9, 30, 18, 0), (12, 0, 18, 0), (13, 0, 21, 0), (10, 0, 19, 0), (9, 0, 13, 0)]
+    first_extra = max(DAY_START_COLUMNS.values()) + 3
+
+    workbook = Workbook()
+    weekly = workbook.active
+    weekly.title = "Weekly"
+    weekly.cell(row=WEEKLY_HEADER_ROW + 1, column=WEEKLY_ID_COLUMNS[0] + 1, value="ID")
+    team = workbook.create_sheet("Team")
+    for col, name in enumerate(TEAM_COLUMNS, 1):
+        team.cell(row=TEAM_HEADER_ROW + 1, column=col, value=name)
+
+    for i in range(employees):
+        row = WEEKLY_HEADER_ROW + 2 + i
+        employee_id, first_name, last_name = 1000 + i, f"Emp{i}", f"L{i}"
+        for col, value in zip(WEEKLY_ID_COLUMNS, (employee_id, first_name, last_name, "FT")):
+            weekly.cell(row=row, column=col + 1, value=value)
+        for col, value in enumerate((employee_id, first_name, last_name, rnd.choice(departments)), 1):
+            team.cell(row=TEAM_HEADER_ROW + 2 + i, column=col, value=value)
+        for start_col in DAY_START_COLUMNS.values():
+            if rnd.random() < 0.8:
+                h1, m1, h2, m2 = rnd.choice(shifts)
+                weekly.cell(row=row, column=start_col + 1, value=datetime.time(h1, m1))
+                weekly.cell(row=row, column=start_col + 2, value=datetime.time(h2, m2))
+                weekly.cell(row=row, column=start_col + 3, value=(h2 * 60 + m2 - h1 * 60 - m1) / 60)
+        for col in range(first_extra, first_extra + extra_columns):
+            weekly.cell(row=row, column=col + 1, value=rnd.random())
+
+    workbook.save(path)
+    return path
+
+
+def benchmark_backends(file_path: str, day_of_week: str, backends: Optional[List[str]] = None,
+                       repeats: int = 3) -> Dict[str, float]:
+    """Median seconds per backend for one day; also checks all backends agree"""
+    backends = backends or available_backends()
+    timings, results = {}, {}
+    for backend in backends:
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[backend] = read_weekly_format(file_path, day_of_week, backend)
+            samples.append(time.perf_counter() - start)
+        timings[backend] = statistics.median(samples)
+    reference = results[backends[0]]
+    for backend in backends[1:]:
+        if results[backend] != reference:
+            print(f"⚠️ {backend} disagrees with {backends[0]} on {os.path.basename(file_path)} ({day_of_week})")
+    return timings
+
+
+def main() -> None:
+    """Compare reader backends on generated workbooks"""
+    parser = argparse.ArgumentParser(description="Benchmark Weekly/Team reader backends")
+    parser.add_argument("--employees", type=int, nargs="+", default=[30, 300], help="Employee counts")
+    parser.add_argument("--extra-columns", type=int, nargs="+", default=[0, 100], help="Filler columns")
+    parser.add_argument("--day", default="M", choices=list(DAY_START_COLUMNS), help="Day to read")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per backend")
+    parser.add_argument("--backends", nargs="*", choices=READER_BACKENDS, help="Backends to compare")
+    args = parser.parse_args()
+
+    backends = args.backends or available_backends()
+    print(f"{'employees':>9} {'extra cols':>10}  " + "  ".join(f"{b:>14}" for b in backends))
+    with tempfile.TemporaryDirectory() as tmp:
+        for employees in args.employees:
+            for extra in args.extra_columns:
+                path = make_weekly_workbook(os.path.join(tmp, f"bench_{employees}_{extra}.xlsx"),
+                                            employees, extra)
+                timings = benchmark_backends(path, args.day, backends, args.repeats)
+                print(f"{employees:>9} {extra:>10}  " +
+                      "  ".join(f"{timings[b] * 1000:>12.1f}ms" for b in backends))
+
+
+if __name__ == "__main__":
+    main()
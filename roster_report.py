@@ -0,0 +1,476 @@
+import argparse
+import contextlib
+import html
+import io
+import json
+import os
+import random
+import sys
+import time
+import unittest
+from typing import Dict, List, Optional, Sequence
+
+from roster_intervals import RosterIntervals
+from roster_printer import TASK_COLORS, format_task_name
+from roster_time import time_grid
+
+# -----------------------------
+# Report engine
+# -----------------------------
+
+CS_TASKS = ("FR", "GR", "R")
+OTHER_TASKS = ("40", "10", "H")
+REPORT_DEPARTMENTS = ("HH", "L's", "M's", "H&B")
+DAY_NAMES = {
+    "M": "Monday", "T": "Tuesday", "W": "Wednesday",
+    "Th": "Thursday", "F": "Friday", "Sa": "Saturday", "Su": "Sunday"
+}
+
+SECTIONS = ("header", "cs_totals", "coverage", "statistics", "register", "breakdown", "schedules")
+FORMATS = ("text", "json", "html")
+
+# Reports convert the same few slots thousands of times; the grid's label table makes each a lookup
+_slot_time = time_grid().label
+
+
+def register_status(staff_count: int) -> str:
+    """Register staffing level label for a slot"""
+    if staff_count == 0:
+        return "none"
+    if staff_count == 1:
+        return "minimal"
+    if staff_count <= 3:
+        return "good"
+    return "heavy"
+
+
+def build_report(roster: Dict[int, Dict[str, List[str]]],
+                 current_day: str,
+                 store_hours: Optional[Dict[str, tuple]] = None,
+                 working_employees: Optional[Dict[str, Dict[str, object]]] = None,
+                 intervals: Optional[RosterIntervals] = None) -> Dict[str, object]:
+    """Compute every report section in one pass over the open slots
+
+    Args:
+        roster: Dictionary mapping time slots to task assignments
+        current_day: Day of the week
+        store_hours: Opening hours by day (every roster slot when not given)
+        working_employees: Employee info; needed for statistics and schedules
+        intervals: Optional interval view, reused for the schedules section
+
+    Returns:
+        Plain dict/list report model (JSON-serialisable)
+    """
+    working_employees = working_employees or {}
+    if store_hours is not None:
+        hours = list(store_hours[current_day])
+        open_slots = [slot for slot in time_grid(hours=store_hours[current_day]).open_slots if slot in roster]
+    else:
+        open_slots = sorted(roster)
+        hours = [_slot_time(open_slots[0]), _slot_time(open_slots[-1] + 1)] if open_slots else ["", ""]
+
+    slots = []
+    uncovered = {task: [] for task in CS_TASKS}
+    cs_counts: Dict[str, Dict[str, int]] = {}
+    levels = {"none": 0, "minimal": 0, "good": 0, "heavy": 0}
+    register_total = 0
+    register_min = register_max = None
+    cs_filled = 0
+
+    for slot in open_slots:
+        tasks = roster[slot]
+        cs = {task: list(tasks.get(task, ())) for task in CS_TASKS}
+        for task, employees in cs.items():
+            if not employees:
+                uncovered[task].append(slot)
+            cs_filled += len(employees)
+            for emp in employees:
+                counts = cs_counts.setdefault(emp, {task: 0 for task in CS_TASKS})
+                counts[task] += 1
+        register = len(cs["R"])
+        register_total += register
+        register_min = register if register_min is None else min(register_min, register)
+        register_max = register if register_max is None else max(register_max, register)
+        levels[register_status(register)] += 1
+        slots.append({
+            "slot": slot,
+            "time": _slot_time(slot),
+            "cs": cs,
+            "other": {task: list(tasks[task]) for task in OTHER_TASKS if tasks.get(task)},
+            "departments": {dept: list(tasks[dept]) for dept in REPORT_DEPARTMENTS if tasks.get(dept)},
+        })
+
+    required = len(open_slots) * len(CS_TASKS)
+    report = {
+        "day": current_day,
+        "day_name": DAY_NAMES.get(current_day, current_day),
+        "store_hours": hours,
+        "slots": slots,
+        "uncovered": uncovered,
+        "cs_counts": {emp: cs_counts[emp] for emp in sorted(working_employees) if emp in cs_counts},
+        "totals": {
+            "cs_slots_filled": cs_filled,
+            "cs_slots_required": required,
+            "coverage_pct": cs_filled / required * 100 if required else 0.0,
+        },
+        "register": {
+            "average": register_total / len(open_slots) if open_slots else 0.0,
+            "min": register_min,
+            "max": register_max,
+            "levels": levels,
+        },
+        "schedules": {},
+    }
+
+    if working_employees:
+        if intervals is None:
+            intervals = RosterIntervals.from_roster(roster)
+        report["schedules"] = {
+            emp: {
+                "department": working_employees[emp]["department"],
+                "shift": list(working_employees[emp]["shift"]),
+                "blocks": [list(block) for block in intervals.intervals(emp)],
+            }
+            for emp in sorted(intervals.employees()) if emp in working_employees
+        }
+    return report
+
+
+# -----------------------------
+# Text
+# -----------------------------
+
+def _text_header(report, out):
+    out.append("=" * 80)
+    out.append(f"STORE ROSTER - {report['day_name'].upper()}")
+    out.append(f"Store Hours: {report['store_hours'][0]} - {report['store_hours'][1]}")
+    out.append("=" * 80)
+
+
+def _text_cs_totals(report, out):
+    out.append("\n CS TASK COVERAGE TOTALS")
+    out.append("-" * 50)
+    out.append(f"{'Slot':<6} {'FR':<4} {'GR':<4} {'R':<4}")
+    out.append("-" * 20)
+    for row in report["slots"]:
+        cs = row["cs"]
+        out.append(f"{row['slot']:<6} {len(cs['FR']):<4} {len(cs['GR']):<4} {len(cs['R']):<4}")
+
+
+def _text_coverage(report, out):
+    out.append("\n📋 CUSTOMER SERVICE COVERAGE SUMMARY")
+    out.append("-" * 50)
+    for task in CS_TASKS:
+        slots = report["uncovered"][task]
+        if slots:
+            out.append(f"⚠️  {format_task_name(task)}: UNCOVERED at {', '.join(f'Slot {s}' for s in slots)}")
+        else:
+            out.append(f"✅ {format_task_name(task)}: Fully covered")
+
+
+def _text_statistics(report, out):
+    out.append("\n📊 ROSTER STATISTICS")
+    out.append("-" * 40)
+    out.append("Customer Service Task Distribution:")
+    for emp, counts in report["cs_counts"].items():
+        out.append(f"  {emp}: FR({counts['FR']}) GR({counts['GR']}) R({counts['R']}) = "
+                   f"{sum(counts.values())} slots")
+    totals = report["totals"]
+    out.append(f"\nTotal CS slots filled: {totals['cs_slots_filled']}")
+    out.append(f"Required CS slots: {totals['cs_slots_required']}")
+    out.append(f"Coverage: {totals['coverage_pct']:.1f}%")
+
+    register = report["register"]
+    if register["min"] is not None:
+        levels = register["levels"]
+        out.append("\nRegister Staffing Summary:")
+        out.append(f"  Average staff per slot: {register['average']:.1f}")
+        out.append(f"  Minimum staff: {register['min']}")
+        out.append(f"  Maximum staff: {register['max']}")
+        out.append(f"  Slots with no coverage: {levels['none']}")
+        out.append(f"  Slots with minimal coverage (1): {levels['minimal']}")
+        out.append(f"  Slots with good coverage (2-3): {levels['good']}")
+        out.append(f"  Slots with heavy coverage (4+): {levels['heavy']}")
+
+
+REGISTER_LABELS = {
+    "none": "⚠️  NO COVERAGE",
+    "minimal": "✅ MINIMAL",
+    "good": "✅ GOOD",
+    "heavy": "🔥 HEAVY",
+}
+
+
+def _text_register(report, out):
+    out.append("\n🧾 REGISTER STAFFING LEVELS")
+    out.append("-" * 50)
+    for row in report["slots"]:
+        staff = row["cs"]["R"]
+        out.append(f"Slot {row['slot']} ({row['time']}): {len(staff)} people - "
+                   f"{REGISTER_LABELS[register_status(len(staff))]}")
+        if staff:
+            out.append(f"  Staff: {', '.join(staff)}")
+        out.append("")
+
+
+def _text_breakdown(report, out):
+    out.append("\n🕒 SLOT-BY-SLOT BREAKDOWN")
+    out.append("-" * 80)
+    for row in report["slots"]:
+        out.append(f"Slot {row['slot']}:")
+        out.append("  CS: " + " | ".join(
+            f"{task}: {', '.join(emps)}" if emps else f"{task}: EMPTY" for task, emps in row["cs"].items()))
+        if row["other"]:
+            out.append("  Other: " + " | ".join(f"{task}: {', '.join(emps)}" for task, emps in row["other"].items()))
+        if row["departments"]:
+            out.append("  Dept: " + " | ".join(
+                f"{dept}: {', '.join(emps)}" for dept, emps in row["departments"].items()))
+        out.append("")
+
+
+def _text_schedules(report, out):
+    out.append("\n👥 INDIVIDUAL EMPLOYEE SCHEDULES")
+    out.append("-" * 50)
+    for emp, schedule in report["schedules"].items():
+        out.append(f"{emp} ({schedule['department']} - Shift {tuple(schedule['shift'])}):")
+        if not schedule["blocks"]:
+            out.append("  No assignments")
+        for start, end, task in schedule["blocks"]:
+            if start == end - 1:
+                out.append(f"  Slot {start}: {format_task_name(task)}")
+            else:
+                out.append(f"  Slots {start}-{end - 1}: {format_task_name(task)}")
+
+
+TEXT_SECTIONS = {
+    "header": _text_header,
+    "cs_totals": _text_cs_totals,
+    "coverage": _text_coverage,
+    "statistics": _text_statistics,
+    "register": _text_register,
+    "breakdown": _text_breakdown,
+    "schedules": _text_schedules,
+}
+
+
+def render_text(reports: Sequence[Dict[str, object]], sections: Sequence[str] = SECTIONS) -> str:
+    """Console report, matching the print_* functions line for line"""
+    out: List[str] = []
+    for report in reports:
+        for section in sections:
+            TEXT_SECTIONS[section](report, out)
+    return "\n".join(out) + "\n" if out else ""
+
+
+# -----------------------------
+# JSON / HTML
+# -----------------------------
+
+def render_json(reports: Sequence[Dict[str, object]], sections: Sequence[str] = SECTIONS) -> str:
+    """JSON document with one object per day"""
+    keys = {"header": ("day", "day_name", "store_hours"), "cs_totals": ("slots",), "coverage": ("uncovered",),
+            "statistics": ("cs_counts", "totals", "register"), "register": ("slots", "register"),
+            "breakdown": ("slots",), "schedules": ("schedules",)}
+    wanted = {"day"} | {key for section in sections for key in keys[section]}
+    return json.dumps([{k: v for k, v in report.items() if k in wanted} for report in reports], indent=1) + "\n"
+
+
+HTML_STYLE = """
+body { font-family: Arial, sans-serif; font-size: 13px; margin: 24px; }
+h1 { font-size: 20px; } h2 { font-size: 16px; margin-top: 28px; }
+table { border-collapse: collapse; margin: 8px 0; }
+th, td { border: 1px solid #999; padding: 2px 6px; text-align: center; }
+td.names { text-align: left; }
+.warn { color: #b00020; } .ok { color: #1b7f3a; }
+"""
+
+
+def _cell(task: str, text: str, css: str = "") -> str:
+    color = TASK_COLORS.get(task)
+    style = f' style="background:#{color}"' if color else ""
+    cls = f' class="{css}"' if css else ""
+    return f"<td{cls}{style}>{html.escape(text)}</td>"
+
+
+def _html_day(report: Dict[str, object], sections: Sequence[str], out: List[str]) -> None:
+    esc = html.escape
+    out.append(f"<h1>Store roster - {esc(report['day_name'])} "
+               f"({esc(report['store_hours'][0])} - {esc(report['store_hours'][1])})</h1>")
+    if "coverage" in sections:
+        out.append("<h2>Customer service coverage</h2><ul>")
+        for task in CS_TASKS:
+            slots = report["uncovered"][task]
+            if slots:
+                out.append(f'<li class="warn">{esc(format_task_name(task))}: uncovered at '
+                           f"{esc(', '.join(_slot_time(s) for s in slots))}</li>")
+            else:
+                out.append(f'<li class="ok">{esc(format_task_name(task))}: fully covered</li>')
+        out.append("</ul>")
+    if "cs_totals" in sections or "register" in sections:
+        out.append("<h2>CS coverage per slot</h2><table><tr><th>Slot</th><th>Time</th>"
+                   + "".join(f"<th>{task}</th>" for task in CS_TASKS) + "<th>Register</th></tr>")
+        for row in report["slots"]:
+            status = register_status(len(row["cs"]["R"]))
+            status_class = ' class="warn"' if status == "none" else ""
+            out.append(f"<tr><td>{row['slot']}</td><td>{row['time']}</td>"
+                       + "".join(_cell(task, str(len(row["cs"][task])), "" if row["cs"][task] else "warn")
+                                 for task in CS_TASKS)
+                       + f"<td{status_class}>{status}</td></tr>")
+        out.append("</table>")
+    if "statistics" in sections:
+        totals, register = report["totals"], report["register"]
+        out.append("<h2>Statistics</h2><table><tr><th>Employee</th>"
+                   + "".join(f"<th>{task}</th>" for task in CS_TASKS) + "<th>Total</th></tr>")
+        for emp, counts in report["cs_counts"].items():
+            out.append(f'<tr><td class="names">{esc(emp)}</td>'
+                       + "".join(f"<td>{counts[task]}</td>" for task in CS_TASKS)
+                       + f"<td>{sum(counts.values())}</td></tr>")
+        out.append("</table>")
+        out.append(f"<p>CS slots filled {totals['cs_slots_filled']} of {totals['cs_slots_required']} "
+                   f"({totals['coverage_pct']:.1f}%). Register staff per slot: average "
+                   f"{register['average']:.1f}, min {register['min']}, max {register['max']}.</p>")
+    if "breakdown" in sections:
+        out.append("<h2>Slot-by-slot breakdown</h2><table><tr><th>Time</th>"
+                   + "".join(f"<th>{task}</th>" for task in CS_TASKS) + "<th>Other</th><th>Departments</th></tr>")
+        for row in report["slots"]:
+            cs_cells = "".join(_cell(task, ", ".join(emps) or "EMPTY", "names" if emps else "warn")
+                               for task, emps in row["cs"].items())
+            other = "; ".join(f"{format_task_name(t)}: {', '.join(e)}" for t, e in row["other"].items())
+            depts = "; ".join(f"{d}: {', '.join(e)}" for d, e in row["departments"].items())
+            out.append(f"<tr><td>{row['time']}</td>{cs_cells}"
+                       f'<td class="names">{esc(other)}</td><td class="names">{esc(depts)}</td></tr>')
+        out.append("</table>")
+    if "schedules" in sections and report["schedules"]:
+        out.append("<h2>Employee schedules</h2><table><tr><th>Employee</th><th>Dept</th><th>Shift</th>"
+                   "<th>Blocks</th></tr>")
+        for emp, schedule in report["schedules"].items():
+            blocks = ", ".join(f"{_slot_time(s)}-{_slot_time(e)} {format_task_name(t)}"
+                               for s, e, t in schedule["blocks"])
+            out.append(f'<tr><td class="names">{esc(emp)}</td><td>{esc(str(schedule["department"]))}</td>'
+                       f"<td>{esc(' - '.join(schedule['shift']))}</td>"
+                       f'<td class="names">{esc(blocks) or "No assignments"}</td></tr>')
+        out.append("</table>")
+
+
+def render_html(reports: Sequence[Dict[str, object]], sections: Sequence[str] = SECTIONS) -> str:
+    """Self-contained HTML page (inline CSS, no external assets)"""
+    title = ", ".join(report["day_name"] for report in reports)
+    out = ["<!DOCTYPE html>", '<html lang="en"><head><meta charset="utf-8">',
+           f"<title>Roster report - {html.escape(title)}</title><style>{HTML_STYLE}</style></head><body>"]
+    for report in reports:
+        _html_day(report, sections, out)
+    out.append("</body></html>")
+    return "\n".join(out) + "\n"
+
+
+RENDERERS = {"text": render_text, "json": render_json, "html": render_html}
+
+
+def write_report(reports: Sequence[Dict[str, object]], fmt: str = "text",
+                 path: Optional[str] = None, sections: Sequence[str] = SECTIONS) -> Optional[str]:
+    """Render reports and emit them with one write (to stdout when no path is given)
+
+    Returns:
+        The path written, or None for stdout
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f"Invalid report format: {fmt}. Must be one of: {list(RENDERERS)}")
+    document = RENDERERS[fmt](reports, sections)
+    if path is None:
+        sys.stdout.write(document)
+        return None
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(document)
+    return path
+
+
+def main() -> None:
+    """Generate days and write their report"""
+    # Imported here: roster_generator imports this module
+    from helper import read_from_excel
+    from roster_generator import RosterConfig, generate_roster
+
+    parser = argparse.ArgumentParser(description="Roster report as text, JSON or HTML")
+    parser.add_argument("file", help="Roster workbook or shift file")
+    parser.add_argument("--days", nargs="+", choices=list(RosterConfig.STORE_HOURS),
+                        default=list(RosterConfig.STORE_HOURS), help="Days to report")
+    parser.add_argument("--format", choices=FORMATS, default="text", help="Output format")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--out", help="Write to this file instead of stdout")
+    parser.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    reports = []
+    generating = reporting = 0.0
+    for day in args.days:
+        began = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            working_employees = read_from_excel(day, args.file)
+            if not working_employees:
+                continue
+            intervals = RosterIntervals()
+            roster = generate_roster(day, args.file, intervals, engine=args.engine)
+        built = time.perf_counter()
+        reports.append(build_report(roster, day, RosterConfig.STORE_HOURS, working_employees, intervals))
+        generating += built - began
+        reporting += time.perf_counter() - built
+
+    began = time.perf_counter()
+    written = write_report(reports, args.format, args.out, args.sections)
+    reporting += time.perf_counter() - began
+    print(f"⏱️  generate {generating:.2f}s, report {reporting * 1000:.1f}ms"
+          + (f" -> {written}" if written else ""), file=sys.stderr)
+
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_report`
+
+class TestBuildReport(unittest.TestCase):
+    def setUp(self):
+        self.roster = {
+            40: {"FR": ["Ann"], "GR": ["Bo"], "R": [], "40": []},
+            41: {"FR": ["Ann"], "GR": [], "R": ["Bo"], "40": []},
+            42: {"FR": [], "GR": [], "R": ["Ann", "Bo"], "40": []},
+            43: {"FR": ["Bo"], "GR": ["Ann"], "R": ["Cy", "Di", "Ed", "Fo"], "40": []},
+        }
+        self.employees = {
+            "Ann": {"shift": ("10:00", "11:00"), "department": "M's", "employee_id": "1", "hours": 1.0},
+            "Bo": {"shift": ("10:00", "11:00"), "department": "HH", "employee_id": "2", "hours": 1.0},
+        }
+        self.report = build_report(self.roster, "M", working_employees=self.employees)
+
+    def test_sections(self):
+        report = self.report
+        self.assertEqual(report["store_hours"], ["10:00", "11:00"])
+        self.assertEqual(report["uncovered"], {"FR": [42], "GR": [41, 42], "R": [40]})
+        # Only working employees are counted
+        self.assertEqual(report["cs_counts"], {"Ann": {"FR": 2, "GR": 1, "R": 1},
+                                               "Bo": {"FR": 1, "GR": 1, "R": 2}})
+        self.assertEqual(report["register"], {"average": 1.75, "min": 0, "max": 4,
+                                              "levels": {"none": 1, "minimal": 1, "good": 1, "heavy": 1}})
+        self.assertEqual(report["totals"], {"cs_slots_filled": 12, "cs_slots_required": 12, "coverage_pct": 100.0})
+        self.assertEqual(report["schedules"]["Ann"]["blocks"], [[40, 42, "FR"], [42, 43, "R"], [43, 44, "GR"]])
+
+    def test_store_hours_limit_open_slots(self):
+        report = build_report(self.roster, "M", {"M": ("10:15", "10:45")}, self.employees)
+        self.assertEqual([slot["slot"] for slot in report["slots"]], [41, 42])
+        self.assertEqual(report["uncovered"], {"FR": [42], "GR": [41, 42], "R": []})
+
+    def test_json_round_trip(self):
+        self.assertEqual(json.loads(render_json([self.report])), [self.report])
+        coverage_only = json.loads(render_json([self.report], ["coverage"]))
+        self.assertEqual(coverage_only, [{"day": "M", "uncovered": self.report["uncovered"]}])
+
+
+if __name__ == "__main__":
+    main()
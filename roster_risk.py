@@ -0,0 +1,254 @@
+import argparse
+import contextlib
+import io
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from helper import read_from_excel
+from roster_generator import RosterConfig, generate_roster, normalize_department_key
+from roster_printer import slot_to_time
+
+# -----------------------------
+# Absence risk simulation
+# -----------------------------
+
+CS_TASKS = RosterConfig.CUSTOMER_SERVICE_TASKS
+BREAK_TASKS = ("40", "10")
+HEAT_CHARS = " ░▒▓█"
+
+
+def build_risk_inputs(roster: Dict[int, Dict[str, List[str]]],
+                      current_day: str,
+                      working_employees: Dict[str, Dict[str, str]]) -> Dict[str, np.ndarray]:
+    """Turn a roster into the compact arrays the simulator works on
+
+    Returns:
+        Dictionary with the employee order, slot order, per-task (employee x slot)
+        float32 assignment matrices, an on-floor matrix (working and not on break)
+        and per-task requirement vectors
+    """
+    employees = list(working_employees.keys())
+    slots = sorted(roster.keys())
+    emp_index = {emp: i for i, emp in enumerate(employees)}
+    slot_index = {slot: j for j, slot in enumerate(slots)}
+
+    assigned = {task: np.zeros((len(employees), len(slots)), dtype=np.float32) for task in CS_TASKS}
+    on_floor = np.zeros((len(employees), len(slots)), dtype=np.float32)
+
+    for slot in slots:
+        j = slot_index[slot]
+        on_break = set()
+        for task in BREAK_TASKS:
+            on_break.update(roster[slot].get(task, []))
+        for task, emps in roster[slot].items():
+            for emp in emps:
+                i = emp_index.get(emp)
+                if i is None:
+                    continue
+                if task in assigned:
+                    assigned[task][i, j] = 1.0
+                if emp not in on_break:
+                    on_floor[i, j] = 1.0
+
+    register_coverage = RosterConfig.REGISTER_COVERAGE[current_day]
+    required = {
+        "FR": np.ones(len(slots), dtype=np.float32),
+        "GR": np.ones(len(slots), dtype=np.float32),
+        "R": np.array([register_coverage[j] if j < len(register_coverage) else register_coverage[-1]
+                       for j in range(len(slots))], dtype=np.float32),
+    }
+
+    return {
+        "employees": employees,
+        "slots": slots,
+        "assigned": assigned,
+        "on_floor": on_floor,
+        "required": required,
+    }
+
+
+def absence_probabilities(working_employees: Dict[str, Dict[str, str]],
+                          absence_prob: float = 0.05,
+                          employee_probs: Optional[Dict[str, float]] = None,
+                          department_probs: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Per-employee sick-call probability: employee override, then department, then default"""
+    employee_probs = employee_probs or {}
+    department_probs = {
+        normalize_department_key(dept): prob for dept, prob in (department_probs or {}).items()
+    }
+    probs = []
+    for emp, info in working_employees.items():
+        if emp in employee_probs:
+            probs.append(employee_probs[emp])
+            continue
+        dept = normalize_department_key(info.get("department", ""))
+        probs.append(department_probs.get(dept, absence_prob))
+    return np.asarray(probs, dtype=np.float64)
+
+
+def _simulate_shard(inputs: Dict[str, np.ndarray], probs: np.ndarray, n_scenarios: int,
+                    batch_size: int, seed) -> Dict[str, np.ndarray]:
+    """Run n_scenarios in batches and return summed shortfall counts per slot"""
+    rng = np.random.default_rng(seed)
+    n_slots = len(inputs["slots"])
+    total_required = sum(inputs["required"].values())
+
+    totals = {task: np.zeros(n_slots, dtype=np.int64) for task in CS_TASKS}
+    missing = {task: np.zeros(n_slots, dtype=np.float64) for task in CS_TASKS}
+    uncoverable = np.zeros(n_slots, dtype=np.int64)
+
+    remaining = n_scenarios
+    while remaining > 0:
+        batch = min(batch_size, remaining)
+        remaining -= batch
+        # (batch x employees) mask of who turned up
+        present = (rng.random((batch, len(probs))) >= probs).astype(np.float32)
+
+        for task in CS_TASKS:
+            covered = present @ inputs["assigned"][task]
+            gap = inputs["required"][task] - covered
+            totals[task] += (gap > 0).sum(axis=0)
+            missing[task] += np.clip(gap, 0, None).sum(axis=0)
+
+        # Even a full reshuffle cannot help when fewer people are on the floor than CS needs
+        floor = present @ inputs["on_floor"]
+        uncoverable += (floor < total_required).sum(axis=0)
+
+    return {"shortfall": totals, "missing": missing, "uncoverable": uncoverable}
+
+
+def simulate_absence_risk(roster: Dict[int, Dict[str, List[str]]],
+                          current_day: str,
+                          working_employees: Dict[str, Dict[str, str]],
+                          n_scenarios: int = 10000,
+                          absence_prob: float = 0.05,
+                          employee_probs: Optional[Dict[str, float]] = None,
+                          department_probs: Optional[Dict[str, float]] = None,
+                          batch_size: int = 2000,
+                          workers: Optional[int] = None,
+                          seed: Optional[int] = None) -> Dict[str, object]:
+    """Simulate random absences against a finished roster
+
+    Args:
+        roster: Dictionary mapping time slots to task assignments
+        current_day: Day of the week
+        working_employees: Full employee information
+        n_scenarios: Number of absence scenarios to draw
+        absence_prob: Default probability that an employee calls in sick
+        employee_probs: Per-employee overrides
+        department_probs: Per-department overrides (raw or normalized keys)
+        batch_size: Scenarios evaluated together as one boolean mask
+        workers: Shard scenarios across this many processes (None or 1 runs inline)
+        seed: Seed for reproducible scenarios
+
+    Returns:
+        Dictionary with per-slot shortfall probability and expected missing staff
+        for each CS task, the probability that a slot cannot be covered even after
+        reshuffling, and an overall risk score (mean shortfall probability)
+    """
+    inputs = build_risk_inputs(roster, current_day, working_employees)
+    probs = absence_probabilities(working_employees, absence_prob, employee_probs, department_probs)
+
+    shards = max(1, min(workers or 1, n_scenarios))
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    sizes = [n_scenarios // shards + (1 if i < n_scenarios % shards else 0) for i in range(shards)]
+
+    if shards == 1:
+        results = [_simulate_shard(inputs, probs, sizes[0], batch_size, seeds[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=shards) as pool:
+            futures = [
+                pool.submit(_simulate_shard, inputs, probs, size, batch_size, shard_seed)
+                for size, shard_seed in zip(sizes, seeds)
+            ]
+            results = [future.result() for future in futures]
+
+    n = float(max(n_scenarios, 1))
+    report = {"slots": inputs["slots"], "scenarios": n_scenarios, "tasks": {}}
+    for task in CS_TASKS:
+        report["tasks"][task] = {
+            "shortfall_prob": sum(r["shortfall"][task] for r in results) / n,
+            "expected_missing": sum(r["missing"][task] for r in results) / n,
+        }
+    report["uncoverable_prob"] = sum(r["uncoverable"] for r in results) / n
+    report["score"] = float(np.mean([report["tasks"][task]["shortfall_prob"] for task in CS_TASKS]))
+    return report
+
+
+def print_risk_heatmap(report: Dict[str, object]) -> None:
+    """Print a per-slot heatmap of shortfall probabilities"""
+    print(f"\n🎲 ABSENCE RISK HEATMAP ({report['scenarios']} scenarios)")
+    print("-" * 60)
+    print(f"{'Slot':<6} {'Time':<6} {'FR':>6} {'GR':>6} {'R':>6} {'Uncov':>6}  Heat")
+    print("-" * 60)
+
+    for j, slot in enumerate(report["slots"]):
+        probs = [report["tasks"][task]["shortfall_prob"][j] for task in CS_TASKS]
+        uncoverable = report["uncoverable_prob"][j]
+        worst = max(probs)
+        heat = HEAT_CHARS[min(int(worst * len(HEAT_CHARS)), len(HEAT_CHARS) - 1)]
+        cells = " ".join(f"{p * 100:5.1f}%" for p in probs)
+        print(f"{slot:<6} {slot_to_time(slot):<6} {cells} {uncoverable * 100:5.1f}%  {heat * 10}")
+
+    print(f"\nRisk score (mean shortfall probability): {report['score'] * 100:.2f}%")
+
+
+def _parse_probabilities(pairs: Optional[List[str]]) -> Dict[str, float]:
+    """Parse KEY=PROB command line pairs"""
+    probs = {}
+    for pair in pairs or []:
+        key, _, value = pair.rpartition("=")
+        probs[key] = float(value)
+    return probs
+
+
+def main() -> None:
+    """Generate candidate rosters for a day and compare their absence risk"""
+    parser = argparse.ArgumentParser(description="Monte Carlo absence-risk analysis for generated rosters")
+    parser.add_argument("file_path", help="Roster workbook (.xlsx)")
+    parser.add_argument("day", choices=list(RosterConfig.STORE_HOURS), help="Day of the week")
+    parser.add_argument("--candidates", type=int, default=1, help="Number of candidate rosters to compare")
+    parser.add_argument("--scenarios", type=int, default=10000, help="Absence scenarios per roster")
+    parser.add_argument("--absence-prob", type=float, default=0.05, help="Default sick-call probability")
+    parser.add_argument("--employee-prob", nargs="*", metavar="NAME=PROB", help="Per-employee probabilities")
+    parser.add_argument("--dept-prob", nargs="*", metavar="DEPT=PROB", help="Per-department probabilities")
+    parser.add_argument("--workers", type=int, default=None, help="Process-pool shards")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for rosters and scenarios")
+    args = parser.parse_args()
+
+    working_employees = read_from_excel(args.day, args.file_path)
+    if not working_employees:
+        print("No employees found for that day. Exiting.")
+        return
+
+    scores = []
+    for candidate in range(args.candidates):
+        if args.seed is not None:
+            random.seed(args.seed + candidate)
+        # Candidate generation is chatty; only the risk report matters here
+        with contextlib.redirect_stdout(io.StringIO()):
+            roster = generate_roster(args.day, args.file_path)
+
+        report = simulate_absence_risk(
+            roster, args.day, working_employees,
+            n_scenarios=args.scenarios,
+            absence_prob=args.absence_prob,
+            employee_probs=_parse_probabilities(args.employee_prob),
+            department_probs=_parse_probabilities(args.dept_prob),
+            workers=args.workers,
+            seed=None if args.seed is None else args.seed + candidate,
+        )
+        print(f"\n=== Candidate {candidate + 1} ===")
+        print_risk_heatmap(report)
+        scores.append(report["score"])
+
+    if len(scores) > 1:
+        best = int(np.argmin(scores))
+        print(f"\n✅ Lowest risk: candidate {best + 1} ({scores[best] * 100:.2f}%)")
+
+
+if __name__ == "__main__":
+    main()
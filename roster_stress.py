@@ -0,0 +1,261 @@
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+import traceback
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from roster_generator import RosterConfig, _initialize_roster_structure, fill_roster
+from roster_time import time_grid
+
+# -----------------------------
+# Stress / soak harness
+# -----------------------------
+
+DEPARTMENTS = ["M", "L", "Acc", "HH", "H&B", "Stat", "F", "SPV", "ASM", "SM", "ADM"]
+MANAGEMENT = ["SPV", "ASM", "SM", "ADM"]
+
+# (name, min headcount, max headcount, weight)
+SIZE_CLASSES = [
+    ("tiny", 0, 3, 3),
+    ("small", 4, 15, 4),
+    ("medium", 16, 60, 3),
+    ("large", 61, 200, 1),
+    ("huge", 201, 600, 0.2),
+]
+
+# Department mixes: most days are normal, a few are deliberately odd
+SCENARIOS = [
+    ("normal", 6),
+    ("all_management", 1),
+    ("no_fitting_room_depts", 1),
+    ("unknown_departments", 1),
+]
+
+DEFAULT_LATENCY_BUDGET = 1.0
+
+
+def random_staffing_day(rng: random.Random, max_headcount: Optional[int] = None,
+                        size_classes: Optional[List[str]] = None) -> Dict[str, object]:
+    """Draw one random staffing day
+
+    Args:
+        rng: Source of randomness (seeded per case so cases can be replayed)
+        max_headcount: Optional cap on employees
+        size_classes: Restrict draws to these SIZE_CLASSES names
+
+    Returns:
+        {"day", "size_class", "scenario", "working_employees"}
+    """
+    classes = [c for c in SIZE_CLASSES if not size_classes or c[0] in size_classes]
+    size_class, low, high, _ = rng.choices(classes, weights=[c[3] for c in classes])[0]
+    if max_headcount is not None:
+        high = min(high, max_headcount)
+        low = min(low, high)
+    headcount = rng.randint(low, high)
+    scenario = rng.choices([s[0] for s in SCENARIOS], weights=[s[1] for s in SCENARIOS])[0]
+    day = rng.choice(list(RosterConfig.STORE_HOURS))
+
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[day])
+    store_slots = grid.open_slots
+    working_employees = {}
+    for i in range(headcount):
+        # Odd shift lengths and starts, including shifts hanging over opening or closing
+        start = rng.randint(store_slots.start - 8, store_slots.stop - 1)
+        length = rng.choice([rng.randint(1, 8), rng.randint(8, 40), rng.randint(24, 48)])
+        end = min(start + length, 95)
+        if scenario == "all_management":
+            department = rng.choice(MANAGEMENT)
+        elif scenario == "no_fitting_room_depts":
+            department = rng.choice([d for d in DEPARTMENTS if d not in ("M", "L", "Acc")])
+        elif scenario == "unknown_departments":
+            department = rng.choice(DEPARTMENTS + ["", "Temp", "Visual"])
+        else:
+            department = rng.choice(DEPARTMENTS)
+        working_employees[f"Emp{i}"] = {
+            "shift": (grid.label(start), grid.label(end)),
+            "department": department,
+            "employee_id": str(1000 + i),
+            "hours": (end - start) / 4,
+        }
+    return {"day": day, "size_class": size_class, "scenario": scenario, "working_employees": working_employees}
+
+
+def check_invariants(roster: Dict[int, Dict[str, List[str]]],
+                     working_employee_slots: Dict[str, range],
+                     store_slots: range) -> List[str]:
+    """Describe every broken roster invariant (empty when the roster is sound)"""
+    problems = []
+    if sorted(roster) != list(store_slots):
+        problems.append("slots differ from store hours: " + f"{min(roster, default=None)}-{max(roster, default=None)}")
+    for slot, tasks in roster.items():
+        seen = Counter(emp for employees in tasks.values() for emp in employees)
+        for emp, count in seen.items():
+            if emp not in working_employee_slots:
+                problems.append(f"unknown employee: {emp} at slot {slot}")
+            elif slot not in working_employee_slots[emp]:
+                problems.append(f"assigned outside shift: {emp} at slot {slot}")
+            if count > 1:
+                problems.append(f"double-booked: {emp} at slot {slot}")
+    return problems
+
+
+def _crash_signature(error: BaseException) -> str:
+    """Exception type plus the innermost frame in this project, so crash sites group together"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    frames = traceback.extract_tb(error.__traceback__)
+    own = [frame for frame in frames if os.path.abspath(frame.filename).startswith(here)]
+    frame = (own or frames)[-1]
+    return f"{type(error).__name__} in {frame.name} ({frame.filename.split('/')[-1]}:{frame.lineno})"
+
+
+def run_case(seed: int, engine: str = RosterConfig.DEFAULT_ENGINE,
+             max_headcount: Optional[int] = None,
+             size_classes: Optional[List[str]] = None) -> Dict[str, object]:
+    """Generate one random day from seed and push it through fill_roster"""
+    rng = random.Random(seed)
+    case = random_staffing_day(rng, max_headcount, size_classes)
+    working_employees = case["working_employees"]
+    day = case["day"]
+    grid = time_grid(hours=RosterConfig.STORE_HOURS[day])
+    store_slots = grid.open_slots
+    working_employee_slots = grid.shift_slots(working_employees)
+    working_employee_departments = {emp: info["department"] for emp, info in working_employees.items()}
+
+    result = {
+        "seed": seed,
+        "day": day,
+        "engine": engine,
+        "headcount": len(working_employees),
+        "size_class": case["size_class"],
+        "scenario": case["scenario"],
+        "crash": None,
+        "violations": [],
+        "seconds": 0.0,
+    }
+    random.seed(seed)
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            roster = fill_roster(_initialize_roster_structure(store_slots), day, working_employee_slots,
+                                 working_employee_departments, working_employees, engine=engine)
+    except Exception as e:
+        result["seconds"] = time.perf_counter() - start
+        result["crash"] = _crash_signature(e)
+        result["error"] = str(e)
+        result["traceback"] = traceback.format_exc()
+        return result
+    result["seconds"] = time.perf_counter() - start
+    result["violations"] = check_invariants(roster, working_employee_slots, store_slots)
+    return result
+
+
+def latency_limit(results: List[Dict[str, object]], budget: float, bucket: int = 25) -> Optional[int]:
+    """Smallest headcount bucket whose 95th-percentile latency exceeds the budget"""
+    by_bucket = defaultdict(list)
+    for result in results:
+        by_bucket[result["headcount"] // bucket * bucket].append(result["seconds"])
+    for headcount in sorted(by_bucket):
+        timings = sorted(by_bucket[headcount])
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        if p95 > budget:
+            return headcount
+    return None
+
+
+def soak(cases: Optional[int], seed: int = 0, engines: Tuple[str, ...] = (RosterConfig.DEFAULT_ENGINE,),
+         max_headcount: Optional[int] = None, duration: Optional[float] = None,
+         size_classes: Optional[List[str]] = None) -> List[Dict[str, object]]:
+    """Run random cases until the count or the duration (seconds) runs out
+
+    With no case count the run only stops at the deadline (or Ctrl+C).
+    """
+    results = []
+    deadline = time.monotonic() + duration if duration else None
+    case_seeds = range(seed, seed + cases) if cases is not None else itertools.count(seed)
+    try:
+        for case_seed in case_seeds:
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            for engine in engines:
+                results.append(run_case(case_seed, engine, max_headcount, size_classes))
+    except KeyboardInterrupt:
+        print("\nStopping soak run")
+    return results
+
+
+def print_stress_report(results: List[Dict[str, object]], budget: float) -> None:
+    """Summarise crashes, invariant violations and latency"""
+    crashes = Counter(r["crash"] for r in results if r["crash"])
+    violating = [r for r in results if r["violations"]]
+    print(f"\n📊 {len(results)} cases, {sum(crashes.values())} crashes, {len(violating)} with invariant violations")
+
+    if crashes:
+        print("\nCrashes (first seed to replay):")
+        for signature, count in crashes.most_common():
+            first = next(r for r in results if r["crash"] == signature)
+            print(f"  {count:>5} × {signature}  [seed {first['seed']}, {first['engine']}, "
+                  f"{first['headcount']} staff, {first['scenario']}]")
+
+    if violating:
+        kinds = Counter(v.split(":")[0] for r in violating for v in r["violations"])
+        print("\nInvariant violations:")
+        for kind, count in kinds.most_common():
+            print(f"  {count:>5} × {kind}")
+
+    print("\nLatency by size class:")
+    for name, *_ in SIZE_CLASSES:
+        timings = sorted(r["seconds"] for r in results if r["size_class"] == name)
+        if timings:
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"  {name:<7} n={len(timings):<5} median {statistics.median(timings) * 1000:>8.1f}ms "
+                  f"p95 {p95 * 1000:>8.1f}ms max {timings[-1] * 1000:>8.1f}ms")
+
+    limit = latency_limit(results, budget)
+    if limit is None:
+        print(f"\n✅ p95 latency stayed within {budget:.2f}s at every headcount tried")
+    else:
+        print(f"\n⚠️ p95 latency exceeds {budget:.2f}s from about {limit} employees")
+
+
+def main() -> None:
+    """Run the stress harness from the command line"""
+    parser = argparse.ArgumentParser(description="Random stress/soak runs through fill_roster")
+    parser.add_argument("--cases", type=int, default=None,
+                        help="Random days to generate (default 1000, unbounded with --duration)")
+    parser.add_argument("--seed", type=int, default=0, help="First case seed")
+    parser.add_argument("--engines", nargs="+", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=[RosterConfig.DEFAULT_ENGINE], help="Engines to run each case through")
+    parser.add_argument("--max-headcount", type=int, default=None, help="Cap on employees per day")
+    parser.add_argument("--sizes", nargs="+", choices=[c[0] for c in SIZE_CLASSES],
+                        help="Only draw days from these size classes")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds (soak)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_LATENCY_BUDGET, help="Latency budget in seconds")
+    parser.add_argument("--replay", type=int, default=None, help="Rerun a single case seed and show the traceback")
+    parser.add_argument("--report", help="Write every case result to this JSON file")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        for engine in args.engines:
+            result = run_case(args.replay, engine, args.max_headcount, args.sizes)
+            print(result.pop("traceback", ""), end="")
+            print(json.dumps(result, indent=2))
+        return
+
+    cases = args.cases if args.cases is not None or args.duration else 1000
+    results = soak(cases, args.seed, tuple(args.engines), args.max_headcount, args.duration, args.sizes)
+    print_stress_report(results, args.budget)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"📝 Case results written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from roster_eligibility import DEPARTMENT_ALIASES, normalize_department_key
+from roster_intervals import RosterIntervals
+from roster_printer import TASK_COLORS, summary_rows
+from roster_time import time_grid
+
+# -----------------------------
+# Template-based Excel export
+# -----------------------------
+
+TEMPLATE_DIR = os.path.join("roster_state", "templates")
+TEMPLATE_VERSION = 1
+
+SCHEDULE_SHEET = "Schedule"
+SUMMARY_SHEET = "Summary"
+META_COLUMNS = ("First Name", "Dept", "Start", "Finish")
+FIRST_TIME_COL = len(META_COLUMNS) + 1
+FIRST_BODY_ROW = 3
+BUFFER_SLOTS = 4  # 1 hour either side of opening hours, as in export_roster_to_excel
+OFF_SHIFT_COLOR = "D9D9D9"
+
+
+def layout_slots(roster_slots: List[int]) -> Tuple[int, int, int, int]:
+    """(first grid slot, last grid slot, opening slot, last open slot) for a roster"""
+    open_start, open_end = min(roster_slots), max(roster_slots)
+    return max(0, open_start - BUFFER_SLOTS), open_end + BUFFER_SLOTS, open_start, open_end
+
+
+def template_path(layout: Tuple[int, int, int, int], rows: int, directory: str = TEMPLATE_DIR) -> str:
+    """Template file for a slot layout and employee count
+
+    Templates are plain workbooks: restyle one in Excel and later exports keep the
+    styling, as long as the grid stays where it is.
+    """
+    start, end, open_start, open_end = layout
+    return os.path.join(directory, f"v{TEMPLATE_VERSION}_{start}-{end}_open{open_start}-{open_end}_{rows}rows.xlsx")
+
+
+def _color_rules(first_cell: str) -> Dict[str, str]:
+    """fill color -> conditional formatting formula matching every value with that color
+
+    A cell holding "FR + R" (a double booking) takes the color of its first task,
+    and raw department codes (M, Acc, ...) share their roster key's color.
+    """
+    by_color: Dict[str, List[str]] = {}
+    aliases = {key: raw for raw, key in DEPARTMENT_ALIASES.items()}
+    for value, color in TASK_COLORS.items():
+        by_color.setdefault(color, []).append(value)
+        if value in aliases:
+            by_color[color].append(aliases[value])
+    rules = {}
+    for color, values in by_color.items():
+        tests = []
+        for value in values:
+            quoted = value.replace('"', '""')
+            prefix = f"{quoted} + "
+            tests.append(f'{first_cell}="{quoted}"')
+            tests.append(f'LEFT({first_cell},{len(value) + 3})="{prefix}"')
+        rules[color] = f"OR({','.join(tests)})"
+    return rules
+
+
+def build_template(path: str, layout: Tuple[int, int, int, int], rows: int) -> str:
+    """Write a pre-styled workbook for the layout with `rows` employee rows
+
+    Everything that does not depend on the roster is done here once: header rows,
+    merged hour cells, borders, fonts, column widths, the grey pre-opening buffer and
+    conditional formatting rules for task, department and off-shift colors.
+    """
+    from openpyxl import Workbook
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    start, end, open_start, open_end = layout
+    slot_grid = time_grid()
+    slots = list(range(start, end + 1))
+    last_col = FIRST_TIME_COL + len(slots) - 1
+    last_row = FIRST_BODY_ROW + max(rows, 1) - 1
+
+    center = Alignment(horizontal="center", vertical="center")
+    body_font = Font(name="Arial", size=8)
+    header_font = Font(bold=True)
+    thin = Side(style="thin", color="000000")
+    hair = Side(style="hair", color="808080")
+    grey = PatternFill(start_color=OFF_SHIFT_COLOR, end_color=OFF_SHIFT_COLOR, fill_type="solid")
+
+    workbook = Workbook()
+    ws = workbook.active
+    ws.title = SCHEDULE_SHEET
+
+    for col, name in enumerate(META_COLUMNS, start=1):
+        cell = ws.cell(row=2, column=col, value=name)
+        cell.font = header_font
+        cell.alignment = center
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        for row in range(FIRST_BODY_ROW, last_row + 1):
+            body = ws.cell(row=row, column=col)
+            body.font = body_font
+            body.alignment = center
+        ws.column_dimensions[get_column_letter(col)].width = 12 if col == 1 else 7
+
+    for i, (slot, label) in enumerate(zip(slots, slot_grid.labels(slots))):
+        col = FIRST_TIME_COL + i
+        left = thin if slot % 4 == 0 else hair
+        right = thin if col == last_col else None
+        hour, minute = label.split(":")
+        for row in (1, 2):
+            cell = ws.cell(row=row, column=col)
+            cell.font = header_font
+            cell.alignment = center
+            cell.border = Border(left=left, right=thin, top=thin, bottom=thin)
+        ws.cell(row=2, column=col, value=minute)
+        if minute == "00":
+            ws.cell(row=1, column=col, value=str(int(hour)))
+            ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=min(col + 3, last_col))
+        body_border = Border(left=left, right=right)
+        for row in range(FIRST_BODY_ROW, last_row + 1):
+            cell = ws.cell(row=row, column=col)
+            cell.font = body_font
+            cell.alignment = center
+            cell.border = body_border
+            if slot < open_start:
+                cell.fill = grey
+        ws.column_dimensions[get_column_letter(col)].width = 4
+
+    # Task and department colors: first matching rule wins
+    first = f"{get_column_letter(FIRST_TIME_COL)}{FIRST_BODY_ROW}"
+    grid = f"{first}:{get_column_letter(last_col)}{last_row}"
+    for color, formula in _color_rules(first).items():
+        ws.conditional_formatting.add(grid, FormulaRule(
+            formula=[formula], stopIfTrue=True,
+            fill=PatternFill(start_color=color, end_color=color, fill_type="solid")))
+    dept_first = f"B{FIRST_BODY_ROW}"
+    for color, formula in _color_rules(dept_first).items():
+        ws.conditional_formatting.add(f"{dept_first}:B{last_row}", FormulaRule(
+            formula=[formula], stopIfTrue=True,
+            fill=PatternFill(start_color=color, end_color=color, fill_type="solid")))
+    # Empty cells outside the employee's shift (from the Start/Finish columns) are grey;
+    # a finish before the start is the next morning
+    day = slot_grid.slots_per_day
+    slot_of_column = f"(COLUMN({first})-{FIRST_TIME_COL}+{start})"
+    shift_start = f"ROUND(TIMEVALUE($C{FIRST_BODY_ROW})*{day},0)"
+    finish = f"ROUND(TIMEVALUE($D{FIRST_BODY_ROW})*{day},0)"
+    shift_end = f"IF({finish}<{shift_start},{finish}+{day},{finish})"
+    ws.conditional_formatting.add(grid, FormulaRule(
+        formula=[f'AND({first}="",OR({slot_of_column}<{shift_start},{slot_of_column}>={shift_end}))'],
+        fill=PatternFill(start_color=OFF_SHIFT_COLOR, end_color=OFF_SHIFT_COLOR, fill_type="solid")))
+
+    summary = workbook.create_sheet(SUMMARY_SHEET)
+    headers = list(summary_rows({open_start: {}}, [open_start])[0])
+    for col, name in enumerate(headers, start=1):
+        cell = summary.cell(row=1, column=col, value=name)
+        cell.font = header_font
+        cell.alignment = center
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        for row in range(2, open_end - open_start + 3):
+            summary.cell(row=row, column=col).alignment = center
+        summary.column_dimensions[get_column_letter(col)].width = len(name) + 2
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=".template_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def export_roster_from_template(roster, current_day, working_employees, filename=None, intervals=None,
+                                template_dir: str = TEMPLATE_DIR):
+    """Export a roster by filling in a cached, pre-styled template
+
+    Produces the same sheets as export_roster_to_excel, but only cell values are
+    written: colors come from the template's conditional formatting, so the cost
+    follows the number of assignments rather than the size of the grid.
+
+    Returns:
+        Path of the written workbook, or None if the export failed
+    """
+    from openpyxl import load_workbook
+
+    output_dir = "roster_output"
+    os.makedirs(output_dir, exist_ok=True)
+    if filename is None:
+        filename = f"roster_{current_day}_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
+    filepath = os.path.join(output_dir, filename)
+
+    try:
+        original_slots = sorted(roster)
+        layout = layout_slots(original_slots)
+        start, end, _, open_end = layout
+        employees = sorted(working_employees,
+                           key=lambda emp: (working_employees.get(emp, {}).get("shift", 999), emp))
+        path = template_path(layout, len(employees), template_dir)
+        if not os.path.exists(path):
+            build_template(path, layout, len(employees))
+
+        workbook = load_workbook(path)
+        ws = workbook[SCHEDULE_SHEET]
+        ws.title = f"{current_day}_Schedule"
+        if intervals is None:
+            intervals = RosterIntervals.from_roster(roster)
+        grid = time_grid()
+
+        for row, emp in enumerate(employees, start=FIRST_BODY_ROW):
+            info = working_employees[emp]
+            ws.cell(row=row, column=1, value=emp)
+            ws.cell(row=row, column=2, value=info["department"])
+            ws.cell(row=row, column=3, value=grid.to_12h(info["shift"][0]))
+            ws.cell(row=row, column=4, value=grid.to_12h(info["shift"][1]))
+            for block_start, block_end, task in intervals.intervals(emp):
+                for slot in range(max(block_start, start), min(block_end, end + 1)):
+                    cell = ws.cell(row=row, column=FIRST_TIME_COL + slot - start)
+                    cell.value = f"{cell.value} + {task}" if cell.value else task
+            # After closing, people still on shift show their department
+            dept = normalize_department_key(info["department"])
+            for slot in grid.shift_span(info["shift"], range(original_slots[0], original_slots[-1] + 1)):
+                if open_end < slot <= end:
+                    ws.cell(row=row, column=FIRST_TIME_COL + slot - start, value=dept)
+
+        summary = workbook[SUMMARY_SHEET]
+        summary.title = f"{current_day}_Summary"
+        for row, values in enumerate(summary_rows(roster, original_slots), start=2):
+            for col, value in enumerate(values.values(), start=1):
+                summary.cell(row=row, column=col, value=value)
+
+        workbook.save(filepath)
+    except Exception as e:
+        print(f"❌ Error exporting to Excel: {str(e)}")
+        return None
+
+    print(f"✅ Roster exported to: {filepath}")
+    return filepath
+
+
+def main() -> None:
+    """Time the styled and the template export for one generated day"""
+    parser = argparse.ArgumentParser(description="Compare export_roster_to_excel with the template export")
+    parser.add_argument("file", help="Roster workbook or shift file")
+    parser.add_argument("day", help="Day to generate (M, T, W, Th, F, Sa, Su)")
+    parser.add_argument("--repeats", type=int, default=3, help="Exports per method")
+    args = parser.parse_args()
+
+    # Imported here: only the benchmark needs the generator
+    import contextlib
+    import io
+    from helper import read_from_excel
+    from roster_generator import generate_roster
+    from roster_printer import export_roster_to_excel
+
+    intervals = RosterIntervals()
+    with contextlib.redirect_stdout(io.StringIO()):
+        working_employees = read_from_excel(args.day, args.file)
+        roster = generate_roster(args.day, args.file, intervals)
+
+    for name, export in (("styled", export_roster_to_excel), ("template", export_roster_from_template)):
+        timings = []
+        for _ in range(args.repeats):
+            began = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                exported = export(roster, args.day, working_employees,
+                                  filename=f"export_{name}_{args.day}.xlsx", intervals=intervals)
+            timings.append(time.perf_counter() - began)
+        print(f"{name:<9} best {min(timings) * 1000:>8.1f}ms  first {timings[0] * 1000:>8.1f}ms  -> {exported}")
+
+
+if __name__ == "__main__":
+    main()
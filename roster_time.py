@@ -0,0 +1,188 @@
+import unittest
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# -----------------------------
+# Time grid
+# -----------------------------
+
+DEFAULT_INTERVAL = 15
+MINUTES_PER_DAY = 24 * 60
+# Slots run from midnight through the following day, so a shift or store window
+# may end after midnight (slot 96 is 00:00 the next day at 15 minutes)
+GRID_DAYS = 2
+
+
+def _parse_minutes(time_str: str) -> int:
+    parts = str(time_str).strip().split(":")
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+class TimeGrid:
+    """Precomputed slot <-> time tables for one slot interval and store day
+
+    Every "HH:MM" of the day (plus "24:00") maps to its slot through a dict, and
+    every slot has its 24h and 12h labels ready, so converting a time or a whole
+    column of times is a table lookup rather than a strptime per value. A span
+    whose end is earlier than its start crosses midnight and continues into the
+    next day's slots; one whose end equals its start is a full day.
+    """
+
+    def __init__(self, interval: int = DEFAULT_INTERVAL, hours: Optional[Tuple[str, str]] = None):
+        if MINUTES_PER_DAY % interval:
+            raise ValueError(f"Slot interval must divide a day: {interval}")
+        self.interval = interval
+        self.slots_per_day = MINUTES_PER_DAY // interval
+        self.size = self.slots_per_day * GRID_DAYS
+
+        self._slot_of: Dict[str, int] = {}
+        for minutes in range(MINUTES_PER_DAY + 1):
+            self._slot_of[f"{minutes // 60:02d}:{minutes % 60:02d}"] = minutes // interval
+        self._labels: List[str] = []
+        self._labels_12h: List[str] = []
+        for slot in range(self.size + 1):
+            minutes = slot * interval % MINUTES_PER_DAY
+            hour, minute = divmod(minutes, 60)
+            self._labels.append(f"{hour:02d}:{minute:02d}")
+            self._labels_12h.append(f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}")
+        self._12h_of = {label: self._labels_12h[slot] for slot, label in enumerate(self._labels)}
+
+        self.hours = hours
+        self.open_slots = self.span(hours) if hours else range(0)
+
+    # Single values
+
+    def slot(self, time_str: str) -> int:
+        """Slot a "HH:MM" time falls in ("09:40" -> 38 at 15 minutes)"""
+        slot = self._slot_of.get(time_str)
+        if slot is None:
+            slot = _parse_minutes(time_str) // self.interval
+        return slot
+
+    def span(self, time_span: Tuple[str, str]) -> range:
+        """Slots covered by a (start, end) pair, end exclusive
+
+        An end earlier than the start is read as the next day:
+        ("22:00", "02:00") -> range(88, 104) at 15 minutes. An end equal to the
+        start is a full day: ("06:00", "06:00") -> range(24, 120).
+        """
+        start, end = self.slot(time_span[0]), self.slot(time_span[1])
+        if end <= start:
+            end += self.slots_per_day
+        return range(start, end)
+
+    def shift_span(self, time_span: Tuple[str, str], open_slots: Optional[range] = None) -> range:
+        """Slots of a shift, anchored to the store's open window
+
+        A shift that starts before the window but whose next-day copy starts inside
+        it belongs to the next day: with the store open 18:00-02:00, ("00:00", "04:00")
+        -> range(96, 112). open_slots defaults to the grid's store hours.
+        """
+        shift = self.span(time_span)
+        window = self.open_slots if open_slots is None else open_slots
+        if window and shift.start < window.start and shift.start + self.slots_per_day < window.stop:
+            return range(shift.start + self.slots_per_day, shift.stop + self.slots_per_day)
+        return shift
+
+    def minutes(self, time_span: Tuple[str, str]) -> int:
+        """Length of a (start, end) pair in minutes, crossing midnight like span"""
+        start, end = _parse_minutes(time_span[0]), _parse_minutes(time_span[1])
+        return end - start if end > start else end + MINUTES_PER_DAY - start
+
+    def label(self, slot: int) -> str:
+        """24h "HH:MM" start time of a slot; next-day slots wrap (96 -> "00:00")"""
+        if 0 <= slot <= self.size:
+            return self._labels[slot]
+        hour, minute = divmod(slot * self.interval % MINUTES_PER_DAY, 60)
+        return f"{hour:02d}:{minute:02d}"
+
+    def label_12h(self, slot: int) -> str:
+        """12h "H:MM AM/PM" start time of a slot"""
+        return self.to_12h(self.label(slot))
+
+    def to_12h(self, time_str: str) -> str:
+        """Convert "HH:MM" to "H:MM AM/PM"; values that are not times come back unchanged"""
+        text = self._12h_of.get(time_str)
+        if text is None:
+            try:
+                minutes = _parse_minutes(time_str)
+            except (ValueError, IndexError):
+                return time_str
+            if not 0 <= minutes < MINUTES_PER_DAY or str(time_str).count(":") != 1:
+                return time_str
+            hour, minute = divmod(minutes, 60)
+            text = f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+        return text
+
+    # Whole columns
+
+    def slots(self, times: Iterable[str]) -> List[int]:
+        """Slots for a column of "HH:MM" times (a list, Series or array)"""
+        if hasattr(times, "tolist"):
+            times = times.tolist()
+        slot_of = self._slot_of
+        return [slot_of[t] if t in slot_of else self.slot(t) for t in times]
+
+    def labels(self, slots: Iterable[int]) -> List[str]:
+        """24h labels for a column of slots"""
+        if hasattr(slots, "tolist"):
+            slots = slots.tolist()
+        labels, size = self._labels, self.size
+        return [labels[s] if 0 <= s <= size else self.label(s) for s in slots]
+
+    def shift_slots(self, working_employees: Dict[str, Dict[str, object]]) -> Dict[str, range]:
+        """employee -> slots of their shift for a working_employees dict, anchored to store hours"""
+        return {emp: self.shift_span(info["shift"]) for emp, info in working_employees.items()}
+
+
+@lru_cache(maxsize=None)
+def _shared_grid(interval: int, hours: Optional[Tuple[str, str]]) -> TimeGrid:
+    return TimeGrid(interval, hours)
+
+
+def time_grid(interval: int = DEFAULT_INTERVAL, hours: Optional[Tuple[str, str]] = None) -> TimeGrid:
+    """Shared TimeGrid for an interval and store hours (built once per pair)"""
+    return _shared_grid(interval, tuple(hours) if hours else None)
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+
+class TestTimeGridSpans(unittest.TestCase):
+    def test_start_equal_to_end_is_full_day(self):
+        grid = time_grid()
+        self.assertEqual(grid.span(("06:00", "06:00")), range(24, 120))
+        self.assertEqual(grid.minutes(("06:00", "06:00")), 24 * 60)
+        self.assertEqual(len(time_grid(hours=("00:00", "00:00")).open_slots), grid.slots_per_day)
+
+    def test_shift_after_midnight_anchored_to_store(self):
+        late = time_grid(hours=("18:00", "02:00"))
+        self.assertEqual(late.shift_span(("00:00", "04:00")), range(96, 112))
+        self.assertEqual(late.shift_span(("16:00", "02:00")), range(64, 104))
+        self.assertEqual(late.shift_slots({"A": {"shift": ("01:00", "02:00")}}), {"A": range(100, 104)})
+        # A daytime store keeps early starts on the same day
+        self.assertEqual(time_grid(hours=("09:30", "18:00")).shift_span(("07:00", "15:00")), range(28, 60))
+        self.assertEqual(time_grid(hours=("06:00", "06:00")).shift_span(("02:00", "06:00")), range(104, 120))
+
+    def test_cross_midnight(self):
+        grid = time_grid()
+        self.assertEqual(grid.span(("22:00", "02:00")), range(88, 104))
+        self.assertEqual(grid.minutes(("22:00", "02:00")), 240)
+        self.assertEqual(grid.span(("09:30", "18:00")), range(38, 72))
+        self.assertEqual(grid.labels([95, 96, 103]), ["23:45", "00:00", "01:45"])
+        self.assertEqual(grid.label(300), "03:00")
+
+    def test_other_intervals_and_12h_labels(self):
+        grid = time_grid(30)
+        self.assertEqual(grid.span(("09:40", "10:00")), range(19, 20))
+        self.assertEqual(grid.to_12h("00:30"), "12:30 AM")
+        self.assertEqual(grid.to_12h("13:05"), "1:05 PM")
+        self.assertEqual(grid.to_12h("Off"), "Off")
+        self.assertEqual(time_grid(hours=["10:00", "19:00"]), time_grid(hours=("10:00", "19:00")))
+        with self.assertRaises(ValueError):
+            time_grid(7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# -----------------------------
+# Decision trace recorder
+# -----------------------------
+
+# Reason codes stored in each record
+REASONS = [
+    "slot_available",         # candidates = employees free at the start of the slot
+    "selected",               # employee picked for a task
+    "tracker_reset",          # everyone had done the task today, tracker cleared
+    "fallback_pool",          # FR fell back to non-M's/L's/Acc. departments
+    "previous_slot_fallback", # R topped up from the previous slot's register staff
+    "matched",                # picked by the matching engine
+    "shortfall",              # fewer people than required (value = seats missing)
+    "block",                  # standard block length (value = slots)
+    "block_extension",        # block stretched to shift end or store closing (value = slots)
+    "break_lookahead",        # block stretched to reach a 40-min break (value = break slot)
+    "break_assigned",         # 40-min break given (value = first break slot)
+]
+REASON_CODES = {name: code for code, name in enumerate(REASONS)}
+
+TRACE_DTYPE = np.dtype([
+    ("seq", "<u4"),
+    ("slot", "<i2"),
+    ("task", "i1"),
+    ("candidates", "<i2"),
+    ("employee", "<i4"),
+    ("reason", "u1"),
+    ("value", "<i2"),
+])
+
+DEFAULT_CAPACITY = 1 << 16
+NO_EMPLOYEE = -1
+NO_TASK = -1
+
+
+class TraceRecorder:
+    """Fixed-width decision records in a preallocated ring buffer
+
+    Names are interned to small ints so a record is a handful of bytes; once
+    the buffer is full the oldest records are overwritten.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=TRACE_DTYPE)
+        self.count = 0
+        self.employees: List[str] = []
+        self.tasks: List[str] = []
+        self._employee_ids: Dict[str, int] = {}
+        self._task_ids: Dict[str, int] = {}
+
+    def _employee_id(self, employee: Optional[str]) -> int:
+        if employee is None:
+            return NO_EMPLOYEE
+        code = self._employee_ids.get(employee)
+        if code is None:
+            code = self._employee_ids[employee] = len(self.employees)
+            self.employees.append(employee)
+        return code
+
+    def _task_id(self, task: Optional[str]) -> int:
+        if task is None:
+            return NO_TASK
+        code = self._task_ids.get(task)
+        if code is None:
+            code = self._task_ids[task] = len(self.tasks)
+            self.tasks.append(task)
+        return code
+
+    def record(self, slot: int, task: Optional[str], candidates: int,
+               employee: Optional[str], reason: str, value: int = 0) -> None:
+        """Append one decision"""
+        self.buffer[self.count % self.capacity] = (
+            self.count, slot, self._task_id(task), candidates,
+            self._employee_id(employee), REASON_CODES[reason], value,
+        )
+        self.count += 1
+
+    def records(self) -> np.ndarray:
+        """Kept records, oldest first"""
+        if self.count <= self.capacity:
+            return self.buffer[:self.count]
+        split = self.count % self.capacity
+        return np.concatenate([self.buffer[split:], self.buffer[:split]])
+
+    def query(self, slot: Optional[int] = None, task: Optional[str] = None,
+              employee: Optional[str] = None, reason: Optional[str] = None) -> List[Dict[str, object]]:
+        """Records matching every given filter, decoded to dictionaries"""
+        records = self.records()
+        mask = np.ones(len(records), dtype=bool)
+        if slot is not None:
+            mask &= records["slot"] == slot
+        if task is not None:
+            mask &= records["task"] == self._task_ids.get(task, -2)
+        if employee is not None:
+            mask &= records["employee"] == self._employee_ids.get(employee, -2)
+        if reason is not None:
+            mask &= records["reason"] == REASON_CODES[reason]
+        return [self._decode(record) for record in records[mask]]
+
+    def _decode(self, record) -> Dict[str, object]:
+        return {
+            "seq": int(record["seq"]),
+            "slot": int(record["slot"]),
+            "task": self.tasks[record["task"]] if record["task"] != NO_TASK else None,
+            "candidates": int(record["candidates"]),
+            "employee": self.employees[record["employee"]] if record["employee"] != NO_EMPLOYEE else None,
+            "reason": REASONS[record["reason"]],
+            "value": int(record["value"]),
+        }
+
+    def dump(self, path: str) -> None:
+        """Save kept records and name tables to a .npz file
+
+        Names are stored as fixed-width unicode arrays, so the file loads without pickle.
+        """
+        np.savez_compressed(path, records=self.records(),
+                            employees=np.array(self.employees, dtype=np.str_),
+                            tasks=np.array(self.tasks, dtype=np.str_))
+
+    @classmethod
+    def load(cls, path: str) -> "TraceRecorder":
+        """Load a trace saved with dump"""
+        with np.load(path, allow_pickle=False) as data:
+            records = data["records"]
+            employees, tasks = data["employees"].tolist(), data["tasks"].tolist()
+        recorder = cls(capacity=max(len(records), 1))
+        recorder.buffer[:len(records)] = records
+        recorder.count = len(records)
+        for name in employees:
+            recorder._employee_id(str(name))
+        for name in tasks:
+            recorder._task_id(str(name))
+        return recorder
+
+
+def format_record(record: Dict[str, object]) -> str:
+    """One-line description of a decoded record"""
+    who = record["employee"] or "-"
+    task = record["task"] or "-"
+    return (f"#{record['seq']:<6} slot {record['slot']:<3} {task:<5} {record['reason']:<22} "
+            f"{who:<24} candidates={record['candidates']:<3} value={record['value']}")
+
+
+def main() -> None:
+    """Record a generation trace or query a saved one"""
+    parser = argparse.ArgumentParser(description="Roster decision trace recorder")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Generate a roster with tracing and save the trace")
+    run.add_argument("file_path", help="Roster workbook (.xlsx)")
+    run.add_argument("day", help="Day of the week")
+    run.add_argument("--out", default="roster_trace.npz", help="Trace file to write")
+    run.add_argument("--engine", default=None, help="CS assignment engine")
+    run.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Ring buffer size")
+
+    show = commands.add_parser("show", help="Print records from a saved trace")
+    show.add_argument("trace_file", help="Trace file written by run")
+    show.add_argument("--slot", type=int, help="Only this slot")
+    show.add_argument("--task", help="Only this task")
+    show.add_argument("--employee", help="Only this employee")
+    show.add_argument("--reason", choices=REASONS, help="Only this reason")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        # Imported here so reading traces does not need the generator
+        from roster_generator import RosterConfig, generate_roster
+        trace = TraceRecorder(args.capacity)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_roster(args.day, args.file_path, engine=args.engine or RosterConfig.DEFAULT_ENGINE,
+                            trace=trace)
+        elapsed = time.perf_counter() - start
+        trace.dump(args.out)
+        print(f"✅ {trace.count} decisions recorded in {elapsed:.2f}s -> {args.out}")
+        return
+
+    trace = TraceRecorder.load(args.trace_file)
+    for record in trace.query(args.slot, args.task, args.employee, args.reason):
+        print(format_record(record))
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+
+class TestTraceFile(unittest.TestCase):
+    def test_round_trip_without_pickle(self):
+        trace = TraceRecorder(capacity=4)
+        trace.record(40, "FR", 3, "Zoë Ann", "selected")
+        trace.record(41, None, 5, None, "slot_available")
+        fd, path = tempfile.mkstemp(suffix=".npz")
+        os.close(fd)
+        try:
+            trace.dump(path)
+            with np.load(path, allow_pickle=False) as data:
+                self.assertNotEqual(data["employees"].dtype, object)
+            loaded = TraceRecorder.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(loaded.query(), trace.query())
+        self.assertEqual(loaded.query(employee="Zoë Ann")[0]["task"], "FR")
+
+    def test_empty_trace(self):
+        fd, path = tempfile.mkstemp(suffix=".npz")
+        os.close(fd)
+        try:
+            TraceRecorder().dump(path)
+            self.assertEqual(TraceRecorder.load(path).query(), [])
+        finally:
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from helper import file_digest, list_excel_files, read_from_excel, store_name
+from roster_generator import RosterConfig, generate_roster
+from roster_intervals import RosterIntervals
+from roster_printer import export_roster_to_excel
+from roster_readers import DEFAULT_READER_BACKEND, READER_BACKENDS
+
+# -----------------------------
+# Watch mode
+# -----------------------------
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 2.0
+
+
+class WorkbookWatcher:
+    """Poll a drop folder for new or modified workbooks
+
+    A file is reported once its size and modification time have been stable for
+    `debounce` seconds (so half-written saves are ignored) and its contents hash
+    differs from the last processed version (so no-op saves are ignored).
+    """
+
+    def __init__(self, folder: str, debounce: float = DEFAULT_DEBOUNCE):
+        self.folder = folder
+        self.debounce = debounce
+        # path -> ((size, mtime), time the signature was first seen)
+        self._seen: Dict[str, Tuple[Tuple[int, float], float]] = {}
+        # path -> signature already checked, so stable files are hashed once
+        self._checked: Dict[str, Tuple[int, float]] = {}
+        # path -> content hash of the last processed version
+        self._hashes: Dict[str, str] = {}
+
+    def prime(self) -> None:
+        """Treat files already in the folder as processed"""
+        for path in list_excel_files(self.folder):
+            try:
+                stat = os.stat(path)
+                self._checked[path] = (stat.st_size, stat.st_mtime)
+                self._hashes[path] = file_digest(path)
+            except OSError:
+                continue
+
+    def forget(self, path: str) -> None:
+        """Drop the recorded hash so the next save is processed even if unchanged
+
+        The failing (size, mtime) signature stays checked, so the file is skipped
+        until it is saved again rather than retried on every poll.
+        """
+        self._hashes.pop(path, None)
+
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        """Return workbooks that settled with new contents since the last poll"""
+        now = time.time() if now is None else now
+        ready = []
+        present = set(list_excel_files(self.folder))
+
+        for path in list(self._seen):
+            if path not in present:
+                del self._seen[path]
+                self._checked.pop(path, None)
+
+        for path in sorted(present):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+
+            previous = self._seen.get(path)
+            if previous is None or previous[0] != signature:
+                self._seen[path] = (signature, now)
+                continue
+            if now - previous[1] < self.debounce or self._checked.get(path) == signature:
+                continue
+
+            self._checked[path] = signature
+            try:
+                digest = file_digest(path)
+            except OSError:
+                continue
+            if self._hashes.get(path) == digest:
+                continue
+            self._hashes[path] = digest
+            ready.append(path)
+
+        return ready
+
+
+def regenerate_day(file_path: str, day: str, engine: str = RosterConfig.DEFAULT_ENGINE,
+                   seed: Optional[int] = None,
+                   reader: str = DEFAULT_READER_BACKEND) -> Tuple[str, str, Optional[str]]:
+    """Generate and export one day of one workbook (runs in a worker process)
+
+    The export is written under a temporary name and renamed into place, so a
+    reader never sees a half-written roster.
+
+    Returns:
+        (file_path, day, exported file path or None when nobody works that day)
+    """
+    filename = f"{store_name(file_path)}_{day}.xlsx"
+    # Keep the .xlsx suffix so the writer still picks the openpyxl engine
+    tmp_name = f".tmp_{os.getpid()}_{filename}"
+    with contextlib.redirect_stdout(io.StringIO()):
+        working_employees = read_from_excel(day, file_path, reader)
+        if not working_employees:
+            return file_path, day, None
+        if seed is not None:
+            random.seed(seed)
+        intervals = RosterIntervals()
+        roster = generate_roster(day, file_path, intervals, engine=engine,
+                                 working_employees=working_employees)
+        exported = export_roster_to_excel(roster, day, working_employees,
+                                          filename=tmp_name, intervals=intervals)
+    if exported is None:
+        raise RuntimeError(f"Export failed for {file_path} ({day})")
+    final_path = os.path.join(os.path.dirname(exported), filename)
+    try:
+        os.replace(exported, final_path)
+    except BaseException:
+        os.remove(exported)
+        raise
+    return file_path, day, final_path
+
+
+class DayJobs:
+    """Run at most one regeneration per (workbook, day), keeping only the newest request
+
+    A request for a (workbook, day) that is still waiting in the pool replaces it;
+    one that is already running is held back and submitted when it finishes, and
+    a later request replaces the held one. Saves in a row therefore never queue
+    stale jobs or let an older export overwrite a newer one.
+    """
+
+    def __init__(self, pool, engine: str = RosterConfig.DEFAULT_ENGINE,
+                 reader: str = DEFAULT_READER_BACKEND):
+        self.pool = pool
+        self.engine = engine
+        self.reader = reader
+        # future -> (path, day, fingerprint, seed)
+        self.pending: Dict[Future, Tuple[str, str, Optional[str], Optional[int]]] = {}
+        # (path, day) -> future of its submitted job
+        self.submitted: Dict[Tuple[str, str], Future] = {}
+        # (path, day) -> (fingerprint, seed) waiting for the running job to finish
+        self.held: Dict[Tuple[str, str], Tuple[Optional[str], Optional[int]]] = {}
+
+    def submit(self, path: str, day: str, fingerprint: Optional[str] = None,
+               seed: Optional[int] = None) -> None:
+        """Request a regeneration, superseding any earlier request for the same day"""
+        key = (path, day)
+        previous = self.submitted.get(key)
+        if previous is not None:
+            if not previous.cancel():
+                self.held[key] = (fingerprint, seed)
+                return
+            del self.pending[previous]
+        self._start(key, fingerprint, seed)
+
+    def _start(self, key: Tuple[str, str], fingerprint: Optional[str], seed: Optional[int]) -> None:
+        future = self.pool.submit(regenerate_day, key[0], key[1], self.engine, seed, self.reader)
+        self.submitted[key] = future
+        self.pending[future] = (key[0], key[1], fingerprint, seed)
+
+    def finished(self) -> List[Tuple[Future, str, str, Optional[str], Optional[int]]]:
+        """Pop completed jobs, submitting any request held back behind them
+
+        Returns:
+            (future, path, day, fingerprint, seed) per completed job
+        """
+        done = []
+        for future in [f for f in self.pending if f.done()]:
+            path, day, fingerprint, seed = self.pending.pop(future)
+            key = (path, day)
+            del self.submitted[key]
+            if key in self.held:
+                self._start(key, *self.held.pop(key))
+            done.append((future, path, day, fingerprint, seed))
+        return done
+
+    def cancel(self) -> None:
+        """Cancel jobs that have not started and drop held requests"""
+        self.held.clear()
+        for future in self.pending:
+            future.cancel()
+
+
+def watch(folder: str,
+          poll_interval: float = DEFAULT_POLL_INTERVAL,
+          debounce: float = DEFAULT_DEBOUNCE,
+          workers: Optional[int] = None,
+          days: Optional[List[str]] = None,
+          engine: str = RosterConfig.DEFAULT_ENGINE,
+          process_existing: bool = False,
+          incremental: bool = False,
+          reader: str = DEFAULT_READER_BACKEND) -> None:
+    """Watch a folder and regenerate rosters for workbooks that change, until interrupted
+
+    With incremental, only days whose inputs changed are regenerated (see roster_incremental).
+    """
+    # Imported here: roster_incremental builds on this module
+    from roster_incremental import mark_day_done, plan_week
+
+    days = days or list(RosterConfig.STORE_HOURS)
+    watcher = WorkbookWatcher(folder, debounce)
+    if not process_existing:
+        watcher.prime()
+
+    print(f"👀 Watching {os.path.abspath(folder)} for roster workbooks (Ctrl+C to stop)")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = DayJobs(pool, engine, reader)
+        try:
+            while True:
+                for path in watcher.poll():
+                    if incremental:
+                        try:
+                            changes = plan_week(path, days, engine)
+                        except Exception as e:
+                            # Skipped until the workbook is saved again
+                            watcher.forget(path)
+                            print(f"❌ {os.path.basename(path)}: {e} (save it again to retry)")
+                            continue
+                    else:
+                        changes = {day: (None, None) for day in days}
+                    if not changes:
+                        print(f"✅ {os.path.basename(path)} changed but no day's inputs did")
+                        continue
+                    print(f"🔄 {os.path.basename(path)} changed, regenerating {', '.join(changes)}")
+                    for day, (fingerprint, seed) in changes.items():
+                        jobs.submit(path, day, fingerprint, seed)
+
+                for future, path, day, fingerprint, seed in jobs.finished():
+                    if future.cancelled():
+                        continue
+                    try:
+                        _, _, exported = future.result()
+                    except Exception as e:
+                        # Let the next save of this workbook retry even if its contents match
+                        watcher.forget(path)
+                        print(f"❌ {os.path.basename(path)} ({day}): {e}")
+                        continue
+                    if fingerprint is not None:
+                        mark_day_done(path, day, fingerprint, seed, exported)
+                    if exported:
+                        print(f"✅ {os.path.basename(path)} ({day}) -> {exported}")
+
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            print("\nStopping watch; waiting for running jobs to finish...")
+            jobs.cancel()
+
+
+def main() -> None:
+    """Run watch mode from the command line"""
+    parser = argparse.ArgumentParser(description="Regenerate rosters when workbooks in a folder change")
+    parser.add_argument("folder", nargs="?", default=".", help="Drop folder to watch")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL, help="Seconds between polls")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="Seconds a file must stay unchanged before it is processed")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--days", nargs="*", choices=list(RosterConfig.STORE_HOURS), help="Days to regenerate")
+    parser.add_argument("--engine", choices=list(RosterConfig.ASSIGNMENT_ENGINES),
+                        default=RosterConfig.DEFAULT_ENGINE, help="CS assignment engine")
+    parser.add_argument("--process-existing", action="store_true",
+                        help="Also regenerate workbooks already in the folder at startup")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only regenerate days whose shifts or departments changed")
+    parser.add_argument("--reader", choices=READER_BACKENDS, default=DEFAULT_READER_BACKEND,
+                        help="Weekly/Team workbook reader (see roster_readers)")
+    args = parser.parse_args()
+
+    watch(args.folder, args.interval, args.debounce, args.workers, args.days, args.engine,
+          args.process_existing, args.incremental, args.reader)
+
+
+# -----------------------------
+# Tester
+# -----------------------------
+# Running this file starts the CLI; run the tests with `python -m unittest roster_watch`
+
+class _ManualPool:
+    """Pool stand-in whose futures are started and finished by the test"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.submitted.append((future, args))
+        return future
+
+
+class TestDayJobs(unittest.TestCase):
+    def setUp(self):
+        self.pool = _ManualPool()
+        self.jobs = DayJobs(self.pool)
+
+    def test_waiting_job_replaced(self):
+        self.jobs.submit("a.xlsx", "M", seed=1)
+        self.jobs.submit("a.xlsx", "M", seed=2)
+        first, second = self.pool.submitted
+        self.assertTrue(first[0].cancelled())
+        self.assertEqual(list(self.jobs.pending.values()), [("a.xlsx", "M", None, 2)])
+
+    def test_running_job_holds_only_newest_request(self):
+        self.jobs.submit("a.xlsx", "M", seed=1)
+        running = self.pool.submitted[0][0]
+        running.set_running_or_notify_cancel()
+        self.jobs.submit("a.xlsx", "M", seed=2)
+        self.jobs.submit("a.xlsx", "M", seed=3)
+        self.jobs.submit("a.xlsx", "T", seed=4)
+        self.assertEqual(len(self.pool.submitted), 2)
+
+        running.set_result(("a.xlsx", "M", None))
+        done = self.jobs.finished()
+        self.assertEqual([(path, day, seed) for _, path, day, _, seed in done], [("a.xlsx", "M", 1)])
+        self.assertEqual([args[3] for _, args in self.pool.submitted], [1, 4, 3])
+        self.assertEqual(self.jobs.finished(), [])
+
+
+class TestWorkbookWatcher(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "store.xlsx")
+        self._save(b"v1", mtime=1000)
+        self.watcher = WorkbookWatcher(self.folder, debounce=2.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _save(self, contents: bytes, mtime: float) -> None:
+        with open(self.path, "wb") as f:
+            f.write(contents)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_reported_once_settled(self):
+        self.assertEqual(self.watcher.poll(now=0), [])
+        self.assertEqual(self.watcher.poll(now=1), [])
+        self.assertEqual(self.watcher.poll(now=3), [self.path])
+        self.assertEqual(self.watcher.poll(now=10), [])
+
+    def test_failed_workbook_not_retried_until_saved_again(self):
+        self.watcher.poll(now=0)
+        self.assertEqual(self.watcher.poll(now=3), [self.path])
+        self.watcher.forget(self.path)
+        for now in (10, 20, 30):
+            self.assertEqual(self.watcher.poll(now=now), [])
+        # Same contents, new save: retried
+        self._save(b"v1", mtime=2000)
+        self.assertEqual(self.watcher.poll(now=40), [])
+        self.assertEqual(self.watcher.poll(now=50), [self.path])
+        self.assertEqual(self.watcher.poll(now=60), [])
+
+    def test_unreadable_workbook_not_replanned(self):
+        # Imported here: roster_incremental builds on this module
+        from roster_incremental import plan_week
+
+        self.watcher.poll(now=0)
+        self.assertEqual(self.watcher.poll(now=3), [self.path])
+        with self.assertRaises(Exception):
+            plan_week(self.path, ["M"], RosterConfig.DEFAULT_ENGINE)
+        self.watcher.forget(self.path)
+        self.assertEqual(self.watcher.poll(now=10), [])
+        self.assertEqual(self.watcher.poll(now=20), [])
+
+    def test_noop_save_ignored(self):
+        self.watcher.poll(now=0)
+        self.watcher.poll(now=3)
+        self._save(b"v1", mtime=2000)
+        self.watcher.poll(now=10)
+        self.assertEqual(self.watcher.poll(now=20), [])
+
+
+if __name__ == "__main__":
+    main()